@@ -0,0 +1,202 @@
+"""
+Threshold alerting evaluated on every ingested host/VPS sample.
+
+A rule is a tuple (name, section, field, kind, threshold, hysteresis):
+
+    kind ABOVE  raise when field > threshold, clear below threshold - hyst.
+    kind BELOW  raise when field < threshold, clear above threshold + hyst.
+    kind RISE   raise when field grows faster than threshold per second,
+                clear below threshold - hyst.
+
+The threshold may name a config key (e.g. "temp_hot") instead of a number.
+Rules are compiled once into closures with the thresholds bound as plain
+numbers and grouped by data section, so evaluating a sample is a few
+comparisons per rule. Rules are recompiled when alert_rules or a config
+key named as a threshold changes; extra rules can be added through the
+alert_rules config key. Alerts of a rule that is gone after a recompile
+are cleared.
+
+Listeners registered with on_alert() get a dict per raise/clear
+transition; main.py routes them to the display banner, the status LED and
+MQTT.
+"""
+
+try:
+    from time import ticks_diff, ticks_ms
+except ImportError:  # CPython, for scripts/alert_benchmark.py
+    from time import monotonic_ns
+
+    def ticks_ms():
+        return monotonic_ns() // 1000000
+
+    def ticks_diff(a, b):
+        return a - b
+
+
+from config import cfg
+
+ABOVE = "above"
+BELOW = "below"
+RISE = "rise"
+
+DEFAULT_RULES = (
+    ("cpu_temp", "host", "cpu_temp", ABOVE, "temp_hot", 5),
+    ("cpu_temp_rise", "host", "cpu_temp", RISE, 2, 1.5),  # degrees per second
+    ("ssd_temp", "host", "ssd_temp", ABOVE, 70, 5),
+    ("ram", "host", "ram", ABOVE, 90, 5),
+    ("vps_cpu", "vps", "CPU", ABOVE, 95, 15),
+    ("vps_ram", "vps", "RAM", ABOVE, 90, 5),
+    ("vps_disk", "vps", "DISK", ABOVE, 90, 3),
+)
+
+
+class AlertRuleError(ValueError):
+    """A rule spec with a kind not in _BUILDERS."""
+
+    def __init__(self, kind):
+        super().__init__(f"unknown rule kind: {kind}")
+
+
+def _above(field, on, off, _last):
+    def check(_host_id, slot, active, _now):
+        value = slot.get(field)
+        if value is None:
+            return active
+        return value >= off if active else value > on
+
+    return check
+
+
+def _below(field, on, off, _last):
+    def check(_host_id, slot, active, _now):
+        value = slot.get(field)
+        if value is None:
+            return active
+        return value <= off if active else value < on
+
+    return check
+
+
+def _rise(field, on, off, last):
+    """last is host_id -> (value, ticks_ms), kept by the engine across compiles."""
+
+    def check(host_id, slot, active, now):
+        value = slot.get(field)
+        if value is None:
+            return active
+        prev = last.get(host_id)
+        last[host_id] = (value, now)
+        if prev is None:
+            return active
+        dt = ticks_diff(now, prev[1])
+        if dt <= 0:
+            return active
+        rate = (value - prev[0]) * 1000 / dt
+        return rate >= off if active else rate > on
+
+    return check
+
+
+_BUILDERS = {ABOVE: _above, BELOW: _below, RISE: _rise}
+
+
+class _Rule:
+    """A rule spec compiled into a check closure."""
+
+    def __init__(
+        self, name, section, field, kind, threshold, hysteresis=0, *, last
+    ):
+        if kind not in _BUILDERS:
+            raise AlertRuleError(kind)
+        self.config_key = None
+        if isinstance(threshold, str):
+            self.config_key = threshold
+            threshold = getattr(cfg, threshold)
+        off = threshold + hysteresis if kind == BELOW else threshold - hysteresis
+        self.name = name
+        self.section = section
+        self.field = field
+        self.threshold = threshold
+        self.check = _BUILDERS[kind](field, threshold, off, last)
+        self.active = None  # host_id -> message, shared across recompiles
+
+
+class AlertEngine:
+    """Compiles rules and evaluates them per sample with hysteresis."""
+
+    def __init__(self, rules=DEFAULT_RULES):
+        self._specs = rules
+        self._rules = {}  # section -> [_Rule]
+        self._active = {}  # rule name -> {host_id: message}
+        self._last = {}  # rule name -> RISE history, kept across compiles
+        self._config_keys = set()  # Config keys the rules depend on
+        self._listeners = []
+        self.transitions = 0
+        self.compile()
+        cfg.on_change(self._config_changed)
+
+    def _config_changed(self, changed):
+        if any(key == "alert_rules" or key in self._config_keys for key in changed):
+            self.compile()
+
+    def compile(self):
+        """(Re)build the rule closures from the specs and the config."""
+        old = {rule.name: rule for group in self._rules.values() for rule in group}
+        rules = {}
+        for spec in tuple(self._specs) + tuple(cfg.alert_rules):
+            try:
+                last = self._last.setdefault(spec[0], {})
+                rule = _Rule(*spec, last=last)
+            except (TypeError, ValueError, AttributeError, IndexError) as e:
+                print(f"Alerts: skipping rule {spec}: {e}")
+                continue
+            rule.active = self._active.setdefault(rule.name, {})
+            rules.setdefault(rule.section, []).append(rule)
+        self._rules = rules
+        compiled = [rule for group in rules.values() for rule in group]
+        names = {rule.name for rule in compiled}
+        self._config_keys = {rule.config_key for rule in compiled}
+        self._last = {name: last for name, last in self._last.items() if name in names}
+        for name in [name for name in self._active if name not in names]:
+            # The rule is gone: nothing would ever clear its alerts
+            hosts = self._active.pop(name)
+            for host_id in list(hosts):
+                self._transition(old[name], host_id, None, False)
+
+    def on_alert(self, callback):
+        """Register callback(alert) for every raise and clear transition."""
+        self._listeners.append(callback)
+
+    def evaluate(self, section, host_id, slot, now=None):
+        """Check one ingested sample against the rules of its section."""
+        rules = self._rules.get(section)
+        if not rules:
+            return
+        if now is None:
+            now = ticks_ms()
+        for rule in rules:
+            active = host_id in rule.active
+            if rule.check(host_id, slot, active, now) != active:
+                self._transition(rule, host_id, slot.get(rule.field), not active)
+
+    def _transition(self, rule, host_id, value, raised):
+        self.transitions += 1
+        if raised:
+            rule.active[host_id] = f"{host_id}: {rule.name} {value}"
+        else:
+            rule.active.pop(host_id, None)
+        alert = {
+            "rule": rule.name,
+            "host": host_id,
+            "field": rule.field,
+            "value": value,
+            "threshold": rule.threshold,
+            "state": "raised" if raised else "cleared",
+        }
+        print(f"Alert {alert['state']}: {rule.name} on {host_id} ({value})")
+        for callback in self._listeners:
+            callback(alert)
+
+    def active_messages(self):
+        """Messages of all currently raised alerts."""
+        return [msg for hosts in self._active.values() for msg in hosts.values()]
@@ -1,3 +1,71 @@
 """
 Boot script executed on every startup (including wake from deep sleep).
+
+Selects the app slot installed by ota.py. /ota.json names the slot
+directory (/app_a or /app_b); boot.py changes into it, so MicroPython runs
+that slot's main.py and imports its modules first. The root stays on
+sys.path for secrets.py, and config.json and the icons keep their absolute
+paths in the root. Without /ota.json the app runs from the root.
+
+A freshly installed slot is on trial until main.py confirms it from the
+main loop. If it has not done so after _TRIAL_BOOTS boots (a crash, a
+watchdog reset, an import error), the previous slot is restored. A trial
+boot arms the watchdog here: a main.py that fails to import would otherwise
+leave the board in the REPL, and the next boot would never come.
 """
+
+import json
+import os
+import sys
+
+_STATE = "ota.json"
+_TRIAL_BOOTS = 2
+# main() re-arms the watchdog with its own timeout as its first step
+_TRIAL_WDT_MS = 30000
+
+
+def _save(path, state):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.rename(tmp, path)
+
+
+def select_slot(root="/"):
+    """Return the state of the slot to run ({} for the root), rolling back."""
+    path = root.rstrip("/") + "/" + _STATE
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get("trial"):
+        boots = state.get("boots", 0)
+        if boots >= _TRIAL_BOOTS:
+            print(f"OTA: version {state.get('version')} never started, rolling back")
+            state = {
+                "slot": state.get("previous"),
+                "version": state.get("previous_version"),
+                "rolled_back": state.get("version"),
+            }
+        else:
+            state["boots"] = boots + 1
+        _save(path, state)
+    return state
+
+
+def start(root="/"):
+    """Select the slot, arm the watchdog on a trial boot; returns the slot."""
+    state = select_slot(root)
+    if state.get("trial"):
+        import machine  # noqa: PLC0415
+
+        machine.WDT(timeout=_TRIAL_WDT_MS)
+    return state.get("slot")
+
+
+if __name__ == "__main__":
+    slot = start()
+    if slot:
+        os.chdir("/app_" + slot)
+        sys.path.append("/")
@@ -0,0 +1,94 @@
+"""
+On-screen 3-point touch calibration.
+
+Shows a crosshair at each of touch_affine.TARGETS in turn. The user taps and
+holds it; raw readings are collected while the panel is pressed and their
+median is taken on release. After the third target the affine transform is
+solved and handed to on_done as fixed-point coefficients.
+"""
+
+# noinspection PyUnresolvedReferences
+import lvgl as lv
+
+import theme
+import touch_affine
+
+_MIN_SAMPLES = 5
+_MAX_SAMPLES = 31
+_CROSS_SIZE = 21
+
+
+class CalibrationScreen:
+    """Full-screen calibration, fed raw touch readings by Display."""
+
+    def __init__(self, on_done):
+        self.on_done = on_done
+        self.screen = lv.obj()
+        self.screen.add_style(theme.SCREEN, 0)
+        self.screen.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
+
+        self.info_label = lv.label(self.screen)
+        self.info_label.align(lv.ALIGN.CENTER, 0, 0)
+
+        self._h_line = self._line(_CROSS_SIZE, 1)
+        self._v_line = self._line(1, _CROSS_SIZE)
+
+        self._samples_x = []
+        self._samples_y = []
+        self._raw_points = []
+        self._armed = False  # Wait for the touch that opened us to end
+        self._show_target()
+
+    def _line(self, width, height):
+        line = lv.obj(self.screen)
+        line.set_size(width, height)
+        theme.add(line, theme.ALERT, theme.FLAT)
+        return line
+
+    def _show_target(self, message=None):
+        index = len(self._raw_points)
+        x, y = touch_affine.TARGETS[index]
+        half = _CROSS_SIZE // 2
+        self._h_line.set_pos(x - half, y)
+        self._v_line.set_pos(x, y - half)
+        text = message or "Tap and hold the cross"
+        self.info_label.set_text(f"{text}\n{index + 1} / {len(touch_affine.TARGETS)}")
+
+    @staticmethod
+    def _median(values):
+        values.sort()
+        return values[len(values) // 2]
+
+    def feed(self, raw):
+        """Call every loop pass with the raw (x, y) reading or None."""
+        if not self._armed:
+            self._armed = raw is None
+            return
+        if raw is not None:
+            if len(self._samples_x) < _MAX_SAMPLES:
+                self._samples_x.append(raw[0])
+                self._samples_y.append(raw[1])
+            return
+        if not self._samples_x:
+            return
+
+        if len(self._samples_x) >= _MIN_SAMPLES:
+            point = (self._median(self._samples_x), self._median(self._samples_y))
+            self._raw_points.append(point)
+        self._samples_x = []
+        self._samples_y = []
+
+        if len(self._raw_points) < len(touch_affine.TARGETS):
+            self._show_target()
+            return
+        try:
+            coeffs = touch_affine.solve(self._raw_points, touch_affine.TARGETS)
+        except ValueError as e:
+            print(f"Calibration failed: {e}")
+            self._raw_points = []
+            self._show_target("Failed, try again")
+            return
+        self.on_done(touch_affine.to_fixed(coeffs))
+
+    def get_screen(self):
+        return self.screen
@@ -0,0 +1,183 @@
+"""
+Persistent runtime configuration with hot-reload over MQTT.
+
+Values live in /config.json and are exposed as plain attributes of the
+module-level cfg object, so hot paths read cfg.temp_hot instead of doing
+dict lookups. Updates arrive as partial JSON documents on
+config/{client_id}/set; an update is validated completely before anything
+is written or applied, so it either takes effect as a whole or not at all.
+"""
+
+import json
+import os
+
+_PATH = "/config.json"
+
+DEFAULTS = {
+    # Touch calibration: fixed-point affine coefficients from the on-screen
+    # calibration (touch_affine.py); the raw XPT2046 min/max values are only
+    # used while it is empty
+    "touch_affine": [],
+    "touch_x_min": 288,
+    "touch_x_max": 1866,
+    "touch_y_min": 246,
+    "touch_y_max": 1794,
+    # Host monitor
+    "host_ram_gb": 32,
+    "temp_warm": 55,
+    "temp_hot": 75,
+    # Sensors: stale after this long without an update (and at least three
+    # of their usual intervals); plausibility ranges by storage key or unit,
+    # e.g. {"DHT11_C": [0, 50]}, see sensor_quality.py for the defaults
+    "sensor_stale_s": 300,
+    "sensor_ranges": {},
+    # Display theme: "night", "day" or "auto" (day from 7:00 to 20:00)
+    "theme": "night",
+    # Idle power saving (idle.py): dim the backlight after idle_dim_s
+    # without a touch, switch it off and sleep after idle_off_s (0: never)
+    "idle_dim_s": 120,
+    "idle_off_s": 600,
+    "idle_light_sleep": True,
+    # GPIO of the XPT2046 PENIRQ line, wakes from light sleep; -1: not wired
+    "touch_irq_pin": -1,
+    # HTTP status/metrics server port, 0 disables it
+    "http_port": 80,
+    # Intervals
+    "weather_interval_s": 150,
+    "ping_interval_s": 5,
+    "forecast_ttl_s": 3600,
+    # Memory: run gc.collect() below this much free GC heap
+    "gc_low_water_kb": 96,
+    # Extra alert rules, see alerts.py for the tuple layout
+    "alert_rules": [],
+}
+
+# Inclusive (min, max) of the numeric keys; a value outside is rejected
+_RANGES = {
+    "touch_x_min": (0, 4095),
+    "touch_x_max": (0, 4095),
+    "touch_y_min": (0, 4095),
+    "touch_y_max": (0, 4095),
+    "host_ram_gb": (1, 4096),
+    "temp_warm": (0, 150),
+    "temp_hot": (0, 150),
+    "sensor_stale_s": (10, 86400),
+    "idle_dim_s": (1, 86400),
+    "idle_off_s": (0, 86400),
+    "touch_irq_pin": (-1, 48),
+    "http_port": (0, 65535),
+    "weather_interval_s": (30, 86400),
+    "ping_interval_s": (1, 3600),
+    "forecast_ttl_s": (60, 604800),
+    "gc_low_water_kb": (16, 1024),
+}
+
+
+class ConfigError(ValueError):
+    """An update with an unknown key or a value outside its range."""
+
+    def __init__(self, key, value=None):
+        if key in DEFAULTS:
+            super().__init__(f"{key} out of range: {value}")
+        else:
+            super().__init__(f"unknown config key: {key}")
+
+
+class ConfigTypeError(TypeError):
+    """An update that is not an object, or a value of the wrong type."""
+
+    def __init__(self, key, value):
+        super().__init__(f"bad type for {key}: {value}")
+
+
+def _check_type(key, value):
+    default = DEFAULTS[key]
+    if isinstance(default, bool) or isinstance(value, bool):
+        ok = isinstance(default, bool) and isinstance(value, bool)
+    elif isinstance(default, float):
+        ok = isinstance(value, (int, float))
+    else:
+        ok = isinstance(value, type(default))
+    if not ok:
+        raise ConfigTypeError(key, value)
+
+
+class Config:
+    """Attribute-style config store backed by a JSON file."""
+
+    def __init__(self, path=_PATH):
+        self._path = path
+        self._listeners = []
+        self.set_topic = None
+        values = dict(DEFAULTS)
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+            values.update(self._validate(stored))
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Config: using defaults ({e})")
+        self._assign(values)
+
+    def _assign(self, values):
+        for key, value in values.items():
+            setattr(self, key, value)
+
+    @staticmethod
+    def _validate(update):
+        """
+        Return update if every key is known, well-typed and in range; raise
+        ConfigError (a ValueError) or ConfigTypeError (a TypeError) otherwise.
+        """
+        if not isinstance(update, dict):
+            raise ConfigTypeError("update", update)
+        for key, value in update.items():
+            if key not in DEFAULTS:
+                raise ConfigError(key)
+            _check_type(key, value)
+            if key in _RANGES and not _RANGES[key][0] <= value <= _RANGES[key][1]:
+                raise ConfigError(key, value)
+        return update
+
+    def as_dict(self):
+        return {key: getattr(self, key) for key in DEFAULTS}
+
+    def on_change(self, callback):
+        """Register callback(changed_keys) to run after an update is applied."""
+        self._listeners.append(callback)
+
+    def apply(self, update):
+        """Validate, persist and apply a partial update atomically."""
+        self._validate(update)
+        changed = [k for k, v in update.items() if getattr(self, k) != v]
+        if not changed:
+            return changed
+
+        merged = self.as_dict()
+        merged.update(update)
+        tmp = self._path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(merged, f)
+        os.rename(tmp, self._path)
+
+        self._assign(update)
+        print(f"Config updated: {changed}")
+        # The update is already persisted: a failing listener must not stop
+        # the others, among them the retained state publish
+        for callback in self._listeners:
+            try:
+                callback(changed)
+            except Exception as e:  # noqa: BLE001
+                print(f"Config listener failed: {e}")
+        return changed
+
+    def handle_message(self, topic, msg):
+        """MQTT callback for the config/{client_id}/set topic."""
+        if topic != self.set_topic:
+            return
+        try:
+            self.apply(json.loads(msg))
+        except (ValueError, TypeError, OSError) as e:
+            print(f"Config update rejected: {e}")
+
+
+cfg = Config()
@@ -1,12 +1,110 @@
 """
 Central data store for incoming MQTT messages.
 
-Parses payloads from host/monitor, vps/monitor, and Sensors/# topics
-and routes them to the appropriate UI screens.
+Parses payloads from host/+/monitor, vps/+/monitor, and Sensors/# topics
+and routes them to the appropriate UI screens. Host and VPS metrics may
+also arrive as compact binary frames (see payload_codec.py).
+
+host/monitor payloads carrying a "seq" use the delta mode described in
+payload_codec.py: deltas are merged into the host's slot in place, and a
+gap in the sequence triggers a retained keyframe request.
+
+Publishers may also keep their latest full state retained on
+<monitor topic>/snapshot. The snapshots arrive right after subscribing and
+fill the store before the first live message (see MQTT.drain()).
+
+Sensor values are also recorded in a SensorQuality (sensor_quality.py),
+which screens ask for staleness and plausibility at render time.
+
+Hosts are discovered from the topic: host/<id>/monitor creates a slot under
+data_store["host"][<id>] on its first message. The legacy single-host
+topics host/monitor and vps/monitor map to the ids "host" and "vps".
 """
 
 import ujson
 
+import payload_codec
+from sensor_quality import SensorQuality
+
+# Topics feeding the data store; snapshots first, so that retained live
+# messages (newer, if a publisher retains those too) are applied after them
+TOPICS = (
+    "host/monitor/snapshot",
+    "vps/monitor/snapshot",
+    "host/+/monitor/snapshot",
+    "vps/+/monitor/snapshot",
+    "Sensors/#",
+    "sensors/#",
+    "vps/monitor",
+    "host/monitor",
+    "vps/monitor/bin",
+    "host/monitor/bin",
+    "vps/+/monitor",
+    "host/+/monitor",
+    "vps/+/monitor/bin",
+    "host/+/monitor/bin",
+)
+
+# Upper bound on discovered hosts per section, keeps memory bounded
+_MAX_HOSTS = 16
+# Host fields a delta message may update
+_HOST_FIELDS = (
+    "cpu",
+    "cpu_temp",
+    "ram",
+    "ssd_temp",
+    "net_down",
+    "net_up",
+    "disk_read",
+    "disk_write",
+    "net",
+    "name",
+    "ram_total",
+)
+# Throughputs (KB/s) smoothed at ingest, and the EWMA weight of a new sample
+_RATE_FIELDS = ("net_down", "net_up", "disk_read", "disk_write")
+_RATE_ALPHA = 0.3
+# Upper bound on smoothed network interfaces per host
+_MAX_IFACES = 8
+# Repeat an unanswered keyframe request after this many further deltas
+_KEYFRAME_RETRY = 30
+
+
+class TooManyHostsError(ValueError):
+    """A new host beyond _MAX_HOSTS in one section."""
+
+    def __init__(self, section, host_id):
+        super().__init__(f"too many {section} entries, ignoring {host_id}")
+
+
+def _rate_pair(rates):
+    """(down, up) from a [down, up] net entry, or None if it is malformed."""
+    if not isinstance(rates, (list, tuple)) or len(rates) != 2:
+        return None
+    try:
+        return float(rates[0]), float(rates[1])
+    except (ValueError, TypeError):
+        return None
+
+
+def _smooth_ifaces(smoothed, ifaces):
+    """Update the per-interface [down, up] EWMAs in smoothed from ifaces."""
+    if len(smoothed) > len(ifaces):
+        for name in [name for name in smoothed if name not in ifaces]:
+            del smoothed[name]
+    for name, rates in ifaces.items():
+        # Skip malformed entries instead of failing before _touch()
+        rates = _rate_pair(rates)
+        if rates is None:
+            continue
+        down, up = rates
+        pair = smoothed.get(name)
+        if pair is not None:
+            pair[0] += _RATE_ALPHA * (down - pair[0])
+            pair[1] += _RATE_ALPHA * (up - pair[1])
+        elif len(smoothed) < _MAX_IFACES:
+            smoothed[name] = [down, up]
+
 
 class DataManager:
     """
@@ -14,16 +112,86 @@ class DataManager:
     Handles incoming MQTT messages and prepares them for the UI screens.
     """
 
-    def __init__(self):
+    def __init__(self, alerts=None):
+        # Optional AlertEngine, evaluated on every host/VPS sample
+        self.alerts = alerts
         # Structure:
-        # {'sensors': {'ID_Unit': {'label': '...', 'value': '...'}}, 'vps': {}}
+        # {'sensors': {'ID_Unit': {'label': '...', 'value': '...'}},
+        #  'vps': {'<id>': {...}}, 'host': {'<id>': {...}}}
         self.data_store = {"sensors": {}, "vps": {}, "host": {}}
+        # Stamped from one global counter on every update, so screens can
+        # skip redraws and two keys never share a nonzero revision
+        self._seq = 0
+        self._revisions = {"sensors": 0, "vps": 0, "host": 0}
+        self._host_revisions = {"vps": {}, "host": {}}
+        # Delta mode: host_id -> last sequence number merged, and the
+        # deltas seen since a keyframe was requested
+        self._delta_seq = {}
+        self._keyframe_wait = {}
+        self._keyframe_request = None
+        # Per-sensor update times, rates, min/max and plausibility
+        self.quality = SensorQuality()
+
+    def on_keyframe_request(self, callback):
+        """Register callback(topic, payload) publishing a keyframe request."""
+        self._keyframe_request = callback
 
     def get_all_data(self):
         """Return the entire data store."""
         return self.data_store
 
+    def revision(self, key):
+        """
+        Return the update revision of a data store section, or of a single
+        host when key is a (section, host_id) tuple.
+        """
+        if isinstance(key, tuple):
+            return self._host_revisions[key[0]].get(key[1], 0)
+        return self._revisions[key]
+
+    def _touch(self, key, host_id=None):
+        self._seq += 1
+        self._revisions[key] = self._seq
+        if host_id is not None:
+            self._host_revisions[key][host_id] = self._seq
+            if self.alerts is not None:
+                self.alerts.evaluate(key, host_id, self.data_store[key][host_id])
+
+    @staticmethod
+    def _parse_topic(topic):
+        """Return (section, host_id) for a host/vps monitor topic, else None."""
+        parts = topic.split("/")
+        if parts[-1] == "bin":
+            parts.pop()
+        if parts[-1] != "monitor" or parts[0] not in ("host", "vps"):
+            return None
+        if len(parts) == 2:
+            return parts[0], parts[0]
+        if len(parts) == 3:
+            return parts[0], parts[1]
+        return None
+
+    def _slot(self, section, host_id):
+        """Return the slot for a host, creating it on first sight."""
+        hosts = self.data_store[section]
+        slot = hosts.get(host_id)
+        if slot is None:
+            if len(hosts) >= _MAX_HOSTS:
+                raise TooManyHostsError(section, host_id)
+            slot = {}
+            hosts[host_id] = slot
+            print(f"DataManager: discovered {section} '{host_id}'")
+        return slot
+
     def process_message(self, topic, msg):
+        if topic.endswith(payload_codec.SNAPSHOT_SUFFIX):
+            # Same payloads as the monitor topic itself
+            topic = topic[: -len(payload_codec.SNAPSHOT_SUFFIX)]
+        target = self._parse_topic(topic)
+        if topic.endswith(payload_codec.TOPIC_SUFFIX) or payload_codec.is_binary(msg):
+            self._process_binary(target, msg)
+            return
+
         try:
             # Ensure bytes are decoded properly if necessary
             if isinstance(msg, bytes):
@@ -31,56 +199,146 @@ class DataManager:
 
             payload = ujson.loads(str(msg).strip())
 
-            if topic == "vps/monitor":
-                self._handle_vps_data(payload)
-            elif topic == "host/monitor":
-                self._handle_host_data(payload)
+            if target is not None:
+                section, host_id = target
+                if section == "vps":
+                    self._handle_vps_data(host_id, payload)
+                elif "seq" in payload:
+                    self._handle_host_delta(topic, host_id, payload)
+                else:
+                    self._handle_host_data(host_id, payload)
             # FIX: Allow sub-topics like 'Sensors/DHT11'
             elif topic == "Sensors" or topic.startswith("Sensors/"):
                 self._handle_sensor_data(payload)
         except (ValueError, TypeError) as e:
             print(f"DataManager JSON Error: {e} | Content: {msg}")
 
-    def _handle_vps_data(self, payload):
+    def _process_binary(self, target, msg):
+        """Decode a binary frame straight into the existing data store slots."""
+        try:
+            kind = payload_codec.frame_kind(msg)
+            if kind == payload_codec.KIND_HOST:
+                host_id = target[1] if target else "host"
+                slot = self._slot("host", host_id)
+                payload_codec.decode_host(msg, slot)
+                self._smooth_rates(slot)
+                self._touch("host", host_id)
+            elif kind == payload_codec.KIND_VPS:
+                host_id = target[1] if target else "vps"
+                payload_codec.decode_vps(msg, self._slot("vps", host_id))
+                self._touch("vps", host_id)
+        except (ValueError, TypeError, IndexError) as e:
+            print(f"DataManager binary frame error: {e}")
+
+    def _handle_vps_data(self, host_id, payload):
         """Process system metrics for the VPS screen."""
-        for key in ["cpu", "ram", "disk", "uptime"]:
+        slot = self._slot("vps", host_id)
+        for key in ["cpu", "ram", "disk", "uptime", "name"]:
             if key in payload:
-                self.data_store["vps"][key.upper()] = payload[key]
+                slot[key.upper()] = payload[key]
+        self._touch("vps", host_id)
 
-    def _handle_host_data(self, payload):
+    def _handle_host_data(self, host_id, payload):
         """
         Process host system metrics.
 
-        Expected payload:
+        Expected payload ("name", "ram_total" in GB and the per-interface
+        "net" are optional; throughputs in KB/s):
         {
+            "name": "Manjaro",
             "cpu": [34.3, 38.3, 34, 38.1],
             "cpu_temp": 91,
             "ram": 34.6,
+            "ram_total": 32,
             "ssd_temp": 30.85,
             "net_down": 4.59375,
-            "net_up": 2.3671875
+            "net_up": 2.3671875,
+            "disk_read": 120.5,
+            "disk_write": 33.0,
+            "net": {"eth0": [4.5, 2.3], "wlan0": [0.1, 0.0]}
         }
         """
-        self.data_store["host"] = {
-            "cpu": payload.get("cpu", [0, 0, 0, 0]),
-            "cpu_temp": payload.get("cpu_temp", 0),
-            "ram": payload.get("ram", 0),
-            "ssd_temp": payload.get("ssd_temp", 0),
-            "net_down": payload.get("net_down", 0),
-        }
+        slot = self._slot("host", host_id)
+        slot["cpu"] = payload.get("cpu", [0, 0, 0, 0])
+        slot["cpu_temp"] = payload.get("cpu_temp", 0)
+        slot["ram"] = payload.get("ram", 0)
+        slot["ssd_temp"] = payload.get("ssd_temp", 0)
+        for key in _RATE_FIELDS:
+            slot[key] = payload.get(key, 0)
+        for key in ("name", "ram_total", "net"):
+            if key in payload:
+                slot[key] = payload[key]
+        self._smooth_rates(slot)
+        self._touch("host", host_id)
+
+    @staticmethod
+    def _smooth_rates(slot):
+        """
+        Update the throughput EWMAs in slot["avg"] in place: the keys of
+        _RATE_FIELDS, and [down, up] per interface under avg["net"].
+        """
+        avg = slot.get("avg")
+        if avg is None:
+            avg = {"net": {}}
+            slot["avg"] = avg
+        for key in _RATE_FIELDS:
+            value = slot.get(key)
+            if value is None:
+                continue
+            value = float(value)
+            old = avg.get(key)
+            avg[key] = value if old is None else old + _RATE_ALPHA * (value - old)
+
+        ifaces = slot.get("net")
+        if ifaces and isinstance(ifaces, dict):
+            _smooth_ifaces(avg["net"], ifaces)
+
+    def _handle_host_delta(self, topic, host_id, payload):
+        """Process a delta-mode host message (see payload_codec.py)."""
+        seq = payload["seq"]
+        if payload.get("kf"):
+            self._handle_host_data(host_id, payload)
+            self._delta_seq[host_id] = seq
+            self._keyframe_wait.pop(host_id, None)
+            return
+
+        last = self._delta_seq.get(host_id)
+        if last is None:
+            # Nothing to merge onto before the first keyframe
+            self._request_keyframe(topic, host_id, None)
+            return
+        step = payload_codec.seq_step(last, seq)
+        if step == 0 or step > payload_codec.SEQ_MASK // 2:
+            return  # Duplicate or reordered, already superseded
+        self._delta_seq[host_id] = seq
+        slot = self._slot("host", host_id)
+        payload_codec.merge_delta(slot, payload, _HOST_FIELDS)
+        self._smooth_rates(slot)
+        self._touch("host", host_id)
+        if step > 1 or host_id in self._keyframe_wait:
+            # Fields carried only by the lost deltas stay stale until a keyframe
+            self._request_keyframe(topic, host_id, last)
+
+    def _request_keyframe(self, topic, host_id, last_seq):
+        """Ask the publisher for a keyframe, at most every _KEYFRAME_RETRY deltas."""
+        waited = self._keyframe_wait.get(host_id, _KEYFRAME_RETRY)
+        if waited < _KEYFRAME_RETRY:
+            self._keyframe_wait[host_id] = waited + 1
+            return
+        self._keyframe_wait[host_id] = 0
+        print(f"DataManager: requesting keyframe for host '{host_id}'")
+        if self._keyframe_request is not None:
+            self._keyframe_request(
+                topic + payload_codec.KEYFRAME_SUFFIX, {"last_seq": last_seq}
+            )
 
     def _handle_sensor_data(self, payload):
         """Process environmental data from ESP32."""
         # FIX: Directly parse the new incoming composite payload format
         if "temperature" in payload and "humidity" in payload:
-            self.data_store["sensors"]["DHT11_C"] = {
-                "label": "DHT11 Temp",
-                "value": f"{payload['temperature']} °C",
-            }
-            self.data_store["sensors"]["DHT11_Percent"] = {
-                "label": "DHT11 Hum",
-                "value": f"{payload['humidity']} %",
-            }
+            self._store_sensor("DHT11_C", "DHT11 Temp", payload["temperature"], "°C")
+            self._store_sensor("DHT11_Percent", "DHT11 Hum", payload["humidity"], "%")
+            self._touch("sensors")
             return
 
         # Fallback to legacy parsing if format matches older specifications
@@ -95,11 +353,12 @@ class DataManager:
         if value is not None:
             clean_unit = unit.replace("°", "").strip()
             storage_key = f"{sensor_id}_{clean_unit}"
+            self._store_sensor(storage_key, f"{sensor_id} ({unit})", value, unit)
+            self._touch("sensors")
 
-            self.data_store["sensors"][storage_key] = {
-                "label": f"{sensor_id} ({unit})",
-                "value": f"{value} {unit}",
-            }
+    def _store_sensor(self, key, label, value, unit):
+        self.quality.record(key, value, unit)
+        self.data_store["sensors"][key] = {"label": label, "value": f"{value} {unit}"}
 
     @staticmethod
     def _extract_value_and_unit(data):
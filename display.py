@@ -2,10 +2,20 @@
 """
 Display Manager for ESP32-S3 with ILI9341 + XPT2046 Touch.
 Navigation via direct touch polling instead of LVGL callbacks.
+
+Supports an unattended kiosk mode that rotates through the screens with
+animated transitions. The PWM backlight is left to idle.IdleManager, which
+dims it and switches it off when nobody touches the panel. Both can be
+controlled over MQTT. Alerts are shown in a banner on
+LVGL's top layer, above whichever screen is active.
 """
 
+import json
 import time
 
+# noinspection PyUnresolvedReferences
+import display_driver_framework
+
 # noinspection PyUnresolvedReferences
 import fs_driver
 
@@ -20,11 +30,39 @@ import lvgl as lv
 import machine
 from micropython import const
 
+import screenshot_codec
 import task_handler
+import theme
+import touch_affine
+from calibration_screen import CalibrationScreen
+from config import cfg
+from idle import IdleManager
+from memory import mem
+from screenshot import Screenshot
 
 _WIDTH = const(240)
 _HEIGHT = const(320)
 _NAV_HEIGHT = const(40)
+_BANNER_HEIGHT = const(22)
+# Two quarter-screen RGB565 draw buffers in PSRAM (double buffered flush)
+_DRAW_BUF_SIZE = const(_WIDTH * _HEIGHT * 2 // 4)
+
+# Kiosk mode and backlight
+_ANIM_MS = const(300)
+_DEFAULT_DWELL_MS = const(15000)
+_TOUCH_PAUSE_MS = const(60000)  # Rotation pause after the last touch
+_BACKLIGHT_ON = const(100)
+_BACKLIGHT_DIM = const(15)
+# Skip transitions if the loop interval (EWMA) exceeds this
+_FRAME_BUDGET_MS = const(80)
+
+# Touch: raw readings outside this range mean "not pressed"
+_RAW_MIN = const(50)
+_RAW_MAX = const(4000)
+# Mapped points further off-screen than this are rejected as noise
+_TOUCH_EDGE = const(8)
+# Holding a touch this long opens the calibration screen
+_CAL_HOLD_MS = const(5000)
 
 # Display pins
 _MOSI = const(18)
@@ -44,10 +82,6 @@ _T_MISO = const(10)
 if not lv.is_initialized():
     lv.init()
 
-# Backlight
-_bl_pin = machine.Pin(_BL, machine.Pin.OUT)
-_bl_pin.value(1)
-
 # Manual reset sequence
 print("Display RST...")
 _rst_pin = machine.Pin(_RST, machine.Pin.OUT)
@@ -68,12 +102,18 @@ _display_bus = lcd_bus.SPIBus(
     cs=_CS,
 )
 
+_fb1 = mem.framebuffer(_display_bus, _DRAW_BUF_SIZE)
+_fb2 = mem.framebuffer(_display_bus, _DRAW_BUF_SIZE) if _fb1 is not None else None
+
 driver = ili9341.ILI9341(
     data_bus=_display_bus,
     display_width=_WIDTH,
     display_height=_HEIGHT,
+    frame_buffer1=_fb1,
+    frame_buffer2=_fb2,
     reset_pin=None,
-    backlight_pin=None,
+    backlight_pin=_BL,
+    backlight_on_state=display_driver_framework.STATE_PWM,
     color_space=lv.COLOR_FORMAT.RGB565,
     color_byte_order=ili9341.BYTE_ORDER_BGR,
     rgb565_byte_swap=True,
@@ -83,7 +123,7 @@ driver.init(2)
 driver.set_color_inversion(True)
 # noinspection PyProtectedMember
 driver.set_rotation(lv.DISPLAY_ROTATION._0)
-driver.set_backlight(100)
+driver.set_backlight(_BACKLIGHT_ON)
 print("Display OK")
 
 # Filesystem registration for icon storage
@@ -116,12 +156,6 @@ _t_spi = machine.SoftSPI(
     miso=_t_miso,
 )
 
-# Calibration values
-_X_MIN = 288
-_X_MAX = 1866
-_Y_MIN = 246
-_Y_MAX = 1794
-
 
 def _read_touch_raw(cmd):
     _t_cs.value(0)
@@ -133,23 +167,60 @@ def _read_touch_raw(cmd):
     return ((buf[0] << 8) | buf[1]) >> 4
 
 
-def get_touch():
-    """Returns (x, y) if touched, else None."""
+def _load_affine():
+    """Fixed-point coefficients from the stored calibration or min/max values."""
+    if touch_affine.is_valid(cfg.touch_affine):
+        return tuple(cfg.touch_affine)
+    return touch_affine.to_fixed(
+        touch_affine.from_minmax(
+            cfg.touch_x_min, cfg.touch_x_max, cfg.touch_y_min, cfg.touch_y_max
+        )
+    )
+
+
+_affine = _load_affine()
+
+
+def _apply_config(changed):
+    global _affine
+    if any(key.startswith("touch_") for key in changed):
+        _affine = _load_affine()
+
+
+cfg.on_change(_apply_config)
+
+
+def read_touch():
+    """Returns the raw (x, y) reading if the panel is pressed, else None."""
     raw_x = _read_touch_raw(0x90)
+    if raw_x == 2047 or not _RAW_MIN < raw_x < _RAW_MAX:
+        return None
     raw_y = _read_touch_raw(0xD0)
+    if not _RAW_MIN < raw_y < _RAW_MAX:
+        return None
+    return raw_x, raw_y
+
 
-    if raw_x == 2047 or raw_x <= _X_MIN or raw_x >= _X_MAX:
+def to_screen(raw):
+    """Map a raw reading to (x, y) pixels; None if it lands off-screen."""
+    a, b, c, d, e, f = _affine
+    px = (a * raw[0] + b * raw[1] + c) >> touch_affine.SHIFT
+    py = (d * raw[0] + e * raw[1] + f) >> touch_affine.SHIFT
+    if not -_TOUCH_EDGE <= px < _WIDTH + _TOUCH_EDGE:
         return None
-    if raw_y <= _Y_MIN or raw_y >= _Y_MAX:
+    if not -_TOUCH_EDGE <= py < _HEIGHT + _TOUCH_EDGE:
         return None
-
-    px = int((_Y_MAX - raw_y) * 240 // (_Y_MAX - _Y_MIN))
-    py = int((raw_x - _X_MIN) * 320 // (_X_MAX - _X_MIN))
-    px = max(0, min(239, px))
-    py = max(0, min(319, py))
+    px = max(0, min(_WIDTH - 1, px))
+    py = max(0, min(_HEIGHT - 1, py))
     return px, py
 
 
+def get_touch():
+    """Returns (x, y) in pixels if touched, else None."""
+    raw = read_touch()
+    return None if raw is None else to_screen(raw)
+
+
 th = task_handler.TaskHandler()
 print("Touch OK")
 
@@ -157,19 +228,32 @@ print("Touch OK")
 class Display:
     """Manages multiple screens with touch navigation."""
 
-    _NAV_BG = 0x0A0E27
-    _BTN_ACTIVE = 0x00D9FF
-    _BTN_INACTIVE = 0x1A1F3A
-    _TEXT_ACTIVE = 0x000000
-    _TEXT_INACTIVE = 0xAAAAAA
-
-    def __init__(self):
+    def __init__(self, command_topic=None):
         self.screens = {}
         self.screen_order = []
         self.active_name = None
         self._nav_labels = {}
         self._was_touched = False
 
+        # MQTT topic for kiosk/backlight commands, see handle_command()
+        self.command_topic = command_topic
+
+        self.kiosk = False
+        self.dwell_ms = {}  # screen name -> dwell time, default _DEFAULT_DWELL_MS
+        now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        self._shown_at = now
+        self._last_touch = now
+        self._last_tick = now
+        self.loop_ms = 0  # EWMA of the interval between tick() calls
+        self.idle = IdleManager(driver.set_backlight, th, _BACKLIGHT_ON, _BACKLIGHT_DIM)
+        self._banner = None
+        self._alerting = False
+        self._calibration = None
+        self._touch_down = now
+        self._banner_label = None
+        self.screenshot = Screenshot(driver, _WIDTH, _HEIGHT)
+        self._on_show = []
+
     def add_screen(self, name, instance):
         self.screens[name] = instance
         self.screen_order.append(name)
@@ -191,10 +275,7 @@ class Display:
         nav = lv.obj(scr_obj)
         nav.set_size(_WIDTH, _NAV_HEIGHT)
         nav.set_pos(0, _HEIGHT - _NAV_HEIGHT)
-        nav.set_style_bg_color(lv.color_hex(self._NAV_BG), 0)
-        nav.set_style_border_width(0, 0)
-        nav.set_style_radius(0, 0)
-        nav.set_style_pad_all(2, 0)
+        theme.add(nav, theme.NAV, theme.FLAT)
         nav.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
 
         for i, sname in enumerate(self.screen_order):
@@ -203,44 +284,209 @@ class Display:
             btn = lv.obj(nav)
             btn.set_size(btn_width - 4, _NAV_HEIGHT - 4)
             btn.set_pos(i * btn_width + 2, 2)
-            btn.set_style_radius(6, 0)
-            btn.set_style_border_width(0, 0)
-            btn.set_style_bg_color(
-                lv.color_hex(self._BTN_ACTIVE if is_active else self._BTN_INACTIVE), 0
-            )
+            btn.add_style(theme.NAV_BTN_ACTIVE if is_active else theme.NAV_BTN, 0)
             btn.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
 
             lbl = lv.label(btn)
             lbl.set_text(sname)
-            lbl.set_style_text_color(
-                lv.color_hex(self._TEXT_ACTIVE if is_active else self._TEXT_INACTIVE), 0
-            )
+            if count > 4:
+                lbl.add_style(theme.SMALL, 0)
             lbl.center()
 
             btn_map[sname] = btn
 
         self._nav_labels[owner_name] = btn_map
 
-    def show_screen(self, name):
+    def replace_screen(self, name, instance):
+        """Swap in a freshly built screen, e.g. after the old one faulted."""
+        old = self.screens.get(name)
+        self.screens[name] = instance
+        self._build_nav(instance.get_screen(), name)
+        if self.active_name == name and self._calibration is None:
+            lv.screen_load(instance.get_screen())
+        if old is not None:
+            old.get_screen().delete()
+
+    def set_banner(self, text):
+        """
+        Show text in an alert banner above every screen; None hides it.
+        The backlight stays on while the banner is visible.
+        """
+        self._alerting = text is not None
+        if text is None:
+            if self._banner is not None:
+                self._banner.add_flag(lv.obj.FLAG.HIDDEN)
+            return
+        self.idle.wake()
+        if self._banner is None:
+            banner = lv.obj(lv.layer_top())
+            banner.set_size(_WIDTH, _BANNER_HEIGHT)
+            banner.set_pos(0, 0)
+            theme.add(banner, theme.ALERT, theme.FLAT)
+            banner.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
+            self._banner_label = lv.label(banner)
+            self._banner_label.add_style(theme.SMALL, 0)
+            self._banner_label.center()
+            self._banner = banner
+        self._banner_label.set_text(text)
+        self._banner.remove_flag(lv.obj.FLAG.HIDDEN)
+
+    def on_show(self, callback):
+        """
+        Register callback(name), called when name becomes the active screen
+        but before it is loaded, so it can render the latest state first.
+        """
+        self._on_show.append(callback)
+
+    def show_screen(self, name, animate=False):
         if name not in self.screens:
             return
-        lv.screen_load(self.screens[name].get_screen())
         self.active_name = name
+        if self._calibration is not None:
+            return  # Shown by _finish_calibration; touches go to calibration
+        # Catch up before the transition, not after it slid in stale content
+        for callback in self._on_show:
+            callback(name)
+        scr = self.screens[name].get_screen()
+        if animate and self.loop_ms <= _FRAME_BUDGET_MS:
+            lv.screen_load_anim(scr, lv.SCR_LOAD_ANIM.MOVE_LEFT, _ANIM_MS, 0, False)
+        else:
+            lv.screen_load(scr)
+        self._shown_at = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+
+    # --- Kiosk mode & backlight ---
+
+    def set_kiosk(self, enabled, dwell_ms=None):
+        """Enable/disable rotation. dwell_ms is an int or {screen: ms}."""
+        self.kiosk = enabled
+        if isinstance(dwell_ms, dict):
+            self.dwell_ms.update(dwell_ms)
+        elif dwell_ms:
+            for name in self.screen_order:
+                self.dwell_ms[name] = dwell_ms
+        self._shown_at = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        print(f"Kiosk mode {'on' if enabled else 'off'}")
+
+    def set_backlight(self, level):
+        self.idle.set_backlight(level)
+
+    def tick(self):
+        """Advance rotation and the idle state. Call once per main loop pass."""
+        now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        interval = time.ticks_diff(now, self._last_tick)  # ty:ignore[unresolved-attribute]
+        self._last_tick = now
+        self.loop_ms = (self.loop_ms * 7 + interval) // 8
+
+        idle = time.ticks_diff(now, self._last_touch)  # ty:ignore[unresolved-attribute]
+        # Rotating screens are meant to be seen: kiosk mode stops at dim
+        keep_on = self._alerting or self._calibration is not None
+        self.idle.update(now, idle, keep_on, may_sleep=not self.kiosk)
+
+        if self._calibration is not None:
+            return
+        if not self.kiosk or idle < _TOUCH_PAUSE_MS or not self.screen_order:
+            return
+        dwell = self.dwell_ms.get(self.active_name, _DEFAULT_DWELL_MS)
+        if time.ticks_diff(now, self._shown_at) >= dwell:  # ty:ignore[unresolved-attribute]
+            idx = self.screen_order.index(self.active_name) + 1
+            self.show_screen(self.screen_order[idx % len(self.screen_order)], True)
+
+    def handle_command(self, topic, msg):
+        """
+        MQTT callback for the command topic. Payload example:
+        {"kiosk": true, "dwell": 20000, "screen": "Host", "backlight": 60}
+        {"calibrate": true} opens the touch calibration screen.
+        {"screenshot": true} (RLE) or {"screenshot": "raw"} starts a capture.
+        """
+        if topic != self.command_topic:
+            return
+        cmd = json.loads(msg)
+        if "kiosk" in cmd or "dwell" in cmd:
+            self.set_kiosk(cmd.get("kiosk", self.kiosk), cmd.get("dwell"))
+        if "screen" in cmd:
+            self.show_screen(cmd["screen"], animate=True)
+        if "backlight" in cmd:
+            self.set_backlight(max(0, min(100, int(cmd["backlight"]))))
+        if cmd.get("calibrate"):
+            self.start_calibration()
+        if cmd.get("screenshot"):
+            raw = cmd["screenshot"] == "raw"
+            self.screenshot.start(
+                screenshot_codec.FORMAT_RAW if raw else screenshot_codec.FORMAT_RLE
+            )
+
+    # --- Touch calibration ---
+
+    def start_calibration(self):
+        """Show the 3-point calibration screen until all targets are tapped."""
+        if self._calibration is not None:
+            return
+        print("Touch calibration started")
+        self._calibration = CalibrationScreen(self._finish_calibration)
+        self.idle.wake()
+        lv.screen_load(self._calibration.get_screen())
+
+    def _finish_calibration(self, fixed):
+        """Persist the coefficients and return to the previous screen."""
+        cal = self._calibration
+        self._calibration = None
+        try:
+            cfg.apply({"touch_affine": list(fixed)})
+        except (ValueError, TypeError, OSError) as e:
+            print(f"Calibration not saved: {e}")
+        if self.active_name is not None:
+            # Includes a switch requested while calibrating
+            self.show_screen(self.active_name)
+        cal.get_screen().delete()
+        print(f"Touch calibration saved: {fixed}")
+
+    def _touch_content(self, x, y):
+        """
+        Pass a tap above the nav bar to the active screen's on_touch(x, y).
+        It may return (screen name, host id) to open a host on another screen.
+        """
+        handler = getattr(self.screens[self.active_name], "on_touch", None)
+        if handler is None:
+            return
+        target = handler(x, y)
+        if target is not None:
+            name, host_id = target
+            self.screens[name].select(host_id)
+            self.show_screen(name)
 
     def check_touch(self):
         """Poll touch and switch screen if nav bar is hit."""
-        touch = get_touch()
+        if self._calibration is not None:
+            self._calibration.feed(read_touch())
+            return
 
-        if touch is None:
+        raw = read_touch()
+
+        if raw is None:
             self._was_touched = False
             return
 
+        now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
         if self._was_touched:
+            # A long hold anywhere opens calibration, even if it maps off-screen
+            if time.ticks_diff(now, self._touch_down) >= _CAL_HOLD_MS:  # ty:ignore[unresolved-attribute]
+                self.start_calibration()
             return
 
+        self._was_touched = True
+        self._touch_down = now
+        self._last_touch = now
+        if self.idle.touched(now):
+            # First touch only wakes the panel
+            return
+
+        touch = to_screen(raw)
+        if touch is None:
+            return
         x, y = touch
 
         if y < (_HEIGHT - _NAV_HEIGHT):
+            self._touch_content(x, y)
             return
 
         count = len(self.screen_order)
@@ -253,5 +499,3 @@ class Display:
 
         if target != self.active_name:
             self.show_screen(target)
-
-        self._was_touched = True
@@ -0,0 +1,104 @@
+"""
+5-day / 3-hour forecast extraction and flash cache.
+
+The OpenWeatherMap /data/2.5/forecast response (about 16 KB for 40 steps)
+is streamed through json_stream, which keeps only timestamp, temperature,
+precipitation probability and condition of each step. They are condensed
+into the next few 3-hour steps and a per-day summary and cached in
+/forecast.json with the fetch time, so a reboot within the TTL shows the
+cached forecast without a new request.
+
+No MicroPython-only imports, so scripts/forecast_check.py can test it
+under CPython.
+"""
+
+import json
+import os
+import time
+
+from json_stream import ANY, SelectiveParser
+
+CACHE_PATH = "/forecast.json"
+HOURLY_COUNT = 8  # 3-hour steps, i.e. the next 24 hours
+DAILY_COUNT = 5
+
+# OWM timestamps are Unix seconds; the ESP32 port counts from 2000
+UNIX_OFFSET = 946684800 if time.gmtime(0)[0] == 2000 else 0
+
+_PATHS = (
+    ("list", ANY, "dt"),
+    ("list", ANY, "main", "temp"),
+    ("list", ANY, "pop"),
+    ("list", ANY, "weather", 0, "main"),
+)
+_FIELDS = {"dt": 0, "temp": 1, "pop": 2, "main": 3}
+
+
+def parse(stream, buf, localtime=time.localtime):
+    """
+    Stream-parse a forecast response into
+    {"hourly": [[hour, temp, pop%, condition], ...],
+     "daily": [[weekday, t_min, t_max, pop%, condition], ...]}.
+
+    localtime maps device-epoch seconds to a time tuple; pass ntp.localtime
+    on the device so days and hours follow the configured time zone.
+    """
+    steps = []
+
+    def on_value(path, value):
+        index = path[1]
+        while len(steps) <= index:
+            steps.append([0, 0.0, 0.0, ""])
+        steps[index][_FIELDS[path[-1]]] = value
+
+    SelectiveParser(_PATHS, buf).parse(stream, on_value)
+
+    hourly = []
+    daily = []
+    day = None
+    noon_distance = 24
+    for dt, temp, pop, condition in steps:
+        t = localtime(dt - UNIX_OFFSET)
+        pop = int(pop * 100 + 0.5)
+        if len(hourly) < HOURLY_COUNT:
+            hourly.append([t[3], temp, pop, condition])
+        if day is None or t[2] != day:
+            if len(daily) == DAILY_COUNT:
+                break
+            day = t[2]
+            noon_distance = 24
+            daily.append([t[6], temp, temp, pop, condition])
+        entry = daily[-1]
+        entry[1] = min(entry[1], temp)
+        entry[2] = max(entry[2], temp)
+        entry[3] = max(entry[3], pop)
+        if abs(t[3] - 12) < noon_distance:
+            # The day's condition is the one closest to midday
+            noon_distance = abs(t[3] - 12)
+            entry[4] = condition
+    return {"hourly": hourly, "daily": daily}
+
+
+def load_cache(path=CACHE_PATH):
+    """Return the cached forecast dict (with "fetched") or None."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if "fetched" not in data or "daily" not in data:
+        return None
+    return data
+
+
+def save_cache(data, path=CACHE_PATH):
+    """Write the forecast atomically (temp file, then rename)."""
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.rename(tmp, path)
+
+
+def is_fresh(data, now, ttl_s):
+    """True if data was fetched less than ttl_s seconds before now."""
+    return data is not None and 0 <= now - data["fetched"] < ttl_s
@@ -1,83 +1,238 @@
 # host_monitor_screen.py
 """
-Display local host (Manjaro) metrics on an LVGL screen.
-Shows per-core CPU bars, CPU/SSD temperature, RAM usage, and network speed.
+Display host metrics on an LVGL screen.
+Shows per-core CPU bars, CPU/SSD temperature, RAM usage, and network and
+disk throughput with a small two-series chart.
+
+One widget tree is shared by all discovered hosts: the screen renders the
+selected host, and tapping the title switches to the next one. CPU bars
+are pooled; the pool grows to the largest core count seen and surplus bars
+are hidden, so memory does not grow with the number of hosts.
+
+Throughputs are the EWMAs DataManager keeps in the host's "avg" dict.
+Tapping the chart cycles its source: all interfaces, each interface, disk.
 """
 
 # noinspection PyUnresolvedReferences
 import lvgl as lv
 
-COLOR_BG = 0x0A0E27
-COLOR_CARD_BG = 0x1A1F3A
-COLOR_CPU = 0x00D9FF
-COLOR_RAM = 0xFFB800
-COLOR_TEMP_GOOD = 0x2ECC71  # Green
-COLOR_TEMP_WARM = 0xFFB800  # Yellow/Orange
-COLOR_TEMP_HOT = 0xFF4500  # Red
+import theme
+from config import cfg
+from memory import mem
+from textbuf import LabelText
+
+_MAX_CORES = 32
+_CPU_TOP = 45
+_CPU_AREA_HEIGHT = 88  # Space above the temperature section
+_TITLE_TOUCH_HEIGHT = 40
+_IO_TOP = 214
+_CHART_POINTS = 40
+_CHART_MIN_TOP = 16  # KB/s; the scale doubles from here to fit the peak
+_IFACE_CHARS = 8
+# Font Awesome download/upload glyphs of the built-in Montserrat fonts
+_DOWN = b"\xef\x80\x99"
+_UP = b"\xef\x82\x93"
+
+
+def _rate(text, kb_per_s):
+    """Append a KB/s throughput with a KB/s, MB/s or GB/s unit."""
+    if kb_per_s < 1024:
+        return text.fixed(kb_per_s, 1).add(b" KB/s")
+    if kb_per_s < 1048576:
+        return text.fixed(kb_per_s / 1024, 2).add(b" MB/s")
+    return text.fixed(kb_per_s / 1048576, 2).add(b" GB/s")
 
 
 class HostMonitorScreen:
-    """LVGL screen for local Manjaro host monitoring."""
+    """LVGL screen for host monitoring, shared by all discovered hosts."""
+
+    # Render at the message rate
+    REFRESH_MS = 0
+    DATA_KEY = "host"  # Replaced by ("host", host_id) once a host is selected
 
     def __init__(self):
         self.screen = lv.obj()
-        self.screen.set_style_bg_color(lv.color_hex(COLOR_BG), 0)
+        self.screen.add_style(theme.SCREEN, 0)
+
+        self.host_id = None
+        self._hosts = []  # Sorted host ids as of the last render
+        self._title = None  # (name, index, count) shown in the title
 
         # Title
-        lbl = lv.label(self.screen)
-        lbl.set_text("Manjaro Host")
-        lbl.align(lv.ALIGN.TOP_MID, 0, 10)
+        self.title_label = lv.label(self.screen)
+        self.title_label.set_text_static("Waiting for hosts...")
+        self.title_label.align(lv.ALIGN.TOP_MID, 0, 10)
 
-        # CPU Section (4 Bars)
+        # CPU Section (pooled bars, laid out per core count)
         self.cpu_bars = []
-        for i in range(4):
-            bar = lv.bar(self.screen)
-            bar.set_size(180, 15)
-            bar.set_range(0, 100)
-            bar.align(lv.ALIGN.TOP_MID, 0, 45 + (i * 22))
-            bar.set_style_bg_color(lv.color_hex(COLOR_CARD_BG), lv.PART.MAIN)
-            bar.set_style_bg_color(lv.color_hex(COLOR_CPU), lv.PART.INDICATOR)
-            self.cpu_bars.append(bar)
-
-            label = lv.label(self.screen)
-            label.set_text(f"C{i}")
-            label.set_style_text_font(lv.font_montserrat_12, 0)
-            label.align_to(bar, lv.ALIGN.OUT_LEFT_MID, -8, 0)
+        self.cpu_labels = []
+        self._core_count = 0
+        self._layout_cores(4)
 
         # --- Temperature Section (before RAM) ---
         self.temp_info_label = lv.label(self.screen)
-        self.temp_info_label.set_style_text_font(lv.font_montserrat_12, 0)
+        self.temp_info_label.add_style(theme.SMALL, 0)
         self.temp_info_label.align(lv.ALIGN.TOP_LEFT, 30, 135)
         self.temp_info_label.set_text("CPU: --\xb0C  |  SSD: --\xb0C")
+        self.temp_text = LabelText(self.temp_info_label)
 
         self.temp_bar = lv.bar(self.screen)
         self.temp_bar.set_size(180, 12)
         self.temp_bar.set_range(0, 100)
         self.temp_bar.align(lv.ALIGN.TOP_MID, 0, 155)
-        self.temp_bar.set_style_bg_color(lv.color_hex(COLOR_CARD_BG), lv.PART.MAIN)
-        self.temp_bar.set_style_bg_color(
-            lv.color_hex(COLOR_TEMP_GOOD), lv.PART.INDICATOR
-        )
+        self.temp_bar.add_style(theme.BAR, lv.PART.MAIN)
+        self._temp_style = theme.TEMP_GOOD
+        self.temp_bar.add_style(self._temp_style, lv.PART.INDICATOR)
 
         # RAM Section
         self.ram_label = lv.label(self.screen)
-        self.ram_label.set_style_text_font(lv.font_montserrat_12, 0)
+        self.ram_label.add_style(theme.SMALL, 0)
         self.ram_label.align(lv.ALIGN.TOP_LEFT, 30, 175)
+        self.ram_text = LabelText(self.ram_label)
 
         self.ram_bar = lv.bar(self.screen)
         self.ram_bar.set_size(180, 15)
         self.ram_bar.align(lv.ALIGN.TOP_MID, 0, 195)
-        self.ram_bar.set_style_bg_color(lv.color_hex(COLOR_CARD_BG), lv.PART.MAIN)
-        self.ram_bar.set_style_bg_color(lv.color_hex(COLOR_RAM), lv.PART.INDICATOR)
+        self.ram_bar.add_style(theme.BAR, lv.PART.MAIN)
+        self.ram_bar.add_style(theme.BAR_RAM, lv.PART.INDICATOR)
+
+        # I/O Section: chart of the selected source, network and disk lines
+        chart = lv.chart(self.screen)
+        chart.set_size(180, 32)
+        chart.align(lv.ALIGN.TOP_MID, 0, _IO_TOP)
+        chart.set_type(lv.chart.TYPE.LINE)
+        chart.set_update_mode(lv.chart.UPDATE_MODE.SHIFT)
+        chart.set_point_count(_CHART_POINTS)
+        chart.set_div_line_count(0, 0)
+        chart.add_style(theme.CHART, lv.PART.MAIN)
+        chart.add_style(theme.CHART_SERIES, lv.PART.ITEMS)
+        chart.add_style(theme.CHART_SERIES, lv.PART.INDICATOR)
+        self.io_chart = chart
+        self._down_series = chart.add_series(
+            theme.color("primary"), lv.chart.AXIS.PRIMARY_Y
+        )
+        self._up_series = chart.add_series(
+            theme.color("accent"), lv.chart.AXIS.PRIMARY_Y
+        )
+        self._series_mode = theme.mode
+        # Preallocated once; a rebuilt screen reuses (and clears) the same rings
+        self._history = (
+            mem.ring("io_down", _CHART_POINTS, "l"),
+            mem.ring("io_up", _CHART_POINTS, "l"),
+        )
+        self._history_pos = 0
+        self._clear_chart()
+        self._chart_top = 0
+        self._ifaces = []  # Sorted interface names as of the last render
+        self._source = 0  # 0: all interfaces, 1..n: one interface, n+1: disk
+        self._source_shown = None
+        self._net_prefix = b"Net"
 
-        # Network Section
         self.net_label = lv.label(self.screen)
-        self.net_label.align(lv.ALIGN.BOTTOM_MID, 0, -55)
+        self.net_label.add_style(theme.SMALL, 0)
+        self.net_label.align(lv.ALIGN.TOP_LEFT, 30, _IO_TOP + 35)
+        self.net_text = LabelText(self.net_label, 48)
+
+        self.disk_label = lv.label(self.screen)
+        self.disk_label.add_style(theme.SMALL, 0)
+        self.disk_label.align(lv.ALIGN.TOP_LEFT, 30, _IO_TOP + 50)
+        self.disk_text = LabelText(self.disk_label, 48)
+
+    def _add_core(self, index):
+        bar = lv.bar(self.screen)
+        bar.set_range(0, 100)
+        bar.add_style(theme.BAR, lv.PART.MAIN)
+        bar.add_style(theme.BAR_CPU, lv.PART.INDICATOR)
+        self.cpu_bars.append(bar)
+
+        label = lv.label(self.screen)
+        label.set_text(f"C{index}")
+        label.add_style(theme.SMALL, 0)
+        self.cpu_labels.append(label)
+
+    def _layout_cores(self, count):
+        """Arrange the pooled CPU bars for count cores, one or two columns."""
+        count = max(1, min(count, _MAX_CORES))
+        if count == self._core_count:
+            return
+        self._core_count = count
+        while len(self.cpu_bars) < count:
+            self._add_core(len(self.cpu_bars))
+
+        cols = 1 if count <= 4 else 2
+        rows = (count + cols - 1) // cols
+        pitch = min(22, _CPU_AREA_HEIGHT // rows)
+        width = 180 if cols == 1 else 88
+        show_labels = cols == 1
+        for i, bar in enumerate(self.cpu_bars):
+            label = self.cpu_labels[i]
+            if i >= count:
+                bar.add_flag(lv.obj.FLAG.HIDDEN)
+                label.add_flag(lv.obj.FLAG.HIDDEN)
+                continue
+            x = 0 if cols == 1 else (-47 if i < rows else 47)
+            bar.set_size(width, max(3, pitch - 7))
+            bar.align(lv.ALIGN.TOP_MID, x, _CPU_TOP + (i % rows) * pitch)
+            bar.remove_flag(lv.obj.FLAG.HIDDEN)
+            if show_labels:
+                label.align_to(bar, lv.ALIGN.OUT_LEFT_MID, -8, 0)
+                label.remove_flag(lv.obj.FLAG.HIDDEN)
+            else:
+                label.add_flag(lv.obj.FLAG.HIDDEN)
+
+    def select(self, host_id):
+        """Show host_id in the shared widget tree from the next render on."""
+        self.host_id = host_id
+        self.DATA_KEY = ("host", host_id)
 
-    def update_values(self, cpu_list, ram_perc, net_speed, cpu_temp, ssd_temp):
-        """Update UI with host metrics."""
+    def on_touch(self, _x, y):
+        """
+        Tapping the title cycles through the discovered hosts, tapping the
+        I/O section through the chart sources (from the next sample on).
+        """
+        if y < _TITLE_TOUCH_HEIGHT and len(self._hosts) > 1:
+            idx = self._hosts.index(self.host_id)
+            self.select(self._hosts[(idx + 1) % len(self._hosts)])
+            self._source_shown = None  # Restart the chart for the new host
+        elif y >= _IO_TOP:
+            self._source += 1
+
+    def render(self, data_mgr):
+        hosts = data_mgr.data_store.get("host", {})
+        if not hosts:
+            return
+        if len(hosts) != len(self._hosts):
+            self._hosts = sorted(hosts)
+        if self.host_id not in hosts:
+            self.select(self._hosts[0])
+        h_data = hosts[self.host_id]
+
+        name = h_data.get("name", self.host_id)
+        idx = self._hosts.index(self.host_id) + 1
+        count = len(self._hosts)
+        shown = self._title
+        if shown is None or shown[0] != name or shown[1] != idx or shown[2] != count:
+            # Rebuilt only when it changes, not on every sample
+            self._title = (name, idx, count)
+            title = f"{name}  {idx}/{count}" if count > 1 else name
+            self.title_label.set_text(title)
+
+        self.update_values(
+            h_data.get("cpu", [0, 0, 0, 0]),
+            h_data.get("ram", 0),
+            h_data.get("cpu_temp", 0),
+            h_data.get("ssd_temp", 0),
+            h_data.get("ram_total"),
+        )
+        avg = h_data.get("avg")
+        if avg is not None:
+            self.update_io(avg)
+
+    def update_values(self, cpu_list, ram_perc, cpu_temp, ssd_temp, ram_total=None):
+        """Update UI with host metrics. ram_total (GB) defaults to the config."""
         # CPU Update
-        for i in range(min(len(cpu_list), 4)):
+        self._layout_cores(len(cpu_list))
+        for i in range(min(len(cpu_list), self._core_count)):
             self.cpu_bars[i].set_value(int(cpu_list[i]), True)
 
         # CPU Temp Update with color change
@@ -85,36 +240,98 @@ class HostMonitorScreen:
         self.temp_bar.set_value(t_val, True)
 
         # Update combined temp info label
-        ssd_str = "{:.1f}\xb0C".format(ssd_temp) if ssd_temp else "--\xb0C"
-        self.temp_info_label.set_text("CPU: {}\xb0C  |  SSD: {}".format(t_val, ssd_str))
+        text = self.temp_text.begin().add(b"CPU: ").num(t_val)
+        text.add(b"\xc2\xb0C  |  SSD: ")
+        if ssd_temp:
+            text.fixed(ssd_temp, 1)
+        else:
+            text.add(b"--")
+        text.add(b"\xc2\xb0C").commit()
 
-        if t_val < 55:
-            color = COLOR_TEMP_GOOD
-        elif t_val < 75:
-            color = COLOR_TEMP_WARM
+        if t_val < cfg.temp_warm:
+            style = theme.TEMP_GOOD
+        elif t_val < cfg.temp_hot:
+            style = theme.TEMP_WARM
         else:
-            color = COLOR_TEMP_HOT
-        self.temp_bar.set_style_bg_color(lv.color_hex(color), lv.PART.INDICATOR)
+            style = theme.TEMP_HOT
+        self._temp_style = theme.swap(
+            self.temp_bar, self._temp_style, style, lv.PART.INDICATOR
+        )
 
         # RAM Update
         try:
             r_val = float(ram_perc)
             self.ram_bar.set_value(int(r_val), True)
-            used_gb = (r_val / 100) * 32
-            self.ram_label.set_text("RAM: {:.1f}GB / 32GB".format(used_gb))
+            total_gb = ram_total or cfg.host_ram_gb
+            used_gb = (r_val / 100) * total_gb
+            self.ram_text.begin().add(b"RAM: ").fixed(used_gb, 1).add(b"GB / ")
+            self.ram_text.fixed(total_gb, 0).add(b"GB").commit()
         except (ValueError, TypeError):
             pass
 
-        # Network Update
-        try:
-            speed = float(net_speed)
-            if speed > 1024:
-                speed_text = "{:.2f} MB/s".format(speed / 1024)
-            else:
-                speed_text = "{:.1f} KB/s".format(speed)
-            self.net_label.set_text("Download: " + speed_text)
-        except (ValueError, TypeError):
-            pass
+    def update_io(self, avg):
+        """Update the network/disk lines and the chart from smoothed rates."""
+        ifaces = avg.get("net", {})
+        # Same count is not enough: an interface may have been renamed
+        if len(ifaces) != len(self._ifaces) or any(
+            name not in ifaces for name in self._ifaces
+        ):
+            self._ifaces = sorted(ifaces)
+        disk = len(self._ifaces) + 1
+        source = self._source % (disk + 1)
+        if source != self._source_shown:
+            self._source_shown = source
+            name = self._ifaces[source - 1] if 0 < source < disk else "Net"
+            self._net_prefix = name[:_IFACE_CHARS].encode()
+            self._clear_chart()
+
+        pair = ifaces.get(self._ifaces[source - 1]) if 0 < source < disk else None
+        down, up = pair or (avg.get("net_down", 0), avg.get("net_up", 0))
+        read, write = avg.get("disk_read", 0), avg.get("disk_write", 0)
+
+        text = self.net_text.begin().add(self._net_prefix)
+        _rate(text.add(b" ").add(_DOWN).add(b" "), down)
+        _rate(text.add(b"  ").add(_UP).add(b" "), up)
+        text.commit()
+        text = self.disk_text.begin().add(b"Disk R ")
+        _rate(text, read).add(b"  W ")
+        _rate(text, write).commit()
+
+        if self._series_mode != theme.mode:
+            self._series_mode = theme.mode
+            self.io_chart.set_series_color(self._down_series, theme.color("primary"))
+            self.io_chart.set_series_color(self._up_series, theme.color("accent"))
+        if source == disk:
+            self._push_chart(read, write)
+        else:
+            self._push_chart(down, up)
+
+    def _clear_chart(self):
+        for history in self._history:
+            for i in range(_CHART_POINTS):
+                history[i] = 0
+        self.io_chart.set_all_value(self._down_series, 0)
+        self.io_chart.set_all_value(self._up_series, 0)
+
+    def _push_chart(self, down, up):
+        """Append one point per series; rescale when the peak needs it."""
+        down = int(down)
+        up = int(up)
+        downs, ups = self._history
+        pos = self._history_pos
+        downs[pos] = down
+        ups[pos] = up
+        self._history_pos = (pos + 1) % _CHART_POINTS
+
+        peak = max(max(downs), max(ups))
+        top = _CHART_MIN_TOP
+        while top < peak:
+            top <<= 1
+        if top != self._chart_top:
+            self._chart_top = top
+            self.io_chart.set_range(lv.chart.AXIS.PRIMARY_Y, 0, top)
+        self.io_chart.set_next_value(self._down_series, down)
+        self.io_chart.set_next_value(self._up_series, up)
 
     def get_screen(self):
         return self.screen
@@ -0,0 +1,230 @@
+"""
+Idle power management: backlight, LVGL tick rate and light sleep.
+
+The panel moves through three states by the time since the last touch:
+
+    active  backlight on, LVGL ticks every 5 ms
+    dim     backlight dimmed after cfg.idle_dim_s
+    off     backlight off after cfg.idle_off_s; screens are not rendered
+            and the main loop light-sleeps between passes
+
+Outside of active the LVGL tick slows down while nothing animates. A touch
+wakes the panel from any state, and that first touch only wakes it. An
+alert banner also turns the backlight on. Incoming data does not.
+
+While off, the loop sleeps in slices. With cfg.idle_light_sleep set it
+uses machine.lightsleep(), otherwise a poll() on the MQTT socket. The
+XPT2046 PENIRQ line, if wired to cfg.touch_irq_pin, ends a light sleep at
+once. Without it a touch waits for the end of the slice, which bounds the
+wake latency. MQTT data ends a poll() early. Light sleep cannot watch the
+socket, so the socket is checked before each slice and data that arrived
+during one is read right after it.
+
+stats() reports the time per state, the measured wake latency and the
+average current modelled from both; main.py serves it as /idle.
+"""
+
+import time
+
+try:
+    import select
+except ImportError:
+    select = None
+
+try:
+    import esp32
+    import machine
+except ImportError:
+    esp32 = machine = None
+
+from config import cfg
+
+ACTIVE = "active"
+DIM = "dim"
+OFF = "off"
+
+# LVGL tick period per state while nothing animates
+_TICK_MS = {ACTIVE: 5, DIM: 20, OFF: 200}
+# Sleep slice while off: without a touch IRQ it bounds the wake latency,
+# with one it bounds the MQTT latency and keeps the ping schedule
+_SLICE_MS = 100  # Shorter than a tap, so none is missed
+_IRQ_SLICE_MS = 1000
+
+# Assumed currents (mA) for the model in stats(), typical for this board
+_CPU_AWAKE_MA = 80  # ESP32-S3 at 240 MHz, Wi-Fi associated
+_CPU_SLEEP_MA = 2  # Light sleep with PSRAM retained
+_PANEL_MA = 6  # ILI9341 logic and XPT2046
+_BACKLIGHT_MA = 60  # At 100 %, linear in the PWM level
+
+
+def _wait_readable(sock, timeout_ms):
+    """True if sock has data within timeout_ms; just sleeps without a sock."""
+    if sock is None or select is None:
+        if timeout_ms:
+            time.sleep_ms(timeout_ms)  # ty:ignore[unresolved-attribute]
+        return False
+    poller = select.poll()
+    poller.register(sock, select.POLLIN)
+    return bool(poller.poll(timeout_ms))
+
+
+class IdleManager:
+    """Backlight, LVGL tick and sleep policy for when nobody looks."""
+
+    def __init__(self, backlight, task_handler, on_level, dim_level):
+        self._backlight = backlight  # Sets the PWM level, 0..100
+        self.task_handler = task_handler
+        self.on_level = on_level
+        self.dim_level = dim_level
+        self.state = ACTIVE
+        self.wakes = 0
+        self._level = on_level
+        now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        self._mark = now
+        self._resumed = now  # End of the last sleep
+        self._ms = {ACTIVE: 0, DIM: 0, OFF: 0}
+        self._asleep_ms = 0
+        self._level_ms = 0  # Backlight level x ms
+        self._wake_max = 0
+        self._wake_avg = 0
+        self._touch_irq = None
+        self._setup_irq()
+        cfg.on_change(self._apply_config)
+
+    def _setup_irq(self):
+        if esp32 is None:
+            return
+        if cfg.touch_irq_pin < 0:
+            if self._touch_irq is not None:
+                esp32.wake_on_ext0(pin=None, level=esp32.WAKEUP_ALL_LOW)
+            self._touch_irq = None
+            return
+        # PENIRQ is open drain and pulled low while the panel is pressed
+        pin = machine.Pin(cfg.touch_irq_pin, machine.Pin.IN, machine.Pin.PULL_UP)
+        esp32.wake_on_ext0(pin=pin, level=esp32.WAKEUP_ALL_LOW)
+        self._touch_irq = pin
+
+    def _apply_config(self, changed):
+        if "touch_irq_pin" in changed:
+            self._setup_irq()
+
+    @property
+    def is_off(self):
+        return self.state == OFF
+
+    def set_backlight(self, level):
+        if level != self._level:
+            self._account(time.ticks_ms())  # ty:ignore[unresolved-attribute]
+            self._backlight(level)
+            self._level = level
+
+    # --- State ---
+
+    def touched(self, now):
+        """Report a touch; True if it only woke the panel."""
+        if self.state == ACTIVE:
+            return False
+        was_off = self.state == OFF
+        self._enter(ACTIVE, now)
+        if was_off:
+            self._record_wake()
+        return True
+
+    def wake(self):
+        """Backlight on without a touch, e.g. for an alert banner."""
+        if self.state != ACTIVE:
+            self._enter(ACTIVE, time.ticks_ms())  # ty:ignore[unresolved-attribute]
+
+    def update(self, now, idle_ms, keep_on=False, may_sleep=True):
+        """
+        Pick the state for idle_ms since the last touch. keep_on holds the
+        backlight on (alerts, calibration); may_sleep=False stops at dim.
+        Call once per main loop pass.
+        """
+        if keep_on or idle_ms < cfg.idle_dim_s * 1000:
+            state = ACTIVE
+        elif may_sleep and cfg.idle_off_s and idle_ms >= cfg.idle_off_s * 1000:
+            state = OFF
+        else:
+            state = DIM
+        if state != self.state:
+            self._enter(state, now)
+        busy = self.state == ACTIVE or self.task_handler.animating()
+        self.task_handler.set_period(_TICK_MS[ACTIVE if busy else self.state])
+
+    def _enter(self, state, now):
+        self._account(now)
+        self.state = state
+        self.set_backlight({ACTIVE: self.on_level, DIM: self.dim_level, OFF: 0}[state])
+
+    def _record_wake(self):
+        """Time from the end of the last sleep to the backlight being on."""
+        latency = time.ticks_diff(time.ticks_ms(), self._resumed)  # ty:ignore[unresolved-attribute]
+        self.wakes += 1
+        self._wake_max = max(self._wake_max, latency)
+        self._wake_avg = (self._wake_avg * 7 + latency) // 8
+
+    # --- Sleep ---
+
+    def sleep(self, ms, sock=None):
+        """
+        Wait between two loop passes: ms while the panel is on, one slice
+        while it is off. Returns early when sock has data to read.
+        """
+        if self.state != OFF:
+            time.sleep_ms(ms)  # ty:ignore[unresolved-attribute]
+        elif not self._light_sleep():
+            _wait_readable(sock, _SLICE_MS)
+        elif not _wait_readable(sock, 0):
+            start = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+            machine.lightsleep(_IRQ_SLICE_MS if self._irq_wakes() else _SLICE_MS)
+            self._asleep_ms += time.ticks_diff(time.ticks_ms(), start)  # ty:ignore[unresolved-attribute]
+        self._resumed = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+
+    def _light_sleep(self):
+        return machine is not None and cfg.idle_light_sleep
+
+    def _irq_wakes(self):
+        """True if a touch ends the sleep at once."""
+        return self._touch_irq is not None and self._light_sleep()
+
+    # --- Model ---
+
+    def _account(self, now):
+        elapsed = time.ticks_diff(now, self._mark)  # ty:ignore[unresolved-attribute]
+        if elapsed > 0:
+            self._ms[self.state] += elapsed
+            self._level_ms += elapsed * self._level
+        self._mark = now
+
+    def stats(self):
+        """Time per state, wake latency and the modelled average current."""
+        self._account(time.ticks_ms())  # ty:ignore[unresolved-attribute]
+        ms = self._ms
+        total = max(1, ms[ACTIVE] + ms[DIM] + ms[OFF])
+        awake = total - self._asleep_ms
+        current = (
+            awake * _CPU_AWAKE_MA
+            + self._asleep_ms * _CPU_SLEEP_MA
+            + self._level_ms * _BACKLIGHT_MA / 100
+        ) / total + _PANEL_MA
+        # The same time without the idle manager: awake, dimmed instead of off
+        dimmed = (ms[DIM] + ms[OFF]) * self.dim_level
+        before_level_ms = ms[ACTIVE] * self.on_level + dimmed
+        before = (
+            _CPU_AWAKE_MA + _PANEL_MA + before_level_ms * _BACKLIGHT_MA / 100 / total
+        )
+        return {
+            "state": self.state,
+            "active_s": ms[ACTIVE] // 1000,
+            "dim_s": ms[DIM] // 1000,
+            "off_s": ms[OFF] // 1000,
+            "asleep_s": self._asleep_ms // 1000,
+            "wakes": self.wakes,
+            "wake_ms_avg": self._wake_avg,
+            "wake_ms_max": self._wake_max,
+            # Worst case from the touch: plus a whole slice without the IRQ
+            "wake_bound_ms": self._wake_max + (0 if self._irq_wakes() else _SLICE_MS),
+            "current_ma": round(current, 1),
+            "current_ma_before": round(before, 1),
+        }
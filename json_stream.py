@@ -0,0 +1,288 @@
+"""
+Streaming, field-selective JSON parser.
+
+Reads a JSON document from any object with readinto() (a socket, an HTTP
+response) through one small reusable buffer and reports only the values at
+selected paths. Nothing else is decoded: unselected values are skipped
+byte by byte, so a 20 KB API response never exists as a string or a dict.
+
+Paths are tuples of object keys and array indices; ANY matches every key
+or index at that level:
+
+    ("list", ANY, "main", "temp")
+    ("list", ANY, "weather", 0, "icon")
+
+on_value(path, value) receives the live path list (copy it to keep it).
+Selected paths must end at scalars; containers found there are skipped.
+Malformed or truncated input raises JSONError, a ValueError.
+
+No MicroPython-only imports, so scripts/forecast_check.py can test it
+under CPython.
+"""
+
+ANY = "*"
+
+_QUOTE = 0x22
+_BACKSLASH = 0x5C
+_COLON = 0x3A
+_COMMA = 0x2C
+_LBRACE = 0x7B
+_RBRACE = 0x7D
+_LBRACKET = 0x5B
+_RBRACKET = 0x5D
+_WHITESPACE = b" \t\r\n"
+_SCALAR_END = b" \t\r\n,}]"
+_ESCAPES = {0x62: 0x08, 0x66: 0x0C, 0x6E: 0x0A, 0x72: 0x0D, 0x74: 0x09}
+
+
+class JSONError(ValueError):
+    """Malformed JSON: none of the bytes in expected at pos; b"": it ended."""
+
+    def __init__(self, expected=b"", pos=0):
+        if not expected:
+            super().__init__("unexpected end of JSON")
+            return
+        wanted = " or ".join("'" + chr(c) + "'" for c in expected)
+        super().__init__(f"expected {wanted} at byte {pos}")
+
+
+def compile_paths(paths):
+    """Build the lookup trie: nested dicts, True marks a selected leaf."""
+    trie = {}
+    for path in paths:
+        node = trie
+        for part in path[:-1]:
+            node = node.setdefault(part, {})
+        node[path[-1]] = True
+    return trie
+
+
+class SelectiveParser:
+    """Reusable parser for one set of paths and one read buffer."""
+
+    def __init__(self, paths, buf):
+        self._trie = compile_paths(paths)
+        self._buf = buf
+        self._mv = memoryview(buf)
+        self._stream = None
+        self._on_value = None
+        self._path = []
+        self._pos = 0
+        self._end = 0
+
+    def parse(self, stream, on_value):
+        """Parse one document from stream, calling on_value per selected value."""
+        self._stream = stream
+        self._on_value = on_value
+        self._path = []
+        self._pos = self._end = 0
+        try:
+            self._value(self._trie)
+        finally:
+            self._stream = None
+            self._on_value = None
+
+    # --- Buffer access ---
+
+    def _fill(self):
+        n = self._stream.readinto(self._mv)
+        if not n:
+            raise JSONError
+        self._pos = 0
+        self._end = n
+
+    def _next(self):
+        if self._pos >= self._end:
+            self._fill()
+        c = self._buf[self._pos]
+        self._pos += 1
+        return c
+
+    def _peek(self):
+        """Return the next non-whitespace byte without consuming it."""
+        while True:
+            if self._pos >= self._end:
+                self._fill()
+            c = self._buf[self._pos]
+            if c not in _WHITESPACE:
+                return c
+            self._pos += 1
+
+    def _expect(self, byte):
+        if self._peek() != byte:
+            raise JSONError(bytes((byte,)), self._pos)
+        self._pos += 1
+
+    # --- Selected values ---
+
+    def _value(self, node):
+        c = self._peek()
+        if c == _LBRACE or c == _LBRACKET:
+            if node is True:
+                self._skip()
+            elif c == _LBRACE:
+                self._object(node)
+            else:
+                self._array(node)
+        elif node is True:
+            self._on_value(self._path, self._scalar(c))
+        else:
+            self._skip()
+
+    def _member(self, node, key):
+        child = node.get(key)
+        if child is None:
+            child = node.get(ANY)
+        if child is None:
+            self._skip()
+        else:
+            self._path.append(key)
+            self._value(child)
+            self._path.pop()
+
+    def _object(self, node):
+        self._pos += 1
+        if self._peek() == _RBRACE:
+            self._pos += 1
+            return
+        while True:
+            self._expect(_QUOTE)
+            key = self._string()
+            self._expect(_COLON)
+            self._member(node, key)
+            c = self._peek()
+            self._pos += 1
+            if c == _RBRACE:
+                return
+            if c != _COMMA:
+                raise JSONError(b",}", self._pos)
+
+    def _array(self, node):
+        self._pos += 1
+        if self._peek() == _RBRACKET:
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            self._member(node, index)
+            index += 1
+            c = self._peek()
+            self._pos += 1
+            if c == _RBRACKET:
+                return
+            if c != _COMMA:
+                raise JSONError(b",]", self._pos)
+
+    def _string(self):
+        """Decode a string whose opening quote was consumed."""
+        out = bytearray()
+        while True:
+            c = self._next()
+            if c == _QUOTE:
+                return str(out, "utf-8")
+            if c == _BACKSLASH:
+                c = self._next()
+                if c == 0x75:  # \uXXXX
+                    digits = bytes(self._next() for _ in range(4))
+                    out.extend(chr(int(str(digits, "ascii"), 16)).encode())
+                    continue
+                c = _ESCAPES.get(c, c)
+            out.append(c)
+
+    def _scalar(self, c):
+        if c == _QUOTE:
+            self._pos += 1
+            return self._string()
+        out = bytearray()
+        while True:
+            if self._pos >= self._end:
+                self._fill()
+            c = self._buf[self._pos]
+            if c in _SCALAR_END:
+                break
+            out.append(c)
+            self._pos += 1
+        text = str(out, "ascii")
+        if text == "true":
+            return True
+        if text == "false":
+            return False
+        if text == "null":
+            return None
+        if "." in text or "e" in text or "E" in text:
+            return float(text)
+        return int(text)
+
+    # --- Skipping ---
+
+    def _skip(self):
+        """Skip one value without decoding it."""
+        c = self._peek()
+        if c == _QUOTE:
+            self._pos += 1
+            self._skip_string()
+        elif c == _LBRACE or c == _LBRACKET:
+            self._pos += 1
+            self._skip_container()
+        else:
+            self._skip_scalar()
+
+    def _skip_scalar(self):
+        while True:
+            if self._pos >= self._end:
+                self._fill()
+            if self._buf[self._pos] in _SCALAR_END:
+                return
+            self._pos += 1
+
+    def _skip_string(self):
+        """Skip past the closing quote of a string whose opening one was consumed."""
+        escape = False
+        while True:
+            if self._pos >= self._end:
+                self._fill()
+            self._pos, escape, closed = _scan_string(
+                self._buf, self._pos, self._end, escape
+            )
+            if closed:
+                return
+
+    def _skip_container(self):
+        """Scan until the container whose opening bracket was consumed closes."""
+        buf = self._buf
+        depth = 1
+        while True:
+            if self._pos >= self._end:
+                self._fill()
+            pos = self._pos
+            end = self._end
+            while pos < end:
+                c = buf[pos]
+                pos += 1
+                if c == _QUOTE:
+                    self._pos = pos
+                    self._skip_string()
+                    pos = self._pos
+                    end = self._end  # The string may have refilled the buffer
+                elif c == _LBRACE or c == _LBRACKET:
+                    depth += 1
+                elif c == _RBRACE or c == _RBRACKET:
+                    depth -= 1
+                    if depth == 0:
+                        self._pos = pos
+                        return
+            self._pos = pos
+
+
+def _scan_string(buf, pos, end, escape):
+    """Scan buf[pos:end] for a string's closing quote: (pos, escape, closed)."""
+    while pos < end:
+        c = buf[pos]
+        pos += 1
+        if escape:
+            escape = False
+        elif c == _BACKSLASH:
+            escape = True
+        elif c == _QUOTE:
+            return pos, False, True
+    return pos, escape, False
@@ -3,31 +3,49 @@
 Entry point. Initializes Wi-Fi, NTP, MQTT, display, and runs the main loop.
 """
 
-import gc
 import time
 
 import machine
 
 import ntp
+import theme
 import wifi
-from data_manager import DataManager
+from alerts import AlertEngine
+from config import cfg
+from data_manager import TOPICS, DataManager
 from display import Display
 from host_monitor_screen import HostMonitorScreen
+from memory import mem
 from mqtt_client import MQTT
+from ota import OTA
+from overview_screen import OverviewScreen
+from screen_scheduler import ScreenScheduler
 from sensors_screen import SensorScreen
+from status_server import StatusServer
+from supervisor import Supervisor
 from vps_monitor_screen import VPSMonitorScreen
 from weather_screen import WeatherScreen
 
+_THEME_CHECK_S = 60  # "auto" theme follows the local hour
+
 
 def setup_mqtt(mqtt, wdt=None):
     if wdt:
         wdt.feed()
     if mqtt.connect():
-        topics = ["Sensors/#", "sensors/#", "vps/monitor", "host/monitor"]
+        topics = [
+            *TOPICS,
+            f"display/{mqtt.device_id}/set",
+            f"config/{mqtt.device_id}/set",
+            f"ota/{mqtt.device_id}/set",
+        ]
         for topic in topics:
             if wdt:
                 wdt.feed()
             mqtt.subscribe(topic)
+        # Retained state in one batch; the scheduler then renders it once
+        loaded = mqtt.drain(wdt)
+        print(f"MQTT: {loaded} messages loaded after subscribing")
         return True
     return False
 
@@ -38,93 +56,244 @@ def _handle_mqtt(mqtt, wdt):
         time.sleep_ms(1000)  # ty:ignore[unresolved-attribute]
         return
     mqtt.check_msg()
+    mqtt.flush()
+
+
+def _service_mqtt(mqtt, wdt, ping):
+    """Network errors are expected here and only mark the link as down."""
+    try:
+        _handle_mqtt(mqtt, wdt)
+        if ping:
+            mqtt.ping()
+    except OSError as e:
+        print(f"MQTT error: {e}")
+        mqtt.is_connected = False
+
+
+def _run_ota(ota, mqtt, wdt):
+    """Install the requested version and reboot into it."""
+    url, ota.pending = ota.pending, None
+    topic = f"ota/{mqtt.device_id}/state"
+    mqtt.publish({"state": "updating", "url": url}, topic, retain=True)
+    try:
+        report = ota.update(url, wdt)
+    except (OSError, ValueError) as e:
+        print(f"OTA failed: {e}")
+        # Retained, so it replaces the retained "updating"
+        failed = {"state": "failed", "url": url, "error": str(e)}
+        mqtt.publish(failed, topic, retain=True)
+        return
+    report["state"] = "installed"
+    mqtt.publish(report, topic, retain=True)
+    mqtt.flush(max_publishes=8)
+    machine.reset()
+
+
+def _setup_ota(mqtt):
+    ota = OTA()
+    ota.set_topic = f"ota/{mqtt.device_id}/set"
+    mqtt.set_callback(ota.handle_message)
+    return ota
+
+
+def _service_ota(sup, ota, mqtt, wdt):
+    if ota.pending:
+        sup.run("ota", _run_ota, ota, mqtt, wdt)
+
+
+def _route_alerts(alerts, disp_man, mqtt):
+    """Send alert transitions to MQTT, the banner and the status LED."""
+    topic = f"alerts/{mqtt.device_id}"
+
+    def on_alert(alert):
+        # Called from the MQTT receive callback: the main loop's flush sends it
+        mqtt.publish(alert, topic, qos=1, defer=True)
+        messages = alerts.active_messages()
+        if messages:
+            extra = f"  (+{len(messages) - 1})" if len(messages) > 1 else ""
+            disp_man.set_banner(messages[0] + extra)
+            wifi.led.error()
+        else:
+            disp_man.set_banner(None)
+            wifi.led.clear_error()
+
+    alerts.on_alert(on_alert)
+
+
+def _status_server(sup, data_mgr, alerts, disp_man, mqtt):
+    """HTTP server exposing the data store, telemetry, heap and config."""
+    booted = time.time()
+    server = StatusServer(
+        {
+            "data": data_mgr.get_all_data,
+            "sensors": lambda: {
+                key: data_mgr.quality.info(key) for key in data_mgr.quality.keys()
+            },
+            "heap": mem.stats,
+            "idle": disp_man.idle.stats,
+            "config": cfg.as_dict,
+        },
+        cfg.http_port,
+    )
+
+    def telemetry():
+        stats = sup.stats()
+        stats.update(
+            {
+                "uptime_s": time.time() - booted,
+                "loop_ms": disp_man.loop_ms,
+                "mqtt_connected": mqtt.is_connected,
+                "mqtt_sent": mqtt.outbox.sent,
+                "mqtt_dropped": mqtt.outbox.dropped,
+                "mqtt_queued": len(mqtt.outbox),
+                "alerts_active": len(alerts.active_messages()),
+                "http_requests": server.requests,
+            }
+        )
+        return stats
 
+    def apply_config(changed):
+        if "http_port" in changed:
+            server.set_port(cfg.http_port)
 
-def _update_active_screen(
-    disp_man, data_mgr, weather, sensors, vps, host_screen, iteration
-):
-    active = disp_man.active_name
-    if active == "Weather":
-        weather.update_time()
-        if iteration % 3000 == 0:
-            weather.update_weather()
-    elif active == "Temp":
-        sensors.update_ui()
-    elif active == "VPS":
-        v_data = data_mgr.data_store.get("vps", {})
-        if v_data:
-            vps.update_values(
-                v_data.get("CPU", 0),
-                v_data.get("RAM", 0),
-                v_data.get("DISK", 0),
-                v_data.get("UPTIME", 0),
-            )
-    elif active == "Host":
-        h_data = data_mgr.data_store.get("host", {})
-        if h_data:
-            host_screen.update_values(
-                h_data.get("cpu", [0, 0, 0, 0]),
-                h_data.get("ram", 0),
-                h_data.get("net_down", 0),
-                h_data.get("cpu_temp", 0),
-                h_data.get("ssd_temp", 0),
-            )
+    server.sources["telemetry"] = telemetry
+    cfg.on_change(apply_config)
+    return server
+
+
+def _after(now, seconds):
+    return time.ticks_add(now, seconds * 1000)  # ty:ignore[unresolved-attribute]
+
+
+def _due(now, deadline):
+    return time.ticks_diff(now, deadline) >= 0  # ty:ignore[unresolved-attribute]
+
+
+def _restart_screen(disp_man, scheduler, name, factory):
+    disp_man.replace_screen(name, factory())
+    scheduler.invalidate(name)
+
+
+def _register_subsystems(sup, disp_man, scheduler, mqtt, server, factories):
+    sup.register("touch")
+    sup.register("display")
+    sup.register("wifi")
+    sup.register("ntp", base_backoff_ms=60000, max_backoff_ms=3600000)
+    sup.register("mqtt", restart=mqtt.disconnect)
+    sup.register("weather", base_backoff_ms=30000, max_backoff_ms=600000)
+    sup.register("http", restart=server.close)
+    sup.register("ota", base_backoff_ms=60000, max_backoff_ms=3600000)
+    for name, factory in factories.items():
+        sup.register(
+            "screen:" + name,
+            restart=lambda n=name, f=factory: _restart_screen(
+                disp_man, scheduler, n, f
+            ),
+        )
 
 
 def main():
     wdt = machine.WDT(timeout=30000)
-    wifi.connect(wdt)
+    sup = Supervisor()
+    wlan = wifi.WifiManager()
+    wlan.connect(wdt)
     ntp.sync()
     wdt.feed()
 
-    data_mgr = DataManager()
+    alerts = AlertEngine()
+    data_mgr = DataManager(alerts)
     mqtt = MQTT()
     mqtt.set_callback(data_mgr.process_message)
-    setup_mqtt(mqtt, wdt)
+    data_mgr.on_keyframe_request(
+        lambda topic, request: mqtt.publish(request, topic, retain=True)
+    )
+    cfg.set_topic = f"config/{mqtt.device_id}/set"
+    mqtt.set_callback(cfg.handle_message)
+    cfg.on_change(
+        lambda _keys: mqtt.publish(
+            cfg.as_dict(), f"config/{mqtt.device_id}/state", retain=True
+        )
+    )
+    ota = _setup_ota(mqtt)
 
-    disp_man = Display()
+    disp_man = Display(command_topic=f"display/{mqtt.device_id}/set")
+    # Factories let the supervisor rebuild a single screen after a fault
+    factories = {
+        "Weather": lambda: WeatherScreen(mqtt),
+        "Temp": lambda: SensorScreen(mqtt, data_mgr),
+        "All": OverviewScreen,
+        "VPS": VPSMonitorScreen,
+        "Host": HostMonitorScreen,
+    }
+    for name, factory in factories.items():
+        disp_man.add_screen(name, factory())
+    disp_man.finalize_setup()
+    disp_man.show_screen("Weather")  # A retained screen command may override it
+    mqtt.set_callback(disp_man.handle_command)
+    _route_alerts(alerts, disp_man, mqtt)
 
-    weather = WeatherScreen(mqtt)
-    sensors = SensorScreen(mqtt, data_mgr)
-    vps = VPSMonitorScreen()
-    host_screen = HostMonitorScreen()
+    # Every callback is registered: the retained state drained at connect
+    # reaches the display, the alert listeners and the config alike
+    setup_mqtt(mqtt, wdt)
 
-    disp_man.add_screen("Weather", weather)
-    disp_man.add_screen("Temp", sensors)
-    disp_man.add_screen("VPS", vps)
-    disp_man.add_screen("Host", host_screen)
-    disp_man.finalize_setup()
+    scheduler = ScreenScheduler(disp_man, data_mgr)
+    server = _status_server(sup, data_mgr, alerts, disp_man, mqtt)
+    server.sources["ota"] = ota.state
+    _register_subsystems(sup, disp_man, scheduler, mqtt, server, factories)
+    scheduler.render_all()  # Everything loaded at connect, once per screen
+    disp_man.on_show(lambda name: sup.run("screen:" + name, scheduler.tick))
 
-    disp_man.show_screen("Weather")
     print("Entering main loop...")
+    ota.confirm()  # Reaching this point ends an update's trial
+    mqtt.publish(ota.state(), f"ota/{mqtt.device_id}/state", retain=True)
 
-    iteration = 0
+    now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+    next_ping = now
+    next_weather = _after(now, cfg.weather_interval_s)
+    next_theme = now
+    screenshot_topic = f"status/{mqtt.device_id}/screenshot"
     while True:
         try:
             wdt.feed()
-            disp_man.check_touch()
+            sup.run("touch", disp_man.check_touch)
+            sup.run("display", disp_man.tick)
 
-            try:
-                _handle_mqtt(mqtt, wdt)
-                if iteration % 100 == 0:
-                    mqtt.ping()
-            except (OSError, AttributeError) as e:
-                print(f"MQTT error: {e}")
-                mqtt.is_connected = False
+            sup.run("wifi", wlan.poll)
+            wifi.led.tick()
+            now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+            if wlan.is_connected:
+                ping = _due(now, next_ping)
+                if ping:
+                    next_ping = _after(now, cfg.ping_interval_s)
+                sup.run("mqtt", _service_mqtt, mqtt, wdt, ping)
+                sup.run("ntp", ntp.maybe_resync)
+                sup.run("http", server.poll)
+                _service_ota(sup, ota, mqtt, wdt)
 
-            _update_active_screen(
-                disp_man, data_mgr, weather, sensors, vps, host_screen, iteration
-            )
+            if _due(now, next_theme):
+                next_theme = _after(now, _THEME_CHECK_S)
+                sup.run("display", theme.update, ntp.localtime()[3])
 
-            time.sleep_ms(50)  # ty:ignore[unresolved-attribute]
-            iteration += 1
-            if iteration % 200 == 0:
-                gc.collect()
+            if disp_man.screenshot.active:
+                sup.run("display", disp_man.screenshot.poll, mqtt, screenshot_topic)
+
+            active = disp_man.active_name
+            if not disp_man.idle.is_off:  # Renders catch up on wake
+                sup.run("screen:" + active, scheduler.tick)
+            if active == "Weather" and _due(now, next_weather):
+                next_weather = _after(now, cfg.weather_interval_s)
+                weather = disp_man.screens["Weather"]
+                sup.run("weather", weather.update_weather)
+                sup.run("weather", weather.update_forecast)
+
+            disp_man.idle.sleep(50, mqtt.socket)
+            mem.maybe_collect()
 
         except Exception as e:  # noqa: BLE001
-            print(f"Global Loop Error: {e}")
-            time.sleep_ms(2000)  # ty:ignore[unresolved-attribute]
-            machine.reset()
+            # Anything not attributable to a subsystem; the supervisor only
+            # resets the device if these turn into a restart storm.
+            sup.report("main", e)
+            time.sleep_ms(50)  # ty:ignore[unresolved-attribute]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,205 @@
+"""
+Heap policy for the ESP32-S3 with Octal PSRAM.
+
+Large long-lived buffers are allocated once, early, and by role: LVGL draw
+buffers go to PSRAM through lcd_bus, icon data and history rings are
+reserved up front in the GC heap (which lives in PSRAM on SPIRAM builds) so
+they never fragment it later. The internal IDF heap is left for hot small
+objects, Wi-Fi and TLS. GC runs when free memory drops below a threshold
+instead of every N loop iterations, and internal heap fragmentation is
+sampled over time.
+"""
+
+import gc
+import time
+from array import array
+
+try:
+    import esp32
+except ImportError:
+    esp32 = None
+
+try:
+    # noinspection PyUnresolvedReferences
+    import lcd_bus
+except ImportError:
+    lcd_bus = None
+
+from config import cfg
+
+_SAMPLE_INTERVAL_MS = 10000
+_HISTORY = 60  # Fragmentation samples kept (10 min at the default interval)
+_PSRAM_REGION_MIN = 1024 * 1024  # IDF heap regions larger than this are PSRAM
+
+
+class MemoryManager:
+    """Buffer registry, threshold-driven GC and fragmentation history."""
+
+    def __init__(self):
+        # Collect when the GC heap has less free than this
+        self.low_water = cfg.gc_low_water_kb * 1024
+        self.collections = 0
+        self._buffers = {}
+        self._frag = array("H", bytes(2 * _HISTORY))  # per mille, ring buffer
+        self._frag_pos = 0
+        self._frag_count = 0
+        self._next_sample = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        # Let MicroPython also collect on its own after a burst of allocations;
+        # the threshold counts bytes allocated since the last collection
+        gc.threshold(gc.mem_free() // 4)
+
+    # --- Long-lived buffers ---
+
+    def buffer(self, name, size):
+        """Return the named bytearray, allocating it on first use."""
+        buf = self._buffers.get(name)
+        if buf is None or len(buf) < size:
+            buf = bytearray(size)
+            self._buffers[name] = buf
+        return buf
+
+    def ring(self, name, length, typecode="f"):
+        """Return a named, preallocated array for history data."""
+        buf = self._buffers.get(name)
+        if buf is None or len(buf) != length:
+            buf = array(typecode, bytes(length * array(typecode).itemsize))
+            self._buffers[name] = buf
+        return buf
+
+    def framebuffer(self, data_bus, size):
+        """
+        Allocate an LVGL draw buffer in PSRAM via lcd_bus.
+
+        Falls back to internal DMA memory, then to None (the display driver
+        then allocates its own default buffer).
+        """
+        if lcd_bus is None:
+            return None
+        for caps in (
+            lcd_bus.MEMORY_SPIRAM,
+            lcd_bus.MEMORY_INTERNAL | lcd_bus.MEMORY_DMA,
+        ):
+            try:
+                return data_bus.allocate_framebuffer(size, caps)
+            except (MemoryError, OSError):  # noqa: PERF203
+                continue
+        return None
+
+    # --- Garbage collection ---
+
+    def maybe_collect(self, headroom=0):
+        """
+        Run gc.collect() only if free memory is below the low-water mark
+        (plus headroom for an upcoming allocation burst such as TLS).
+        """
+        if gc.mem_free() < self.low_water + headroom:
+            gc.collect()
+            self.collections += 1
+        now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        if time.ticks_diff(now, self._next_sample) >= 0:  # ty:ignore[unresolved-attribute]
+            self._next_sample = time.ticks_add(now, _SAMPLE_INTERVAL_MS)  # ty:ignore[unresolved-attribute]
+            self._sample_fragmentation()
+
+    # --- Fragmentation tracking ---
+
+    @staticmethod
+    def idf_regions():
+        """Return (internal, psram) lists of (total, free, largest, min_free)."""
+        if esp32 is None:
+            return [], []
+        internal, psram = [], []
+        for region in esp32.idf_heap_info(esp32.HEAP_DATA):
+            (psram if region[0] >= _PSRAM_REGION_MIN else internal).append(region)
+        return internal, psram
+
+    def internal_fragmentation(self):
+        """Per mille of internal free RAM not usable as one contiguous block."""
+        internal, _ = self.idf_regions()
+        free = sum(r[1] for r in internal)
+        if free == 0:
+            return 0
+        largest = max(r[2] for r in internal)
+        return 1000 - largest * 1000 // free
+
+    def _sample_fragmentation(self):
+        self._frag[self._frag_pos] = self.internal_fragmentation()
+        self._frag_pos = (self._frag_pos + 1) % _HISTORY
+        self._frag_count = min(self._frag_count + 1, _HISTORY)
+
+    def fragmentation_history(self):
+        """Samples in per mille, oldest first."""
+        start = (self._frag_pos - self._frag_count) % _HISTORY
+        return [self._frag[(start + i) % _HISTORY] for i in range(self._frag_count)]
+
+    def stats(self):
+        internal, psram = self.idf_regions()
+        return {
+            "gc_free": gc.mem_free(),
+            "gc_alloc": gc.mem_alloc(),
+            "gc_collections": self.collections,
+            "internal_free": sum(r[1] for r in internal),
+            "internal_largest": max((r[2] for r in internal), default=0),
+            "internal_min_free": sum(r[3] for r in internal),
+            "psram_free": sum(r[1] for r in psram),
+            "fragmentation": self.internal_fragmentation(),
+            "buffers": {name: len(buf) for name, buf in self._buffers.items()},
+        }
+
+    # --- Diagnostics ---
+
+    @staticmethod
+    def bandwidth(size=1024 * 1024, chunk=4096):
+        """
+        Measure GC-heap (PSRAM) allocation, block write/read and per-byte
+        write speed, and print the results. Run from the REPL.
+
+        A per-byte Python loop is dominated by interpreter overhead, so it
+        is timed on 64 KB and extrapolated; compare it with the block write
+        to see whether slow writes come from the memory or from the code.
+        """
+        gc.collect()
+        t0 = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        buf = bytearray(size)
+        t_alloc = time.ticks_diff(time.ticks_ms(), t0)  # ty:ignore[unresolved-attribute]
+
+        mv = memoryview(buf)
+        pattern = bytes(range(256)) * (chunk // 256)
+        t0 = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        for offset in range(0, size - chunk + 1, chunk):
+            mv[offset : offset + chunk] = pattern
+        t_write = time.ticks_diff(time.ticks_ms(), t0)  # ty:ignore[unresolved-attribute]
+
+        scratch = bytearray(chunk)
+        t0 = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        for offset in range(0, size - chunk + 1, chunk):
+            scratch[:] = mv[offset : offset + chunk]
+        t_read = time.ticks_diff(time.ticks_ms(), t0)  # ty:ignore[unresolved-attribute]
+
+        probe = 64 * 1024
+        t0 = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        for i in range(probe):
+            buf[i] = i & 0xFF
+        t_byte = time.ticks_diff(time.ticks_ms(), t0) * size // probe  # ty:ignore[unresolved-attribute]
+
+        def rate(ms):
+            return "{:.1f} MB/s".format(size / 1048576 / (ms / 1000)) if ms else "-"
+
+        kb = size // 1024
+        print(f"{kb} KB allocation: {t_alloc} ms")
+        print(f"{kb} KB block write: {t_write} ms ({rate(t_write)})")
+        print(f"{kb} KB block read:  {t_read} ms ({rate(t_read)})")
+        print(f"{kb} KB byte loop (extrapolated): {t_byte} ms ({rate(t_byte)})")
+        del buf, mv, scratch
+        gc.collect()
+        return {"alloc": t_alloc, "write": t_write, "read": t_read, "byte": t_byte}
+
+
+mem = MemoryManager()
+
+
+def _apply_config(changed):
+    if "gc_low_water_kb" in changed:
+        mem.low_water = cfg.gc_low_water_kb * 1024
+
+
+cfg.on_change(_apply_config)
@@ -1,14 +1,28 @@
 # mqtt_client.py
 """
 MQTT client wrapper with SSL, LWT, auto-reconnect, and multi-callback support.
+
+Outgoing messages go through an Outbox so they survive connection drops and
+are replayed in order after reconnecting.
 """
 
-import gc
 import json
 import secrets
+import time
 
 from umqtt.simple import MQTTClient
 
+import payload_codec
+from memory import mem
+from mqtt_outbox import Outbox
+
+_OUTBOX_SPILL_PATH = "/outbox.jsonl"
+# The SSL handshake allocates a burst of buffers; make room before it
+_TLS_HEADROOM = 48 * 1024
+# drain(): stop after this long without a message, or this long in total
+_DRAIN_QUIET_MS = 250
+_DRAIN_MAX_MS = 3000
+
 
 class MQTT:
     """Universal MQTT client for ESP32-S3."""
@@ -22,12 +36,14 @@ class MQTT:
         self.use_ssl = secrets.MQTT_USE_SSL
 
         self.is_connected = False
+        self.received = 0
         self.callbacks = []
         self.client = None
+        self.outbox = Outbox(spill_path=_OUTBOX_SPILL_PATH)
         self._init_client()
 
     def _init_client(self):
-        gc.collect()
+        mem.maybe_collect()
         self.client = MQTTClient(
             client_id=self.device_id,
             server=self.broker,
@@ -42,8 +58,10 @@ class MQTT:
     def _internal_callback(self, topic, msg):
         try:
             t = topic.decode()
-            m = msg.decode()
+            # Binary frames are passed through untouched, JSON is decoded here
+            m = msg if payload_codec.is_binary(msg) else msg.decode()
             # print(f"MQTT RECEIVE: [{t}] -> {m}")
+            self.received += 1
 
             for cb in self.callbacks:
                 try:
@@ -61,7 +79,7 @@ class MQTT:
         """Connect to the broker."""
         self.disconnect()
         print(f"Connecting to MQTT via {'SSL' if self.use_ssl else 'TCP'}...")
-        gc.collect()
+        mem.maybe_collect(headroom=_TLS_HEADROOM if self.use_ssl else 0)
         try:
             lwt_topic = f"status/{self.device_id}"
             self.client.set_last_will(lwt_topic, "offline", retain=True)  # ty:ignore[unresolved-attribute]
@@ -84,6 +102,11 @@ class MQTT:
             except OSError:
                 pass
 
+    @property
+    def socket(self):
+        """The broker connection's socket, None while disconnected."""
+        return self.client.sock if self.is_connected else None
+
     def subscribe(self, topic):
         if self.is_connected:
             try:
@@ -96,17 +119,36 @@ class MQTT:
                 return True
         return False
 
-    def publish(self, data, topic="Sensors", *, retain=False):
-        if not self.is_connected:
+    def publish(self, data, topic="Sensors", *, retain=False, qos=0, defer=False):
+        """
+        Queue data for sending and flush right away if connected.
+
+        data is serialised to JSON unless it is already bytes. Returns False
+        only if data cannot be serialised; queued messages are sent by
+        flush() once the connection is up again. defer=True only queues:
+        use it from receive callbacks, where a QoS 1 publish would wait for
+        its PUBACK inside check_msg() and dispatch further messages.
+        """
+        try:
+            payload = data if isinstance(data, bytes) else json.dumps(data)
+        except (TypeError, ValueError) as e:
+            print(f"MQTT publish serialisation error: {e}")
             return False
+        self.outbox.put(topic, payload, retain=retain, qos=qos)
+        if not defer:
+            self.flush(max_publishes=1)
+        return True
+
+    def flush(self, max_publishes=2):
+        """Send queued messages. Bounded per call so the UI loop stays smooth."""
+        if not self.is_connected or not self.outbox.pending:
+            return 0
         try:
-            payload = json.dumps(data)
-            self.client.publish(topic, payload, retain=retain)  # ty:ignore[unresolved-attribute]
-        except (OSError, ValueError):
+            return self.outbox.flush(self.client, max_publishes)
+        except OSError as e:
+            print(f"MQTT publish failed, keeping message queued: {e}")
             self.is_connected = False
-            return False
-        else:
-            return True
+            return 0
 
     def ping(self):
         if not self.is_connected:
@@ -119,6 +161,33 @@ class MQTT:
         else:
             return True
 
+    def drain(self, wdt=None, quiet_ms=_DRAIN_QUIET_MS, max_ms=_DRAIN_MAX_MS):
+        """
+        Process every message already on its way, typically the retained
+        state the broker sends right after subscribing, in one batch. Stops
+        once none arrived for quiet_ms, or after max_ms. Returns the count.
+        """
+        start = self.received
+        started = last = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        while self.is_connected:
+            before = self.received
+            try:
+                self.check_msg()
+            except OSError:
+                break
+            now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+            if self.received != before:
+                last = now
+                if wdt:
+                    wdt.feed()
+            elif time.ticks_diff(now, last) >= quiet_ms:  # ty:ignore[unresolved-attribute]
+                break
+            else:
+                time.sleep_ms(5)  # ty:ignore[unresolved-attribute]
+            if time.ticks_diff(now, started) >= max_ms:  # ty:ignore[unresolved-attribute]
+                break
+        return self.received - start
+
     def check_msg(self):
         if not self.is_connected:
             return
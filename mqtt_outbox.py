@@ -0,0 +1,230 @@
+# mqtt_outbox.py
+"""
+Outbound MQTT queue with optional store-and-forward to flash.
+
+Records are queued in RAM and sent in order by flush(). When the RAM queue is
+full it is spilled to a JSON-lines file (or, without a spill file, the oldest
+record is dropped). The spill file is always replayed before the RAM queue,
+so messages leave the device in the order they were queued. It is capped at
+about max_spill_bytes of unsent records: during a long outage the oldest
+ones are dropped, so the spill never eats the flash the config and OTA
+updates need.
+
+The replay position is saved next to the spill file (<spill_path>.pos) after
+each flush(), so a reboot part-way through a replay resumes where it left
+off. Only the records of the flush() interrupted by the reset can be sent
+twice.
+"""
+
+import json
+import os
+
+import ubinascii
+
+# Record layout: (topic, payload, retain, qos)
+_TOPIC = 0
+_PAYLOAD = 1
+_RETAIN = 2
+_QOS = 3
+
+
+class Outbox:
+    """Bounded FIFO of outbound MQTT records."""
+
+    def __init__(self, max_records=32, spill_path=None, max_spill_bytes=16384):
+        self.max_records = max_records
+        self.spill_path = spill_path
+        self.max_spill_bytes = max_spill_bytes
+        self.dropped = 0
+        self.sent = 0
+        self._queue = []
+        self._spill_offset = 0
+        self._has_spill = False
+        self._flushing = False
+        if spill_path:
+            try:
+                size = os.stat(spill_path)[6]
+            except OSError:
+                size = 0
+            self._has_spill = size > 0
+            if self._has_spill:
+                self._spill_offset = self._load_offset(size)
+
+    def __len__(self):
+        return len(self._queue)
+
+    @property
+    def pending(self):
+        """True if anything is waiting in RAM or in the spill file."""
+        return bool(self._queue) or self._has_spill
+
+    def put(self, topic, payload, *, retain=False, qos=0):
+        """Queue a record. payload is a str (JSON) or bytes (binary frame)."""
+        self._queue.append((topic, payload, retain, qos))
+        if len(self._queue) > self.max_records:
+            if self.spill_path:
+                self._spill()
+            else:
+                self._queue.pop(0)
+                self.dropped += 1
+
+    def flush(self, client, max_publishes=2):
+        """
+        Publish up to max_publishes messages. Returns the number sent.
+
+        A record is only removed once client.publish() returned, which for
+        QoS 1 means the broker acknowledged it. OSError propagates so the
+        caller can mark the connection as lost; nothing is discarded.
+
+        A QoS 1 publish dispatches incoming messages while it waits for the
+        PUBACK. A flush() from their callbacks returns 0, so the head record
+        is not sent twice and the outer call's del removes only what it sent.
+        """
+        if self._flushing:
+            return 0
+        self._flushing = True
+        try:
+            return self._flush(client, max_publishes)
+        finally:
+            self._flushing = False
+
+    def _flush(self, client, max_publishes):
+        sent = 0
+        offset = self._spill_offset
+        try:
+            while sent < max_publishes and self._has_spill:
+                if not self._replay_one(client):
+                    break
+                sent += 1
+        finally:
+            if self._has_spill and self._spill_offset != offset:
+                self._save_offset()
+
+        while sent < max_publishes and self._queue:
+            head = self._queue[0]
+            client.publish(head[_TOPIC], head[_PAYLOAD], head[_RETAIN], head[_QOS])
+            del self._queue[0]
+            self.sent += 1
+            sent += 1
+        return sent
+
+    def _spill(self):
+        """Append the whole RAM queue to the spill file and clear it."""
+        lines = [_encode(record) for record in self._queue]
+        self._queue.clear()
+        try:
+            size = os.stat(self.spill_path)[6] if self._has_spill else 0
+        except OSError:
+            size = 0
+        new = sum(len(line) for line in lines)
+        excess = size - self._spill_offset + new - self.max_spill_bytes
+        try:
+            if excess > 0:
+                self._compact(excess, lines)
+            else:
+                with open(self.spill_path, "a") as f:
+                    for line in lines:
+                        f.write(line)
+        except OSError as e:
+            print(f"Outbox spill failed: {e}")
+            self.dropped += len(lines)
+        self._has_spill = True
+
+    def _compact(self, excess, lines):
+        """
+        Rewrite the spill file with its unsent records plus lines, dropping
+        the oldest records until excess bytes are gone.
+        """
+        tmp = self.spill_path + ".tmp"
+        with open(tmp, "w") as out:
+            if self._has_spill:
+                with open(self.spill_path) as src:
+                    src.seek(self._spill_offset)
+                    while True:
+                        line = src.readline()
+                        if not line:
+                            break
+                        excess = self._keep(out, line, excess)
+            for line in lines:
+                excess = self._keep(out, line, excess)
+        # Without the position file a reset before the rename replays the old
+        # file from the start: duplicates, but nothing lost
+        self._remove(self.spill_path + ".pos")
+        os.rename(tmp, self.spill_path)
+        self._spill_offset = 0
+
+    def _keep(self, out, line, excess):
+        """Write line unless excess bytes still have to go; returns the rest."""
+        if excess > 0:
+            self.dropped += 1
+            return excess - len(line)
+        out.write(line)
+        return excess
+
+    def _replay_one(self, client):
+        """Publish the next spilled record. Returns False once the file is done."""
+        try:
+            with open(self.spill_path) as f:
+                f.seek(self._spill_offset)
+                line = f.readline()
+                next_offset = f.tell()
+        except OSError:
+            line = ""
+
+        if not line:
+            self._clear_spill()
+            return False
+
+        try:
+            rec = json.loads(line)
+            payload = rec["p"] if "p" in rec else ubinascii.unhexlify(rec["x"])
+        except (ValueError, KeyError) as e:
+            print(f"Outbox dropped corrupt record: {e}")
+            self.dropped += 1
+        else:
+            client.publish(rec["t"], payload, rec["r"], rec["q"])
+            self.sent += 1
+        self._spill_offset = next_offset
+        return True
+
+    def _load_offset(self, size):
+        """Saved replay position, or 0 if missing or beyond the file."""
+        try:
+            with open(self.spill_path + ".pos") as f:
+                offset = int(f.read())
+        except (OSError, ValueError):
+            return 0
+        return offset if 0 <= offset <= size else 0
+
+    def _save_offset(self):
+        path = self.spill_path + ".pos"
+        try:
+            with open(path + ".tmp", "w") as f:
+                f.write(str(self._spill_offset))
+            os.rename(path + ".tmp", path)
+        except OSError as e:
+            print(f"Outbox replay position not saved: {e}")
+
+    def _clear_spill(self):
+        self._has_spill = False
+        self._spill_offset = 0
+        self._remove(self.spill_path)
+        self._remove(self.spill_path + ".pos")
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _encode(record):
+    """One spill file line for a record."""
+    topic, payload, retain, qos = record
+    if isinstance(payload, str):
+        line = {"t": topic, "p": payload, "r": retain, "q": qos}
+    else:
+        hexed = ubinascii.hexlify(payload).decode()
+        line = {"t": topic, "x": hexed, "r": retain, "q": qos}
+    return json.dumps(line) + "\n"
@@ -1,60 +1,84 @@
-# ntp.py
 """
-NTP time synchronization with CET/CEST daylight-saving adjustment.
+NTP time synchronization with drift-corrected periodic resync.
+
+The RTC is kept in UTC; local time is derived through the tz module, so
+daylight-saving transitions take effect without a resync or reboot.
 """
 
 import time
 
 import ntptime
+import secrets
 from machine import RTC
 
+import tz
+
+_MIN_RESYNC_S = 3600
+_MAX_RESYNC_S = 86400
+_MAX_DRIFT_S = 1  # Resync often enough to stay within this error
+_RETRY_S = 300
+
+zone = tz.Timezone(getattr(secrets, "TIMEZONE", "CET"))
+
+_last_sync = None  # time.time() right after the last successful sync
+_resync_interval = _MIN_RESYNC_S
+_next_attempt = 0  # time.ticks_ms() deadline for maybe_resync()
 
-def cettime():
-    """
-    Calculates the current Central European Time (CET/CEST) including daylight saving.
 
-    Expects system clock to be set to UTC.
-    """
-    year = time.localtime()[0]
+def localtime(utc=None):
+    """Return the local time tuple for utc seconds (default: now)."""
+    return zone.localtime(utc)
 
-    # DST: last Sunday of March (start) and October (end)
-    # mktime expects: (year, month, mday, hour, minute, second, weekday, yearday, isdst)
-    dst_start_utc = time.mktime(
-        (year, 3, (31 - (int(5 * year / 4 + 4)) % 7), 1, 0, 0, 0, 0, 0)
-    )
-    dst_end_utc = time.mktime(
-        (year, 10, (31 - (int(5 * year / 4 + 1)) % 7), 1, 0, 0, 0, 0, 0)
-    )
 
-    now_utc = time.time()
-    # CEST: UTC+2, CET: UTC+1
-    if dst_start_utc <= now_utc < dst_end_utc:
-        offset_seconds = 7200  # Summer
+def _set_rtc(utc):
+    year, month, day, hour, minute, second, weekday, _ = time.gmtime(utc)[:8]
+    RTC().datetime((year, month, day, weekday + 1, hour, minute, second, 0))
+
+
+def _adjust_interval(drift, elapsed):
+    """Choose the next resync interval from the measured drift rate."""
+    global _resync_interval  # noqa: PLW0603
+    if elapsed <= 0:
+        return
+    if drift == 0:
+        interval = _resync_interval * 2
     else:
-        offset_seconds = 3600  # Winter
+        interval = _MAX_DRIFT_S * elapsed // abs(drift)
+    _resync_interval = max(_MIN_RESYNC_S, min(_MAX_RESYNC_S, interval))
 
-    cet_tuple = time.localtime(now_utc + offset_seconds)
-    # Added an extra '_' to unpack the 9th element (isdst)
-    year, month, day, hour, minute, second, weekday_0_6, _, _ = cet_tuple
 
-    # RTC expects weekday 1-7 (Monday=1)
-    return year, month, day, weekday_0_6 + 1, hour, minute, second, 0
+def _schedule(seconds):
+    global _next_attempt  # noqa: PLW0603
+    _next_attempt = time.ticks_add(time.ticks_ms(), seconds * 1000)  # ty:ignore[unresolved-attribute]
 
 
-def sync():
-    """Synchronizes RTC with NTP server and applies CET/CEST offset."""
+def sync(max_retries=3):
+    """Synchronizes the RTC (UTC) with the NTP server."""
+    global _last_sync  # noqa: PLW0603
     print("Synchronizing RTC with NTP server (UTC)...")
-    rtc = RTC()
-    max_retries = 3
     for attempt in range(max_retries):
         try:
-            ntptime.settime()
-            if rtc.datetime()[0] > 2021:  # noqa: PLR2004
-                cet_datetime = cettime()
-                rtc.datetime(cet_datetime)
-                print("Time synchronized successfully to CET/CEST.")
-                return True
+            utc = ntptime.time()
+            before = time.time()
+            _set_rtc(utc)
+            if _last_sync is not None:
+                drift = utc - before
+                _adjust_interval(drift, utc - _last_sync)
+                print(f"NTP drift: {drift} s, next resync in {_resync_interval} s")
+            _last_sync = utc
+            _schedule(_resync_interval)
+            print(f"Time synchronized successfully ({zone.name}).")
         except Exception as e:  # noqa: BLE001, PERF203
             print(f"NTP attempt {attempt + 1} failed: {e}")
-            time.sleep(2)
+            if attempt + 1 < max_retries:
+                time.sleep(2)
+        else:
+            return True
+    _schedule(_RETRY_S)
     return False
+
+
+def maybe_resync():
+    """Resync once the scheduled time is reached. Call from the main loop."""
+    if time.ticks_diff(time.ticks_ms(), _next_attempt) >= 0:  # ty:ignore[unresolved-attribute]
+        sync(max_retries=1)
@@ -0,0 +1,307 @@
+"""
+Over-the-air updates of the app modules, with A/B slots and rollback.
+
+An update is a directory served over HTTP: the app files (.py/.mpy, as
+built by scripts/build_mpy.py --release) plus a manifest.json:
+
+    {"version": "1.4.0",
+     "files": {"main.py": {"sha256": "<hex>", "size": 11093}, ...}}
+
+The app runs from one of two slot directories, /app_a or /app_b, or from
+the root before the first update. update() builds the other slot: files
+whose hash differs from the running version's manifest are downloaded,
+the others are copied over from the running slot. Both stream through one
+_CHUNK buffer, so RAM use does not depend on the file sizes, and every file
+is hashed while it is written. A mismatch, a short read or a full flash
+aborts the update and removes the half-built slot.
+
+Activation is a single atomic rename of /ota.json, which names the slot
+boot.py runs from. A new slot starts on trial: boot.py counts the boots,
+main.py calls confirm() once it reaches the main loop, and a version that
+fails to get there within _TRIAL_BOOTS boots is rolled back by boot.py.
+
+No MicroPython-only imports, so scripts/ota_check.py can run it under
+CPython against a local HTTP server.
+"""
+
+import binascii
+import hashlib
+import json
+import os
+
+try:
+    import urequests
+except ImportError:
+    urequests = None
+
+_STATE = "ota.json"
+_MANIFEST = "manifest.json"
+_SLOTS = ("a", "b")
+_CHUNK = 1024
+_MAX_FILES = 128
+# Flash kept free besides the new slot, for the config and the outbox spill
+_FLASH_MARGIN = 32 * 1024
+# Never part of a slot: boot.py selects the slot, secrets.py stays in the root
+_RESERVED = ("boot.py", "secrets.py", _STATE, _MANIFEST)
+
+
+class OTAError(ValueError):
+    """An update rejected before activation; reason is a key of _REASONS."""
+
+    _REASONS = {
+        "name": "bad file name in manifest",
+        "entry": "bad manifest entry",
+        "manifest": "bad manifest",
+        "trial": "the running version is not confirmed yet",
+        "http": "download failed",
+        "size": "wrong size",
+        "hash": "hash mismatch",
+        "flash": "not enough flash",
+    }
+
+    def __init__(self, reason, detail=""):
+        message = self._REASONS[reason]
+        super().__init__(f"{message}: {detail}" if detail else message)
+
+
+def _join(*parts):
+    return "/".join(part.rstrip("/") for part in parts)
+
+
+def _is_dir(path):
+    return os.stat(path)[0] & 0x4000 != 0
+
+
+def _rmtree(path):
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return
+    for name in names:
+        child = _join(path, name)
+        if _is_dir(child):
+            _rmtree(child)
+        else:
+            os.remove(child)
+    os.rmdir(path)
+
+
+def _hex(digest):
+    return binascii.hexlify(digest).decode()
+
+
+def _check_name(name):
+    if "/" in name or "\\" in name or name.startswith(".") or name in _RESERVED:
+        raise OTAError("name", name)
+
+
+def _check_entry(name, entry):
+    _check_name(name)
+    if not isinstance(entry, dict):
+        raise OTAError("entry", name)
+    digest, size = entry.get("sha256"), entry.get("size")
+    if not isinstance(digest, str) or len(digest) != 64:
+        raise OTAError("entry", name)
+    if not isinstance(size, int) or size < 0:
+        raise OTAError("entry", name)
+
+
+def file_hash(path, buf):
+    """sha256 hex digest of a file, read through buf."""
+    h = hashlib.sha256()
+    mv = memoryview(buf)
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(mv)
+            if not n:
+                break
+            h.update(mv[:n])
+    return _hex(h.digest())
+
+
+def make_manifest(directory, version):
+    """Manifest for every file in directory except the reserved ones."""
+    buf = bytearray(_CHUNK)
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        path = _join(directory, name)
+        if name in _RESERVED or _is_dir(path):
+            continue
+        files[name] = {"sha256": file_hash(path, buf), "size": os.stat(path)[6]}
+    return {"version": version, "files": files}
+
+
+class OTA:
+    """Downloads, verifies and activates app versions in two slots."""
+
+    def __init__(self, root="/"):
+        self.root = root
+        self.set_topic = None
+        self.pending = None  # Base URL of a requested update
+        self._buf = None
+
+    # --- State ---
+
+    def state(self):
+        """Contents of ota.json; {} before the first update."""
+        try:
+            with open(_join(self.root, _STATE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        """Write ota.json atomically: the rename is the activation."""
+        path = _join(self.root, _STATE)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.rename(tmp, path)
+
+    def _slot_dir(self, slot):
+        return _join(self.root, "app_" + slot) if slot else self.root
+
+    def confirm(self):
+        """The running version reached the main loop; end its trial."""
+        state = self.state()
+        if state.get("trial"):
+            state["trial"] = False
+            state.pop("boots", None)
+            self._save_state(state)
+            print(f"OTA: version {state.get('version')} confirmed")
+
+    def handle_message(self, topic, msg):
+        """MQTT callback for ota/{client_id}/set: {"url": "http://..."}."""
+        if topic != self.set_topic:
+            return
+        try:
+            self.pending = json.loads(msg)["url"]
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"OTA request rejected: {e}")
+
+    # --- Update ---
+
+    def _running_manifest(self, active_dir, names):
+        """The running version's manifest, hashed from its files if missing."""
+        try:
+            with open(_join(active_dir, _MANIFEST)) as f:
+                return json.load(f)["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        files = {}
+        for name in names:
+            try:
+                files[name] = {"sha256": file_hash(_join(active_dir, name), self._buf)}
+            except OSError:
+                pass  # Not installed yet
+        return files
+
+    def _get(self, url):
+        res = urequests.get(url)
+        if res.status_code != 200:
+            res.close()
+            raise OTAError("http", f"{url} ({res.status_code})")
+        return res
+
+    def _write(self, stream, path, entry, wdt):
+        """Stream into path through the chunk buffer, checking size and hash."""
+        h = hashlib.sha256()
+        mv = memoryview(self._buf)
+        size = entry["size"]
+        written = 0
+        with open(path, "wb") as f:
+            while True:
+                n = stream.readinto(mv)
+                if not n:
+                    break
+                written += n
+                if written > size:
+                    raise OTAError("size", f"{path} over {size} bytes")
+                h.update(mv[:n])
+                f.write(mv[:n])
+                if wdt:
+                    wdt.feed()
+        if written != size:
+            raise OTAError("size", f"{path} {written} of {size} bytes")
+        if _hex(h.digest()) != entry["sha256"]:
+            raise OTAError("hash", path)
+
+    def _check_space(self, files):
+        stat = os.statvfs(self.root)
+        free = stat[0] * stat[4]
+        needed = sum(entry["size"] for entry in files.values()) + _FLASH_MARGIN
+        if needed > free:
+            raise OTAError("flash", f"{needed} bytes needed, {free} free")
+
+    def update(self, base_url, wdt=None):
+        """
+        Install the version at base_url into the inactive slot and activate
+        it for the next boot. Returns a report; raises OTAError (a ValueError)
+        or OSError and leaves the running version active on any failure.
+        """
+        state = self.state()
+        if state.get("trial"):
+            raise OTAError("trial")
+        if self._buf is None:
+            self._buf = bytearray(_CHUNK)
+
+        res = self._get(_join(base_url, _MANIFEST))
+        try:
+            manifest = json.load(res.raw)
+        finally:
+            res.close()
+        files = manifest.get("files") if isinstance(manifest, dict) else None
+        if not isinstance(files, dict) or not 0 < len(files) <= _MAX_FILES:
+            raise OTAError("manifest", "files")
+        for name, entry in files.items():
+            _check_entry(name, entry)
+
+        active = state.get("slot")
+        active_dir = self._slot_dir(active)
+        target = _SLOTS[1] if active == _SLOTS[0] else _SLOTS[0]
+        target_dir = self._slot_dir(target)
+        running = self._running_manifest(active_dir, files)
+
+        _rmtree(target_dir)
+        self._check_space(files)
+        os.mkdir(target_dir)
+        fetched = []
+        copied = []
+        try:
+            for name, entry in files.items():
+                path = _join(target_dir, name)
+                if running.get(name, {}).get("sha256") == entry["sha256"]:
+                    with open(_join(active_dir, name), "rb") as src:
+                        self._write(src, path, entry, wdt)
+                    copied.append(name)
+                    continue
+                res = self._get(_join(base_url, name))
+                try:
+                    self._write(res.raw, path, entry, wdt)
+                finally:
+                    res.close()
+                fetched.append(name)
+            with open(_join(target_dir, _MANIFEST), "w") as f:
+                json.dump(manifest, f)
+        except Exception:
+            _rmtree(target_dir)
+            raise
+
+        version = manifest.get("version")
+        self._save_state(
+            {
+                "slot": target,
+                "previous": active,
+                "version": version,
+                "previous_version": state.get("version"),
+                "trial": True,
+                "boots": 0,
+            }
+        )
+        print(f"OTA: version {version} installed in slot {target}")
+        return {
+            "version": version,
+            "slot": target,
+            "fetched": fetched,
+            "copied": len(copied),
+        }
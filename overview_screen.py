@@ -0,0 +1,142 @@
+"""
+Compact overview of all discovered hosts and VPS entries.
+
+One row per machine with CPU, RAM and temperature (hosts) or disk (VPS).
+Rows are pooled labels, so the screen costs the same for one host as for
+nine. Tapping a row opens that machine on its detail screen. With more
+machines than fit, the last row reads "+N more" and a tap on it shows the
+next page.
+Reserves 40px at the bottom for the navigation bar.
+"""
+
+# noinspection PyUnresolvedReferences
+import lvgl as lv
+
+import theme
+from config import cfg
+
+_NAV_HEIGHT = 40
+_CONTENT_HEIGHT = 320 - _NAV_HEIGHT
+_ROW_TOP = 36
+_ROW_PITCH = 26
+_MAX_ROWS = (_CONTENT_HEIGHT - _ROW_TOP) // _ROW_PITCH
+
+
+class OverviewScreen:
+    """One line per host/VPS; a tap opens the detail screen."""
+
+    REFRESH_MS = 2000
+    DATA_KEY = None  # Spans two sections, see render()
+
+    def __init__(self, host_screen="Host", vps_screen="VPS"):
+        self.host_screen = host_screen
+        self.vps_screen = vps_screen
+        self.screen = lv.obj()
+        self.screen.add_style(theme.SCREEN, 0)
+        self.screen.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
+
+        title = lv.label(self.screen)
+        title.set_text_static("ALL SYSTEMS")
+        title.add_style(theme.TITLE, 0)
+        title.align(lv.ALIGN.TOP_MID, 0, 8)
+
+        self.row_labels = []
+        self._row_styles = []  # Temperature text style per pooled label, or None
+        self._rows = []  # (screen name, host id) per visible row
+        self._more = 0  # Machines after the visible page
+        self._page = 0
+        self._revision = None
+        self._data_mgr = None
+
+    def _row_label(self, index):
+        while len(self.row_labels) <= index:
+            label = lv.label(self.screen)
+            label.add_style(theme.SMALL, 0)
+            label.set_width(228)
+            label.set_pos(6, _ROW_TOP + len(self.row_labels) * _ROW_PITCH)
+            self.row_labels.append(label)
+            self._row_styles.append(None)
+        return self.row_labels[index]
+
+    def render(self, data_mgr):
+        self._data_mgr = data_mgr
+        revision = (data_mgr.revision("host"), data_mgr.revision("vps"))
+        if revision == self._revision:
+            return
+        self._revision = revision
+
+        store = data_mgr.data_store
+        rows = [(self.host_screen, h) for h in sorted(store.get("host", {}))]
+        rows.extend((self.vps_screen, v) for v in sorted(store.get("vps", {})))
+        per_page = _MAX_ROWS if len(rows) <= _MAX_ROWS else _MAX_ROWS - 1
+        if self._page * per_page >= len(rows):
+            self._page = 0
+        start = self._page * per_page
+        self._rows = rows[start : start + per_page]
+        self._more = len(rows) - start - len(self._rows)
+        paged = len(rows) > _MAX_ROWS
+        if paged:
+            # Shown on every page; on the last one it leads back to the first
+            self._show_more(len(rows) - len(self._rows))
+
+        for i, (screen_name, host_id) in enumerate(self._rows):
+            label = self._row_label(i)
+            if screen_name == self.host_screen:
+                text, style = self._host_row(host_id, store["host"][host_id])
+            else:
+                text, style = self._vps_row(host_id, store["vps"][host_id])
+            label.set_text(text)
+            self._row_styles[i] = theme.swap(label, self._row_styles[i], style)
+            label.remove_flag(lv.obj.FLAG.HIDDEN)
+        for i in range(len(self._rows), len(self.row_labels)):
+            if not (paged and i == _MAX_ROWS - 1):
+                self.row_labels[i].add_flag(lv.obj.FLAG.HIDDEN)
+
+    def _show_more(self, others):
+        i = _MAX_ROWS - 1
+        label = self._row_label(i)
+        label.set_text(f"+{others} more  >" if self._more else "<  first page")
+        self._row_styles[i] = theme.swap(label, self._row_styles[i], None)
+        label.remove_flag(lv.obj.FLAG.HIDDEN)
+
+    @staticmethod
+    def _host_row(host_id, data):
+        cpu = data.get("cpu") or [0]
+        temp = data.get("cpu_temp", 0)
+        if temp >= cfg.temp_hot:
+            style = theme.TEXT_HOT
+        elif temp >= cfg.temp_warm:
+            style = theme.TEXT_WARM
+        else:
+            style = None
+        text = "{}  CPU {:.0f}%  RAM {:.0f}%  {:.0f}\xb0C".format(
+            data.get("name", host_id), sum(cpu) / len(cpu), data.get("ram", 0), temp
+        )
+        return text, style
+
+    @staticmethod
+    def _vps_row(host_id, data):
+        text = "{}  CPU {:.0f}%  RAM {:.0f}%  Disk {:.0f}%".format(
+            data.get("NAME", host_id),
+            data.get("CPU", 0),
+            data.get("RAM", 0),
+            data.get("DISK", 0),
+        )
+        return text, None
+
+    def on_touch(self, _x, y):
+        """Return (screen name, host id) of the tapped row, if any."""
+        if y < _ROW_TOP:
+            return None
+        idx = (y - _ROW_TOP) // _ROW_PITCH
+        if idx < len(self._rows):
+            return self._rows[idx]
+        if idx == _MAX_ROWS - 1 and self._data_mgr is not None:
+            # The page row: next page, or back to the first
+            self._page = self._page + 1 if self._more else 0
+            self._revision = None
+            self.render(self._data_mgr)
+        return None
+
+    def get_screen(self):
+        return self.screen
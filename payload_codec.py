@@ -0,0 +1,267 @@
+# payload_codec.py
+"""
+Compact binary payloads for the host/monitor and vps/monitor topics.
+
+A binary frame starts with a one-byte marker (never valid as the first byte
+of a JSON document), a kind byte and a count byte, followed by a fixed
+little-endian struct layout. Values are fixed-point integers (x10) so the
+frames stay small and decoding is a single unpack_from per block.
+
+host/monitor also has a JSON delta mode. Every message carries a 16-bit
+sequence number "seq". A keyframe ("kf": 1) is a complete document; the
+messages in between carry only the fields that changed since the previous
+message. A list field with few changed items is sent as a sparse
+{"index": value} object, and an object field only with its changed keys:
+
+    {"seq": 7, "kf": 1, "cpu": [34.3, 38.3, 34, 38.1], "cpu_temp": 61, ...}
+    {"seq": 8, "cpu": {"1": 41.2}, "net_down": 12.4}
+
+A receiver that sees a gap in the sequence asks for a keyframe by
+publishing retained on <monitor topic>/keyframe; the publisher answers
+with a keyframe and clears the retained request.
+
+Malformed frames raise PayloadError (a ValueError), a delta that patches a
+field the receiver has no keyframe for PartialUpdateError (a TypeError).
+
+The encoders run unchanged under CPython so publishers can share this module.
+"""
+
+import struct
+
+MARKER = 0xB5
+KIND_HOST = 1
+KIND_VPS = 2
+
+# Topics ending in this suffix are always treated as binary frames
+TOPIC_SUFFIX = "/bin"
+
+# Retained full state of a publisher, loaded at connect: <monitor topic>/snapshot
+SNAPSHOT_SUFFIX = "/snapshot"
+
+# Delta mode: keyframe request topic suffix, sequence wrap, keyframe interval
+KEYFRAME_SUFFIX = "/keyframe"
+SEQ_MASK = 0xFFFF
+KEYFRAME_EVERY = 60
+
+_HEADER_FMT = "<BBB"
+_HEADER_SIZE = 3
+
+# cpu_temp, ram, ssd_temp, net_down, net_up (all x10)
+_HOST_FMT = "<hHhII"
+_HOST_SIZE = 14
+# Optional trailer: total RAM in GB (x10); older frames end without it
+_RAM_TOTAL_FMT = "<H"
+_RAM_TOTAL_SIZE = 2
+
+# cpu, ram, disk (x10), uptime in seconds
+_VPS_FMT = "<HHHI"
+_VPS_SIZE = 10
+
+
+class PayloadError(ValueError):
+    """A frame without the marker, or shorter than its kind's layout."""
+
+    def __init__(self, kind, size):
+        super().__init__(f"bad {kind} frame ({size} bytes)")
+
+
+def is_binary(msg):
+    """Return True if msg is a binary frame rather than JSON text."""
+    if not msg or isinstance(msg, str):
+        return False
+    return msg[0] == MARKER
+
+
+def _x10(value):
+    return int(round(float(value) * 10))
+
+
+def encode_host(data):
+    """Encode a host/monitor dict into a binary frame."""
+    cpu = data.get("cpu", ())
+    count = len(cpu)
+    ram_total = data.get("ram_total")
+    size = _HEADER_SIZE + count * 2 + _HOST_SIZE
+    buf = bytearray(size + (_RAM_TOTAL_SIZE if ram_total else 0))
+    struct.pack_into(_HEADER_FMT, buf, 0, MARKER, KIND_HOST, count)
+    offset = _HEADER_SIZE
+    for value in cpu:
+        struct.pack_into("<H", buf, offset, _x10(value))
+        offset += 2
+    struct.pack_into(
+        _HOST_FMT,
+        buf,
+        offset,
+        _x10(data.get("cpu_temp", 0)),
+        _x10(data.get("ram", 0)),
+        _x10(data.get("ssd_temp", 0)),
+        _x10(data.get("net_down", 0)),
+        _x10(data.get("net_up", 0)),
+    )
+    if ram_total:
+        struct.pack_into(_RAM_TOTAL_FMT, buf, size, _x10(ram_total))
+    return bytes(buf)
+
+
+def encode_vps(data):
+    """Encode a vps/monitor dict into a binary frame."""
+    buf = bytearray(_HEADER_SIZE + _VPS_SIZE)
+    struct.pack_into(_HEADER_FMT, buf, 0, MARKER, KIND_VPS, 0)
+    struct.pack_into(
+        _VPS_FMT,
+        buf,
+        _HEADER_SIZE,
+        _x10(data.get("cpu", 0)),
+        _x10(data.get("ram", 0)),
+        _x10(data.get("disk", 0)),
+        int(data.get("uptime", 0)),
+    )
+    return bytes(buf)
+
+
+def frame_kind(buf):
+    """Return the kind byte of a binary frame."""
+    if len(buf) < _HEADER_SIZE or buf[0] != MARKER:
+        raise PayloadError("binary", len(buf))
+    return buf[1]
+
+
+def decode_host(buf, slot):
+    """
+    Decode a host frame into the preallocated slot dict.
+
+    The slot's 'cpu' list is reused and only resized when the core count
+    changes, so steady-state decoding does not build new containers.
+    """
+    count = buf[2]
+    size = _HEADER_SIZE + count * 2 + _HOST_SIZE
+    if len(buf) < size:
+        raise PayloadError("host", len(buf))
+
+    cpu = slot.get("cpu")
+    if cpu is None or len(cpu) != count:
+        cpu = [0] * count
+        slot["cpu"] = cpu
+
+    offset = _HEADER_SIZE
+    for i in range(count):
+        cpu[i] = struct.unpack_from("<H", buf, offset)[0] / 10
+        offset += 2
+
+    cpu_temp, ram, ssd_temp, net_down, net_up = struct.unpack_from(
+        _HOST_FMT, buf, offset
+    )
+    slot["cpu_temp"] = cpu_temp / 10
+    slot["ram"] = ram / 10
+    slot["ssd_temp"] = ssd_temp / 10
+    slot["net_down"] = net_down / 10
+    slot["net_up"] = net_up / 10
+    if len(buf) >= size + _RAM_TOTAL_SIZE:
+        slot["ram_total"] = struct.unpack_from(_RAM_TOTAL_FMT, buf, size)[0] / 10
+    return slot
+
+
+def decode_vps(buf, slot):
+    """Decode a VPS frame into the slot dict using the DataManager key names."""
+    if len(buf) < _HEADER_SIZE + _VPS_SIZE:
+        raise PayloadError("vps", len(buf))
+    cpu, ram, disk, uptime = struct.unpack_from(_VPS_FMT, buf, _HEADER_SIZE)
+    slot["CPU"] = cpu / 10
+    slot["RAM"] = ram / 10
+    slot["DISK"] = disk / 10
+    slot["UPTIME"] = uptime
+    return slot
+
+
+# --- JSON delta mode ---
+
+
+class PartialUpdateError(TypeError):
+    """A sparse update of a key the slot holds no dict or list for yet."""
+
+    def __init__(self, key):
+        super().__init__(f"partial update of {key} without a keyframe")
+
+
+def seq_step(last, seq):
+    """Distance from sequence number last to seq, modulo the 16-bit wrap."""
+    return (seq - last) & SEQ_MASK
+
+
+def merge_delta(slot, delta, fields):
+    """
+    Merge the known fields of a delta message into slot in place.
+
+    Sparse list updates patch the existing list, so the slot keeps its
+    containers like decode_host() does.
+    """
+    for key in fields:
+        if key not in delta:
+            continue
+        value = delta[key]
+        if not isinstance(value, dict):
+            slot[key] = value
+            continue
+        items = slot.get(key)
+        if isinstance(items, dict):
+            items.update(value)
+        elif isinstance(items, list):
+            for index, item in value.items():
+                i = int(index)
+                if i < len(items):
+                    items[i] = item
+        else:
+            raise PartialUpdateError(key)
+    return slot
+
+
+class DeltaEncoder:
+    """
+    Publisher side of the delta mode: turns successive full documents into
+    keyframes and deltas. Values should be rounded to the precision they
+    are displayed with, or every sample differs from the last.
+    """
+
+    def __init__(self, keyframe_every=KEYFRAME_EVERY):
+        self.keyframe_every = keyframe_every
+        self.seq = 0
+        self._last = None
+        self._since_keyframe = 0
+
+    def request_keyframe(self):
+        """Make the next encode() a keyframe."""
+        self._last = None
+
+    def encode(self, data):
+        """Return the message dict to publish for the full document data."""
+        self.seq = (self.seq + 1) & SEQ_MASK
+        last = self._last
+        self._last = {
+            key: value.copy() if isinstance(value, (list, dict)) else value
+            for key, value in data.items()
+        }
+        if last is None or self._since_keyframe + 1 >= self.keyframe_every:
+            self._since_keyframe = 0
+            message = {"seq": self.seq, "kf": 1}
+            message.update(data)
+            return message
+
+        self._since_keyframe += 1
+        message = {"seq": self.seq}
+        for key, value in data.items():
+            old = last.get(key)
+            if value == old:
+                continue
+            if isinstance(value, dict) and isinstance(old, dict):
+                value = {k: v for k, v in value.items() if old.get(k) != v}
+            elif isinstance(value, list) and isinstance(old, list):
+                if len(value) == len(old):
+                    changed = {
+                        str(i): item
+                        for i, (item, prev) in enumerate(zip(value, old))
+                        if item != prev
+                    }
+                    if len(changed) * 2 <= len(value):
+                        value = changed
+            message[key] = value
+        return message
@@ -0,0 +1,105 @@
+"""
+Refresh scheduler for the active screen.
+
+Every screen class declares its refresh policy as two class attributes:
+
+    REFRESH_MS  minimum time between renders (0 = as fast as data arrives)
+    DATA_KEY    DataManager section it renders, or None for time-driven
+                screens that render on every REFRESH_MS tick. Pooled
+                per-host screens override it on the instance with a
+                (section, host_id) tuple; a changed key renders at once.
+
+A data-driven screen whose content also ages without new data (sensor
+staleness) may set an expires_at attribute, a ticks_ms deadline worked out
+in its render(). The screen then renders again once the deadline has
+passed, even if its data did not change.
+
+Messages arriving between two renders are coalesced into a single render of
+the latest state. Hidden screens are not touched; DataManager keeps their
+latest state, and a screen gets one catch-up render when it becomes active,
+unless it already shows the latest revision of its data. After a bulk load
+(the retained state at boot) render_all() renders every screen once.
+"""
+
+import time
+
+
+class ScreenScheduler:
+    """Decides when the active screen renders, based on its policy."""
+
+    def __init__(self, disp_man, data_mgr):
+        self.disp_man = disp_man
+        self.data_mgr = data_mgr
+        self.renders = 0
+        self._active = None
+        self._rendered_rev = {}  # screen name -> data revision last rendered
+        self._rendered_key = {}  # screen name -> DATA_KEY last rendered
+        self._next_due = {}  # screen name -> ticks_ms of the next allowed render
+
+    def invalidate(self, name):
+        """Force a full render of name the next time it is active."""
+        self._rendered_rev.pop(name, None)
+        self._rendered_key.pop(name, None)
+        if name == self._active:
+            self._active = None
+
+    def tick(self, now=None):
+        """Render the active screen if its policy says so."""
+        name = self.disp_man.active_name
+        if name is None:
+            return
+        if now is None:
+            now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        screen = self.disp_man.screens[name]
+
+        if name != self._active:
+            # Catch-up render from the aggregated state
+            self._active = name
+            if not self._is_current(name, screen, now):
+                self._render(name, screen, now)
+            return
+
+        if screen.DATA_KEY != self._rendered_key.get(name):
+            # The screen switched to another host
+            self._render(name, screen, now)
+            return
+        if time.ticks_diff(now, self._next_due.get(name, now)) < 0:  # ty:ignore[unresolved-attribute]
+            return
+        key = screen.DATA_KEY
+        if key is not None and not self._expired(screen, now):
+            if self.data_mgr.revision(key) == self._rendered_rev.get(name):
+                return
+        self._render(name, screen, now)
+
+    def render_all(self, now=None):
+        """Render every screen once, active or not."""
+        if now is None:
+            now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        for name, screen in self.disp_man.screens.items():
+            self._render(name, screen, now)
+        self._active = self.disp_man.active_name
+
+    def _is_current(self, name, screen, now):
+        """True if a data-driven screen already shows its latest data."""
+        key = screen.DATA_KEY
+        return (
+            key is not None
+            and key == self._rendered_key.get(name)
+            and self.data_mgr.revision(key) == self._rendered_rev.get(name)
+            and not self._expired(screen, now)
+        )
+
+    @staticmethod
+    def _expired(screen, now):
+        expires = getattr(screen, "expires_at", None)
+        return expires is not None and time.ticks_diff(now, expires) >= 0  # ty:ignore[unresolved-attribute]
+
+    def _render(self, name, screen, now):
+        self._next_due[name] = time.ticks_add(now, screen.REFRESH_MS)  # ty:ignore[unresolved-attribute]
+        self.renders += 1
+        screen.render(self.data_mgr)
+        # Read the key after rendering, a pooled screen may pick its host there
+        key = screen.DATA_KEY
+        self._rendered_key[name] = key
+        if key is not None:
+            self._rendered_rev[name] = self.data_mgr.revision(key)
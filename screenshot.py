@@ -0,0 +1,141 @@
+"""
+Screenshots taken from the display flush callback.
+
+The LVGL draw buffers only ever hold part of the screen, so a capture walks
+down the screen in bands of _BAND_ROWS rows: each band is invalidated, the
+flush callback copies its rows (still in LVGL's native RGB565 order, before
+the driver sends them) into a band buffer, and poll() encodes the band and
+publishes it as one chunk (see screenshot_codec.py) before requesting the
+next. Memory use is two band-sized buffers instead of a 150 KB frame.
+
+Start a capture with {"screenshot": true} (RLE) or {"screenshot": "raw"}
+on display/{client_id}/set; scripts/screenshot_decode.py turns the chunks
+into a PNG.
+"""
+
+import time
+
+# noinspection PyUnresolvedReferences
+import lvgl as lv
+
+import screenshot_codec as codec
+from memory import mem
+
+_BAND_ROWS = 20
+_BAND_TIMEOUT_MS = 2000
+
+
+class Screenshot:
+    """Band-by-band capture hooked into a display driver's flush callback."""
+
+    def __init__(self, driver, width, height):
+        self.width = width
+        self.height = height
+        self.active = False
+        # Wrap the driver's flush callback; it stays in charge of sending
+        # noinspection PyProtectedMember
+        self._flush = driver._flush_cb
+        # noinspection PyProtectedMember
+        driver._disp_drv.set_flush_cb(self._flush_cb)
+        self._area = lv.area_t()
+        self._capture_id = 0
+        self._format = codec.FORMAT_RLE
+        self._raw = None
+        self._out = None
+        self._y = 0
+        self._rows = 0
+        self._next_row = 0  # First row of the band not captured yet
+        self._requested_at = 0
+
+    def start(self, fmt=codec.FORMAT_RLE):
+        """Begin a capture; returns False if one is already running."""
+        if self.active:
+            return False
+        pixels = self.width * _BAND_ROWS
+        self._raw = mem.buffer("screenshot", pixels * 2)
+        self._out = mem.buffer(
+            "screenshot_out", codec.HEADER_SIZE + codec.max_encoded_size(pixels)
+        )
+        self._capture_id = (self._capture_id + 1) & 0xFFFF
+        self._format = fmt
+        self.active = True
+        self._request_band(0)
+        return True
+
+    def _request_band(self, y):
+        self._y = y
+        self._rows = min(_BAND_ROWS, self.height - y)
+        self._next_row = y
+        self._requested_at = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        area = self._area
+        area.x1 = 0
+        area.y1 = y
+        area.x2 = self.width - 1
+        area.y2 = y + self._rows - 1
+        lv.screen_active().invalidate_area(area)
+
+    def _flush_cb(self, disp, area, color_p):
+        if self.active and self._next_row < self._y + self._rows:
+            self._capture(area, color_p)
+        self._flush(disp, area, color_p)
+
+    def _capture(self, area, color_p):
+        """Copy the band rows contained in a flushed full-width area."""
+        if area.x1 != 0 or area.x2 != self.width - 1:
+            return
+        first = max(area.y1, self._next_row)
+        last = min(area.y2 + 1, self._y + self._rows)
+        if first != self._next_row or last <= first:
+            return
+        row_bytes = self.width * 2
+        src = color_p.__dereference__((area.y2 - area.y1 + 1) * row_bytes)
+        dst = (first - self._y) * row_bytes
+        offset = (first - area.y1) * row_bytes
+        length = (last - first) * row_bytes
+        self._raw[dst : dst + length] = src[offset : offset + length]
+        self._next_row = last
+
+    def poll(self, mqtt, topic):
+        """Publish the captured band and request the next. Call from the loop."""
+        if not self.active:
+            return
+        if not mqtt.is_connected:
+            self._stop("MQTT disconnected")
+            return
+        band_end = self._y + self._rows
+        if self._next_row < band_end:
+            waited = time.ticks_diff(time.ticks_ms(), self._requested_at)  # ty:ignore[unresolved-attribute]
+            if waited > _BAND_TIMEOUT_MS:
+                self._stop(f"row {self._next_row} was not rendered")
+            return
+        if mqtt.outbox.pending:
+            return  # Previous band still queued
+
+        pixels = self.width * self._rows
+        if self._format == codec.FORMAT_RLE:
+            end = codec.encode_rle(self._raw, pixels, self._out, codec.HEADER_SIZE)
+        else:
+            end = codec.HEADER_SIZE + pixels * 2
+            self._out[codec.HEADER_SIZE : end] = memoryview(self._raw)[: pixels * 2]
+        codec.pack_header(
+            self._out,
+            self._format,
+            self._capture_id,
+            self.width,
+            self.height,
+            self._y,
+            self._rows,
+            end - codec.HEADER_SIZE,
+        )
+        mqtt.publish(bytes(memoryview(self._out)[:end]), topic)
+        if band_end < self.height:
+            self._request_band(band_end)
+        else:
+            self._stop(None)
+
+    def _stop(self, error):
+        self.active = False
+        if error:
+            print(f"Screenshot {self._capture_id} aborted: {error}")
+        else:
+            print(f"Screenshot {self._capture_id} sent")
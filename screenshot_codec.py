@@ -0,0 +1,117 @@
+# screenshot_codec.py
+"""
+Chunk format for screenshots sent on status/{client_id}/screenshot.
+
+A screenshot is a sequence of chunks, one per band of rows. Each chunk is a
+16-byte little-endian header followed by the band's pixels, either raw
+RGB565 (LVGL's native little-endian order) or run-length encoded:
+
+    magic, format, capture id, width, height, first row, rows, data length
+
+The RLE works on 16-bit pixels, PackBits style: a control byte below 128
+is followed by control+1 literal pixels, a control byte c >= 128 by one
+pixel repeated c-126 times (2..129). Flat dashboard backgrounds shrink to
+a few bytes per row; in the worst case a band grows by about one byte
+per 128 pixels.
+
+Malformed data raises ChunkError (a ValueError). No MicroPython-only
+imports, so scripts/screenshot_decode.py shares it.
+"""
+
+import struct
+
+MAGIC = 0x5C
+FORMAT_RAW = 0
+FORMAT_RLE = 1
+
+HEADER_FMT = "<BBHHHHHI"
+HEADER_SIZE = 16
+
+_MAX_LITERAL = 128
+_MAX_RUN = 129
+
+
+class ChunkError(ValueError):
+    """A malformed chunk or band; reason is a key of _REASONS."""
+
+    _REASONS = {
+        "magic": "not a screenshot chunk",
+        "overrun": "RLE data overruns the band",
+        "truncated": "truncated chunk",
+        "band": "band of the wrong size",
+    }
+
+    def __init__(self, reason, detail=""):
+        message = self._REASONS[reason]
+        super().__init__(f"{message}: {detail}" if detail else message)
+
+
+def max_encoded_size(pixels):
+    """Upper bound of the RLE size of pixels pixels."""
+    return pixels * 2 + pixels // _MAX_LITERAL + 1
+
+
+def pack_header(buf, fmt, capture_id, width, height, y, rows, length):
+    struct.pack_into(
+        HEADER_FMT, buf, 0, MAGIC, fmt, capture_id, width, height, y, rows, length
+    )
+
+
+def unpack_header(buf, offset=0):
+    """Return (format, capture id, width, height, y, rows, data length)."""
+    fields = struct.unpack_from(HEADER_FMT, buf, offset)
+    if fields[0] != MAGIC:
+        raise ChunkError("magic", f"byte {offset}")
+    return fields[1:]
+
+
+def encode_rle(src, pixels, dst, offset=0):
+    """RLE-encode pixels RGB565 pixels from src into dst; returns the end offset."""
+    out = offset
+    i = 0
+    end = pixels * 2
+    while i < end:
+        lo = src[i]
+        hi = src[i + 1]
+        # Length of the run of identical pixels starting at i
+        j = i + 2
+        while j < end and j - i < _MAX_RUN * 2 and src[j] == lo and src[j + 1] == hi:
+            j += 2
+        if j - i >= 4:
+            dst[out] = (j - i) // 2 + 126
+            dst[out + 1] = lo
+            dst[out + 2] = hi
+            out += 3
+            i = j
+            continue
+        # Literal: up to the next pair of equal pixels
+        start = i
+        i += 2
+        while i < end and i - start < _MAX_LITERAL * 2:
+            if i + 2 < end and src[i] == src[i + 2] and src[i + 1] == src[i + 3]:
+                break
+            i += 2
+        dst[out] = (i - start) // 2 - 1
+        out += 1
+        for k in range(start, i):
+            dst[out] = src[k]
+            out += 1
+    return out
+
+
+def decode_rle(data, pixels):
+    """Decode RLE data into a bytearray of pixels RGB565 pixels."""
+    out = bytearray()
+    i = 0
+    while len(out) < pixels * 2:
+        control = data[i]
+        if control < _MAX_LITERAL:
+            n = (control + 1) * 2
+            out += data[i + 1 : i + 1 + n]
+            i += 1 + n
+        else:
+            out += data[i + 1 : i + 3] * (control - 126)
+            i += 3
+    if len(out) != pixels * 2:
+        raise ChunkError("overrun", f"{len(out)} of {pixels * 2} bytes")
+    return out
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Alert Benchmark
+
+Checks the hysteresis behaviour of the alert rules and measures the cost of
+evaluating them per ingested sample. Runs on the host with CPython; the
+per-rule cost relative to the JSON decode time from payload_benchmark.py is
+what matters, not the absolute numbers.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import alerts  # noqa: E402
+
+ITERATIONS = 20000
+
+HOST_SAMPLE = {
+    "cpu": [34.3, 38.3, 34, 38.1],
+    "cpu_temp": 61,
+    "ram": 34.6,
+    "ssd_temp": 30.85,
+    "net_down": 4.59375,
+}
+
+VPS_SAMPLE = {"CPU": 12.5, "RAM": 45.3, "DISK": 67.1, "UPTIME": 123456}
+
+
+def check_hysteresis() -> None:
+    """Drive one host through a temperature curve and verify transitions."""
+    engine = alerts.AlertEngine(
+        rules=(("hot", "host", "cpu_temp", alerts.ABOVE, 80, 5),)
+    )
+    seen = []
+    engine.on_alert(lambda a: seen.append((a["value"], a["state"])))
+    for now, temp in enumerate((70, 81, 79, 76, 82, 74, 78, 81)):
+        engine.evaluate("host", "h1", {"cpu_temp": temp}, now * 1000)
+    expected = [(81, "raised"), (74, "cleared"), (81, "raised")]
+    if seen != expected:
+        print(f"✗ Hysteresis: expected {expected}, got {seen}")
+        sys.exit(1)
+    print("✓ Hysteresis transitions as expected")
+
+
+def check_removed_rule() -> None:
+    """A raised alert of a rule dropped from alert_rules gets cleared."""
+    from config import cfg  # noqa: PLC0415
+
+    engine = alerts.AlertEngine(rules=())
+    seen = []
+    engine.on_alert(lambda a: seen.append((a["rule"], a["state"])))
+    cfg._assign({"alert_rules": [["fan", "host", "fan", alerts.ABOVE, 50, 5]]})
+    engine._config_changed(["alert_rules"])
+    engine.evaluate("host", "h1", {"fan": 60}, 0)
+    cfg._assign({"alert_rules": []})
+    engine._config_changed(["alert_rules"])
+    if seen != [("fan", "raised"), ("fan", "cleared")] or engine.active_messages():
+        print(f"✗ Removed rule: transitions {seen}, {engine.active_messages()}")
+        sys.exit(1)
+    print("✓ Removing a rule clears its raised alerts")
+
+
+def _time_per_sample(engine, section: str, sample: dict) -> float:
+    """Return the mean cost of one evaluate() call in microseconds."""
+    now = 0
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        now += 1000
+        engine.evaluate(section, "bench", sample, now)
+    return (time.perf_counter() - start) * 1_000_000 / ITERATIONS
+
+
+def main() -> None:
+    print("=" * 60)
+    print(f"Alert Benchmark ({ITERATIONS} iterations)")
+    print("=" * 60)
+    check_hysteresis()
+    check_removed_rule()
+
+    engine = alerts.AlertEngine()
+    for section, sample in (("host", HOST_SAMPLE), ("vps", VPS_SAMPLE)):
+        count = sum(1 for r in alerts.DEFAULT_RULES if r[1] == section)
+        us = _time_per_sample(engine, section, sample)
+        per_rule = us / count
+        print(f"{section}: {count} rules  {us:6.2f} us/sample  {per_rule:5.2f} us/rule")
+    if engine.transitions:
+        print(f"✗ Steady samples caused {engine.transitions} transitions")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
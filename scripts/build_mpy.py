@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+MPY Build Script
+
+Cross-compiles the dashboard modules to .mpy bytecode with mpy-cross so the
+device skips on-device compilation at import time, and optionally writes a
+frozen-module manifest for the lvgl_micropython firmware build.
+
+With --release VERSION, a manifest.json with the hash and size of every file
+is written next to them, so the output directory can be served over HTTP as
+an OTA update (see ota.py).
+
+With --report, import times are measured under the Unix MicroPython port for
+source, .mpy and (if a frozen binary is given) frozen modules. Hardware
+modules (lvgl, machine, network, ...) must be provided as stubs via --stubs.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+BUILD_DIR = PROJECT_DIR / "build"
+
+# Executed as source by MicroPython, or run by hand / holding credentials
+SOURCE_ONLY = {"boot.py", "main.py", "secrets.py", "touch_cal.py", "__init__.py"}
+
+_IMPORT_PROBE = (
+    "import time\n"
+    "t = time.ticks_us()\n"
+    "import {name}\n"
+    "print(time.ticks_diff(time.ticks_us(), t))\n"
+)
+
+
+def app_modules() -> list[Path]:
+    """Return the project modules that are compiled or frozen."""
+    return sorted(p for p in PROJECT_DIR.glob("*.py") if p.name not in SOURCE_ONLY)
+
+
+def compile_mpy(mpy_cross: str, out_dir: Path, opt_level: int) -> list[Path]:
+    """Compile every app module to out_dir and copy the source-only files."""
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True)
+
+    compiled = []
+    for src in app_modules():
+        target = out_dir / (src.stem + ".mpy")
+        cmd = [mpy_cross, f"-O{opt_level}", "-o", str(target), str(src)]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            print(f"  ✗ {src.name}: {result.stderr.strip()}")
+            continue
+        print(f"  ✓ {src.name} → {target.name} ({target.stat().st_size} bytes)")
+        compiled.append(target)
+
+    for name in ("boot.py", "main.py"):
+        shutil.copy2(PROJECT_DIR / name, out_dir / name)
+    return compiled
+
+
+def write_manifest(path: Path) -> None:
+    """Write a frozen manifest for make.py FROZEN_MANIFEST=<path>."""
+    lines = [
+        "# Generated by scripts/build_mpy.py - do not edit",
+        'include("$(PORT_DIR)/boards/manifest.py")',
+    ]
+    lines.extend(
+        f'module("{src.name}", base_path="{PROJECT_DIR}")' for src in app_modules()
+    )
+    path.write_text("\n".join(lines) + "\n")
+    print(f"  ✓ Manifest written: {path}")
+
+
+def write_release(out_dir: Path, version: str) -> None:
+    """Write the OTA manifest.json for the files in out_dir."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    from ota import make_manifest  # noqa: PLC0415
+
+    manifest = make_manifest(str(out_dir), version)
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=1) + "\n")
+    print(f"  ✓ OTA manifest for {len(manifest['files'])} files, version {version}")
+
+
+def _time_import(micropython: str, name: str, path_entries: list[Path]) -> int:
+    """Import one module in a fresh interpreter. Returns microseconds or -1."""
+    env = dict(os.environ)
+    env["MICROPYPATH"] = os.pathsep.join(str(p) for p in path_entries)
+    result = subprocess.run(
+        [micropython, "-c", _IMPORT_PROBE.format(name=name)],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    try:
+        return int(result.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        return -1
+
+
+def _cell(value: int | None) -> str:
+    if value is None:
+        return "n/a"
+    return "error" if value < 0 else str(value)
+
+
+def import_report(
+    micropython: str, stubs: Path, mpy_dir: Path, frozen: str | None
+) -> None:
+    """Print a markdown table of import times per module and variant."""
+    print("\n| Module | Source (us) | .mpy (us) | Frozen (us) |")
+    print("|:-------|------------:|----------:|------------:|")
+    for src in app_modules():
+        name = src.stem
+        source_us = _time_import(micropython, name, [stubs, PROJECT_DIR])
+        mpy_us = _time_import(micropython, name, [stubs, mpy_dir])
+        frozen_us = None
+        if frozen:
+            frozen_us = _time_import(frozen, name, [stubs, ".frozen"])
+        cells = " | ".join(_cell(v) for v in (source_us, mpy_us, frozen_us))
+        print(f"| {name} | {cells} |")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mpy-cross", default="mpy-cross", help="mpy-cross binary")
+    parser.add_argument("-O", dest="opt_level", type=int, default=2)
+    parser.add_argument("--out", type=Path, default=BUILD_DIR / "mpy")
+    parser.add_argument(
+        "--manifest", action="store_true", help="also write build/manifest.py"
+    )
+    parser.add_argument(
+        "--release", metavar="VERSION", help="also write the OTA manifest.json"
+    )
+    parser.add_argument(
+        "--report", action="store_true", help="measure import times (Unix port)"
+    )
+    parser.add_argument("--micropython", default="micropython")
+    parser.add_argument("--stubs", type=Path, help="directory with hardware stubs")
+    parser.add_argument(
+        "--frozen-micropython", help="Unix port built with build/manifest.py"
+    )
+    args = parser.parse_args()
+
+    if shutil.which(args.mpy_cross) is None:
+        print(f"ERROR: '{args.mpy_cross}' not found!")
+        print("Please run: pip install mpy-cross (matching the firmware version)")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("Cross-compiling modules to .mpy")
+    print("=" * 60)
+    compiled = compile_mpy(args.mpy_cross, args.out, args.opt_level)
+    print(f"\n✓ {len(compiled)} modules compiled into '{args.out}'.")
+
+    if args.manifest:
+        write_manifest(BUILD_DIR / "manifest.py")
+
+    if args.release:
+        write_release(args.out, args.release)
+
+    if args.report:
+        if args.stubs is None:
+            print("ERROR: --report needs --stubs <dir> for lvgl/machine/network.")
+            sys.exit(1)
+        import_report(args.micropython, args.stubs, args.out, args.frozen_micropython)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Cold Start Simulation
+
+Measures the time from MQTT connect to a fully populated dashboard after a
+reboot. The real MQTT wrapper, DataManager and ScreenScheduler run against
+an in-process broker stand-in on a simulated clock, with the main loop's
+50 ms pass, in three setups:
+
+  live only      no retained state; every screen waits for each
+                 publisher's next cycle
+  snapshots      retained snapshots, consumed one per loop pass as before
+  snapshots +    retained snapshots loaded with MQTT.drain() right after
+  drain          subscribing, then ScreenScheduler.render_all()
+
+As in main.py, the display command handler and the alert listeners are
+registered before connecting: a retained screen command and an alert raised
+by a retained snapshot must take effect during the drain, before the first
+render.
+
+The link and ESP32 costs below are assumptions; the comparison between the
+setups is the point, not the absolute times.
+"""
+
+import json
+import re
+import sys
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+HOSTS = 6
+VPSES = 3
+SENSORS = 6
+INTERVAL_MS = {"host": 2000, "vps": 5000, "sensors": 30000}  # Publisher cycles
+RTT_MS = 20  # Round trip to the broker
+DELIVERY_MS = 2  # Spacing of queued messages on the link
+MESSAGE_MS = 1.5  # ESP32 cost of decoding and storing one message
+LOOP_SLEEP_MS = 50
+RENDER_MS = {"Host": 12, "VPS": 6, "Temp": 8, "All": 10}
+ACTIVE = "All"  # Selected by a retained display command
+DEFAULT = "Temp"  # Shown before the command arrives
+HOT_HOST = "h0"  # Its snapshot raises the cpu_temp alert
+TIMEOUT_MS = 60000
+
+
+class _Clock:
+    now = 0.0
+
+
+def _install_stubs():
+    """Device modules for CPython; time and the socket run on _Clock."""
+    import gc  # noqa: PLC0415
+
+    time.ticks_ms = lambda: int(_Clock.now)
+    time.ticks_add = lambda t, delta: t + delta
+    time.ticks_diff = lambda a, b: a - b
+
+    def sleep_ms(ms):
+        _Clock.now += ms
+
+    time.sleep_ms = sleep_ms
+    gc.threshold = lambda *_args: None
+    gc.mem_free = lambda: 1 << 20
+    gc.mem_alloc = lambda: 0
+
+    secrets = types.ModuleType("secrets")
+    secrets.MQTT_BROKER = "localhost"
+    secrets.MQTT_PORT = 1883
+    secrets.MQTT_USER = secrets.MQTT_PASS = None
+    secrets.MQTT_CLIENT_ID = "dashboard"
+    secrets.MQTT_USE_SSL = False
+    sys.modules["secrets"] = secrets
+    sys.modules["ujson"] = json
+    sys.modules["ubinascii"] = __import__("binascii")
+    umqtt = types.ModuleType("umqtt")
+    umqtt.simple = types.ModuleType("umqtt.simple")
+    umqtt.simple.MQTTClient = None  # Bound to a _Broker per run()
+    sys.modules["umqtt"] = umqtt
+    sys.modules["umqtt.simple"] = umqtt.simple
+
+
+def _matches(pattern, topic):
+    regex = re.escape(pattern).replace(r"\+", "[^/]+").replace("/\\#", "(/.*)?")
+    return re.fullmatch(regex, topic) is not None
+
+
+class _Broker:
+    """Retained store plus publishers that send on their own cycle."""
+
+    def __init__(self, retained, publishers):
+        self.retained = retained  # topic -> payload
+        self.publishers = publishers  # (topic, payload, interval, phase)
+        self.client = None
+
+    def deliver_live(self, since, until):
+        """Queue the publisher messages sent in (since, until]."""
+        for topic, payload, interval, phase in self.publishers:
+            t = phase
+            while t <= until:
+                if t > since:
+                    self.client.queue(topic, payload, t + RTT_MS / 2)
+                t += interval
+
+
+class _Client:
+    """umqtt.simple.MQTTClient stand-in: one message per check_msg()."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        broker.client = self
+        self.cb = None
+        self.subscriptions = []
+        self.inbox = []  # (arrival, topic, payload), sorted
+        self._live_until = 0.0
+
+    def set_callback(self, cb):
+        self.cb = cb
+
+    def set_last_will(self, *_args, **_kwargs):
+        pass
+
+    def connect(self):
+        _Clock.now += 2 * RTT_MS
+        self._live_until = _Clock.now
+
+    def disconnect(self):
+        pass
+
+    def publish(self, *_args, **_kwargs):
+        pass
+
+    def subscribe(self, pattern):
+        _Clock.now += RTT_MS  # Waits for the SUBACK
+        self.subscriptions.append(pattern)
+        for topic, payload in self.broker.retained.items():
+            if _matches(pattern, topic):
+                self.queue(topic, payload, _Clock.now)
+
+    def queue(self, topic, payload, sent):
+        if not any(_matches(p, topic) for p in self.subscriptions):
+            return
+        last = self.inbox[-1][0] if self.inbox else 0
+        self.inbox.append((max(sent + RTT_MS / 2, last + DELIVERY_MS), topic, payload))
+        self.inbox.sort(key=lambda item: item[0])
+
+    def check_msg(self):
+        self.broker.deliver_live(self._live_until, _Clock.now)
+        self._live_until = _Clock.now
+        if self.inbox and self.inbox[0][0] <= _Clock.now:
+            _, topic, payload = self.inbox.pop(0)
+            _Clock.now += MESSAGE_MS
+            self.cb(topic.encode(), payload)
+
+
+class _Screen:
+    """Render-counting stand-in with a real screen's refresh policy."""
+
+    def __init__(self, name, refresh_ms, data_key, sections, expected):
+        self.name = name
+        self.REFRESH_MS = refresh_ms
+        self.DATA_KEY = data_key
+        self.sections = sections
+        self.expected = expected
+        self.renders = 0
+        self.populated_at = None
+
+    def render(self, data_mgr):
+        _Clock.now += RENDER_MS[self.name]
+        self.renders += 1
+        store = data_mgr.get_all_data()
+        complete = all(len(store[s]) >= self.expected[s] for s in self.sections)
+        if complete and self.populated_at is None:
+            self.populated_at = _Clock.now
+
+
+class _Display:
+    """Display.handle_command's screen switch without LVGL."""
+
+    command_topic = "display/dashboard/set"
+
+    def __init__(self, screens):
+        self.screens = {screen.name: screen for screen in screens}
+        self.active_name = DEFAULT
+
+    def handle_command(self, topic, msg):
+        if topic != self.command_topic:
+            return
+        name = json.loads(msg).get("screen")
+        if name in self.screens:
+            self.active_name = name
+
+
+def _scenario():
+    retained = {_Display.command_topic: json.dumps({"screen": ACTIVE}).encode()}
+    publishers = []
+    for i in range(HOSTS):
+        temp = 90 if f"h{i}" == HOT_HOST else 50
+        doc = {"name": f"host{i}", "cpu": [5, 7, 3, 4], "cpu_temp": temp, "ram": 40}
+        payload = json.dumps(doc).encode()
+        retained[f"host/h{i}/monitor/snapshot"] = payload
+        publishers.append((f"host/h{i}/monitor", payload, INTERVAL_MS["host"], i * 300))
+    for i in range(VPSES):
+        payload = json.dumps({"cpu": 10, "ram": 40, "disk": 60, "uptime": 99}).encode()
+        retained[f"vps/v{i}/monitor/snapshot"] = payload
+        publishers.append((f"vps/v{i}/monitor", payload, INTERVAL_MS["vps"], i * 1500))
+    for i in range(SENSORS):
+        payload = json.dumps({"id": f"DS18B20_{i}", "Temp": 21.5}).encode()
+        retained[f"Sensors/ds{i}"] = payload
+        phase = i * 4000
+        publishers.append((f"Sensors/ds{i}", payload, INTERVAL_MS["sensors"], phase))
+    return retained, publishers
+
+
+def run(snapshots, drain):
+    """
+    Return (ms to the active screen populated, ms to all, renders, loaded,
+    alerts raised by the end of the drain).
+    """
+    import data_manager  # noqa: PLC0415
+    import mqtt_client  # noqa: PLC0415
+    from alerts import AlertEngine  # noqa: PLC0415
+    from screen_scheduler import ScreenScheduler  # noqa: PLC0415
+
+    retained, publishers = _scenario()
+    if not snapshots:
+        retained = {_Display.command_topic: retained[_Display.command_topic]}
+    broker = _Broker(retained, publishers)
+    mqtt_client.MQTTClient = lambda **_kwargs: _Client(broker)
+    _Clock.now = 0.0
+
+    expected = {"host": HOSTS, "vps": VPSES, "sensors": SENSORS}
+    screens = [
+        _Screen("Host", 0, "host", ("host",), expected),
+        _Screen("VPS", 5000, "vps", ("vps",), expected),
+        _Screen("Temp", 500, "sensors", ("sensors",), expected),
+        _Screen("All", 2000, None, ("host", "vps"), expected),
+    ]
+    alerts = AlertEngine()
+    raised = []
+    data_mgr = data_manager.DataManager(alerts)
+    display = _Display(screens)
+    mqtt = mqtt_client.MQTT()
+    mqtt.set_callback(data_mgr.process_message)
+    mqtt.set_callback(display.handle_command)
+    alerts.on_alert(lambda alert: raised.append(alert["host"]))
+    scheduler = ScreenScheduler(display, data_mgr)
+
+    start = _Clock.now
+    mqtt.connect()
+    for topic in (*data_manager.TOPICS, _Display.command_topic):
+        mqtt.subscribe(topic)
+    loaded = mqtt.drain() if drain else 0
+    raised_at_drain = list(raised)
+    if drain:
+        if display.active_name != ACTIVE:
+            _fail(f"retained screen command not applied: {display.active_name}")
+        scheduler.render_all()
+
+    active = screens[-1]
+    complete_at = None  # Store complete: hidden screens render it on activation
+    store = data_mgr.get_all_data()
+    while _Clock.now - start < TIMEOUT_MS:
+        mqtt.check_msg()
+        scheduler.tick()
+        if complete_at is None and all(len(store[s]) >= n for s, n in expected.items()):
+            complete_at = _Clock.now
+        if complete_at is not None and active.populated_at is not None:
+            break
+        time.sleep_ms(LOOP_SLEEP_MS)
+    else:
+        _fail("the dashboard was not populated within the timeout")
+    renders = sum(screen.renders for screen in screens)
+    return (
+        active.populated_at - start,
+        complete_at - start,
+        renders,
+        loaded,
+        raised_at_drain,
+    )
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+def main() -> None:
+    print("=" * 60)
+    print("Cold Start Simulation")
+    print("=" * 60)
+    retained, _ = _scenario()
+    print(
+        f"{HOSTS} hosts, {VPSES} VPS, {SENSORS} sensors, {len(retained) - 1} retained "
+        f"snapshots; active screen {ACTIVE}"
+    )
+    print("                     active screen    all data    renders")
+    results = {}
+    for name, snapshots, drain in (
+        ("live only", False, False),
+        ("snapshots", True, False),
+        ("snapshots + drain", True, True),
+    ):
+        results[name] = run(snapshots, drain)
+        active, complete, renders, _, _ = results[name]
+        print(f"  {name:17s} {active:10.0f} ms {complete:9.0f} ms {renders:8d}")
+
+    _, complete, renders, loaded, raised = results["snapshots + drain"]
+    if loaded < len(retained):
+        _fail(f"drain() loaded {loaded} messages, {len(retained)} are retained")
+    if renders != len(RENDER_MS):
+        _fail(f"expected one render per screen, got {renders}")
+    if raised != [HOT_HOST]:
+        _fail(f"alerts delivered during the drain: {raised}, expected {HOT_HOST}")
+    speedup = results["live only"][1] / complete
+    print(
+        f"✓ Retained state loaded in one batch ({loaded} messages), one render "
+        f"per screen, all data {speedup:.0f}x sooner than live only"
+    )
+    print(
+        "✓ Retained screen command and the snapshot's alert handled during the "
+        "drain, before the first render"
+    )
+
+
+if __name__ == "__main__":
+    _install_stubs()
+    main()
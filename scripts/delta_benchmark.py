@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Delta Benchmark
+
+Compares full host/monitor documents with the delta mode of payload_codec.py
+on a simulated one-hour trace (8 cores, one sample every 2 s, values
+rounded like scripts/host_publisher.py rounds them):
+
+- payload and wire bytes per message, wire bytes including the MQTT PUBLISH
+  header and the TLS record overhead each message pays
+- decode-and-merge time per message through DataManager
+- recovery from lost messages: gaps must trigger keyframe requests and the
+  dashboard's copy must match the publisher's again after the keyframe
+
+Runs on the host with CPython; the byte counts carry over to the device.
+"""
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.modules.setdefault("ujson", json)  # data_manager imports ujson
+
+import payload_codec  # noqa: E402
+from data_manager import DataManager  # noqa: E402
+
+SAMPLES = 1800
+CORES = 8
+TOPIC = "host/desk/monitor"
+TLS_RECORD = 29  # TLS 1.2 AES-GCM: 5 B header, 8 B explicit nonce, 16 B tag
+LOSS = 0.02
+FIELDS = (
+    "cpu",
+    "cpu_temp",
+    "ram",
+    "ssd_temp",
+    "net_down",
+    "net_up",
+    "disk_read",
+    "disk_write",
+    "net",
+    "name",
+    "ram_total",
+)
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+def trace(seed=1):
+    """Yield SAMPLES host documents of a mostly idle desktop with bursts."""
+    rng = random.Random(seed)
+    cpu = [3.0] * CORES
+    temp, ssd, ram = 45.0, 34.0, 30.0
+    for _ in range(SAMPLES):
+        burst = rng.random() < 0.05
+        for i in range(CORES):
+            target = rng.uniform(60, 100) if burst and i < 2 else 3.0
+            cpu[i] = max(0.0, min(100.0, cpu[i] + (target - cpu[i]) * 0.5))
+            cpu[i] += rng.gauss(0, 0.6)
+        temp += (40 + sum(cpu) / CORES * 0.5 - temp) * 0.1
+        ssd += rng.gauss(0, 0.02)
+        ram = max(5.0, min(95.0, ram + rng.gauss(0, 0.05)))
+        active = rng.random() < 0.15
+        down = round(rng.expovariate(1 / 300), 1) if active else 0.0
+        up = round(rng.expovariate(1 / 40), 1) if active else 0.0
+        write = round(rng.expovariate(1 / 200), 1) if rng.random() < 0.3 else 0.0
+        yield {
+            "name": "desk",
+            "cpu": [max(0, round(p)) for p in cpu],
+            "cpu_temp": round(temp),
+            "ram": round(ram, 1),
+            "ram_total": 32,
+            "ssd_temp": round(ssd, 1),
+            "net_down": down,
+            "net_up": up,
+            "disk_read": 0.0,
+            "disk_write": write,
+            "net": {"eth0": [down, up], "wlan0": [0.0, 0.0]},
+        }
+
+
+def _encode(message):
+    return json.dumps(message, separators=(",", ":")).encode()
+
+
+def _wire(payload):
+    """Bytes on the wire for one QoS 0 PUBLISH of payload over TLS."""
+    remaining = 2 + len(TOPIC) + len(payload)
+    length_bytes = 1 if remaining < 128 else 2
+    return 1 + length_bytes + remaining + TLS_RECORD
+
+
+def _ingest(messages):
+    """Feed messages through a DataManager; returns microseconds per message."""
+    data_mgr = DataManager()
+    start = time.perf_counter()
+    for payload in messages:
+        data_mgr.process_message(TOPIC, payload)
+    return (time.perf_counter() - start) * 1_000_000 / len(messages)
+
+
+def compare_bytes():
+    samples = list(trace())
+    full = [_encode(sample) for sample in samples]
+    encoder = payload_codec.DeltaEncoder()
+    delta = [_encode(encoder.encode(sample)) for sample in samples]
+    binary = [payload_codec.encode_host(sample) for sample in samples]
+
+    print(f"{SAMPLES} samples, keyframe every {payload_codec.KEYFRAME_EVERY}:")
+    print("             payload B/msg   wire B/msg   decode+merge us/msg")
+    rows = (("Full JSON", full), ("Delta JSON", delta), ("Binary", binary))
+    for name, messages in rows:
+        payload = sum(map(len, messages)) / SAMPLES
+        wire = sum(map(_wire, messages)) / SAMPLES
+        print(f"  {name:10s} {payload:11.1f} {wire:12.1f} {_ingest(messages):16.2f}")
+    saved = 1 - sum(map(_wire, delta)) / sum(map(_wire, full))
+    print(f"  Delta saves {saved:.0%} of the wire bytes of full JSON")
+
+
+def check_recovery():
+    """Drop LOSS of the deltas; the dashboard must resynchronise."""
+    rng = random.Random(2)
+    encoder = payload_codec.DeltaEncoder()
+    data_mgr = DataManager()
+    requests = []
+
+    def on_request(topic, request):
+        requests.append(request)
+        if topic != TOPIC + payload_codec.KEYFRAME_SUFFIX:
+            _fail(f"keyframe request on {topic}")
+        encoder.request_keyframe()  # The publisher answers with the next message
+
+    data_mgr.on_keyframe_request(on_request)
+    lost = stale = 0
+    for sample in trace():
+        message = encoder.encode(sample)
+        if rng.random() < LOSS:
+            lost += 1
+            continue
+        data_mgr.process_message(TOPIC, _encode(message))
+        slot = data_mgr.get_all_data()["host"].get("desk", {})
+        if any(slot.get(key) != sample[key] for key in FIELDS):
+            stale += 1
+
+    if lost and not requests:
+        _fail("lost messages did not trigger a keyframe request")
+    if stale > lost * 2:
+        _fail(f"{stale} stale samples after {lost} lost messages")
+    if any(slot.get(key) != sample[key] for key in FIELDS):
+        _fail("the final state differs from the publisher's")
+    print(
+        f"  ✓ {lost} lost messages, {len(requests)} keyframe requests, "
+        f"{stale} samples shown stale, final state in sync"
+    )
+
+
+def main() -> None:
+    print("=" * 60)
+    print("Delta Benchmark")
+    print("=" * 60)
+    compare_bytes()
+    check_recovery()
+
+
+if __name__ == "__main__":
+    main()
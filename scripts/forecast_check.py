@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Forecast Check
+
+Serves a recorded OpenWeatherMap 5-day forecast response from a local HTTP
+stub (in small, delayed chunks, like a slow TLS socket) and verifies that
+forecast.parse() streams it into the same result as a full json.loads(),
+for several read buffer sizes. Also checks truncated responses, the flash
+cache TTL logic and the peak memory of both approaches under CPython.
+"""
+
+import json
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import forecast  # noqa: E402
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "owm_forecast_5day.json"
+BUFFER_SIZES = (1, 7, 64, 512)
+CHUNK = 700  # bytes per write from the stub server
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    body = b""
+
+    def do_GET(self):  # noqa: N802
+        body = self.body
+        if self.path.startswith("/truncated"):
+            body = body[: len(body) // 2]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        for offset in range(0, len(body), CHUNK):
+            self.wfile.write(body[offset : offset + CHUNK])
+            self.wfile.flush()
+            time.sleep(0.001)
+
+    def log_message(self, *_args):
+        pass
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+def reference(doc):
+    """Same condensation as forecast.parse(), from the fully decoded dict."""
+    hourly, daily = [], []
+    for step in doc["list"]:
+        t = time.gmtime(step["dt"])
+        pop = int(step["pop"] * 100 + 0.5)
+        temp, cond = step["main"]["temp"], step["weather"][0]["main"]
+        if len(hourly) < forecast.HOURLY_COUNT:
+            hourly.append([t[3], temp, pop, cond])
+        if not daily or daily[-1][5] != t[2]:
+            if len(daily) == forecast.DAILY_COUNT:
+                break
+            daily.append([t[6], temp, temp, pop, cond, t[2], 24])
+        day = daily[-1]
+        day[1] = min(day[1], temp)
+        day[2] = max(day[2], temp)
+        day[3] = max(day[3], pop)
+        if abs(t[3] - 12) < day[6]:
+            day[4], day[6] = cond, abs(t[3] - 12)
+    return {"hourly": hourly, "daily": [d[:5] for d in daily]}
+
+
+def check_stream(base_url, expected):
+    for size in BUFFER_SIZES:
+        with urllib.request.urlopen(f"{base_url}/data/2.5/forecast") as res:
+            result = forecast.parse(res, bytearray(size), time.gmtime)
+        if result != expected:
+            _fail(f"buffer {size}: streamed result differs from json.loads()")
+        print(f"  ✓ buffer {size:4d} bytes: {len(result['daily'])} days match")
+
+    with urllib.request.urlopen(f"{base_url}/truncated") as res:
+        try:
+            forecast.parse(res, bytearray(64), time.gmtime)
+        except ValueError:
+            print("  ✓ Truncated response raises ValueError")
+        else:
+            _fail("truncated response was accepted")
+
+
+def check_cache(expected):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "forecast.json")
+        if forecast.load_cache(path) is not None:
+            _fail("missing cache file should load as None")
+        data = dict(expected, fetched=1000)
+        forecast.save_cache(data, path)
+        loaded = forecast.load_cache(path)
+        if loaded != data:
+            _fail("cache round trip changed the data")
+        checks = ((1000, True), (4599, True), (4600, False), (999, False))
+        for now, fresh in checks:
+            if forecast.is_fresh(loaded, now, 3600) != fresh:
+                _fail(f"is_fresh(now={now}) should be {fresh}")
+    print("  ✓ Cache round trip and TTL")
+
+
+def check_memory(body):
+    class _Reader:
+        def __init__(self, data):
+            self.data, self.pos = data, 0
+
+        def readinto(self, buf):
+            n = min(len(buf), len(self.data) - self.pos)
+            buf[:n] = self.data[self.pos : self.pos + n]
+            self.pos += n
+            return n
+
+    tracemalloc.start()
+    json.loads(body)
+    _, full_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    forecast.parse(_Reader(body), bytearray(512), time.gmtime)
+    _, stream_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  Peak memory: json.loads {full_peak} B, streamed {stream_peak} B")
+    print("  (excluding the response body, which the device never buffers)")
+
+
+def main() -> None:
+    print("=" * 60)
+    print("Forecast Check")
+    print("=" * 60)
+    body = FIXTURE.read_bytes()
+    _StubHandler.body = body
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        expected = reference(json.loads(body))
+        check_stream(base_url, expected)
+        check_cache(expected)
+        check_memory(body)
+    finally:
+        server.shutdown()
+    print("✓ All checks passed")
+
+
+if __name__ == "__main__":
+    main()
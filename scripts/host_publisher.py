@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Host Publisher
+
+Reference publisher for host/<host_id>/monitor. Samples CPU, temperatures,
+RAM, network throughput (total and per interface) and disk I/O with psutil
+and publishes them in the delta mode of payload_codec.py: a keyframe every
+--keyframe-every messages and only the changed fields in between.
+Keyframe requests from the dashboard (retained on
+host/<host_id>/monitor/keyframe) are answered with a keyframe on the next
+sample and then cleared. Every keyframe is also kept retained on
+host/<host_id>/monitor/snapshot, which the dashboard loads right after
+connecting instead of waiting for the next sample.
+
+    python scripts/host_publisher.py --broker broker --host-id desk
+    python scripts/host_publisher.py --broker broker --host-id desk --full
+
+--full publishes complete documents without sequence numbers, as before
+the delta mode (and every --keyframe-every-th one as the snapshot). Needs
+paho-mqtt and psutil.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import payload_codec  # noqa: E402
+
+# psutil sensor names, first match wins
+CPU_SENSORS = ("coretemp", "k10temp", "cpu_thermal", "zenpower")
+SSD_SENSORS = ("nvme", "drivetemp")
+MAX_IFACES = 4  # The dashboard keeps at most 8
+
+
+def _kb_per_s(new, old, elapsed):
+    return round((new - old) / 1024 / elapsed, 1)
+
+
+def _temperature(temps, names):
+    for name in names:
+        for entry in temps.get(name, ()):
+            return entry.current
+    return 0
+
+
+class HostSampler:
+    """Samples the host/monitor fields, rounded to what the dashboard shows."""
+
+    def __init__(self, psutil, name):
+        self.psutil = psutil
+        self.name = name
+        self._counters = self._read_counters()
+        self._counters_at = time.monotonic()
+        psutil.cpu_percent(percpu=True)  # First call only sets the baseline
+
+    def _read_counters(self):
+        psutil = self.psutil
+        stats = psutil.net_if_stats()
+        nics = {
+            nic: counters
+            for nic, counters in psutil.net_io_counters(pernic=True).items()
+            if nic != "lo" and nic in stats and stats[nic].isup
+        }
+        return psutil.net_io_counters(), nics, psutil.disk_io_counters()
+
+    def _rates(self):
+        now = time.monotonic()
+        elapsed = max(now - self._counters_at, 1e-3)
+        net, nics, disk = self._read_counters()
+        old_net, old_nics, old_disk = self._counters
+        self._counters, self._counters_at = (net, nics, disk), now
+
+        # The interfaces with the most traffic since boot
+        busiest = sorted(
+            (nic for nic in nics if nic in old_nics),
+            key=lambda nic: nics[nic].bytes_recv + nics[nic].bytes_sent,
+            reverse=True,
+        )[:MAX_IFACES]
+        return {
+            "net_down": _kb_per_s(net.bytes_recv, old_net.bytes_recv, elapsed),
+            "net_up": _kb_per_s(net.bytes_sent, old_net.bytes_sent, elapsed),
+            "disk_read": _kb_per_s(disk.read_bytes, old_disk.read_bytes, elapsed),
+            "disk_write": _kb_per_s(disk.write_bytes, old_disk.write_bytes, elapsed),
+            "net": {
+                nic: [
+                    _kb_per_s(nics[nic].bytes_recv, old_nics[nic].bytes_recv, elapsed),
+                    _kb_per_s(nics[nic].bytes_sent, old_nics[nic].bytes_sent, elapsed),
+                ]
+                for nic in busiest
+            },
+        }
+
+    def sample(self):
+        psutil = self.psutil
+        temps = getattr(psutil, "sensors_temperatures", dict)()
+        memory = psutil.virtual_memory()
+        data = {
+            "name": self.name,
+            "cpu": [round(p) for p in psutil.cpu_percent(percpu=True)],
+            "cpu_temp": round(_temperature(temps, CPU_SENSORS)),
+            "ram": round(memory.percent, 1),
+            "ram_total": round(memory.total / 1024**3),
+            "ssd_temp": round(_temperature(temps, SSD_SENSORS), 1),
+        }
+        data.update(self._rates())
+        return data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--broker", required=True)
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    parser.add_argument("--host-id", required=True, help="id in host/<id>/monitor")
+    parser.add_argument("--name", help="display name, default: the host id")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds")
+    parser.add_argument(
+        "--keyframe-every", type=int, default=payload_codec.KEYFRAME_EVERY
+    )
+    parser.add_argument("--full", action="store_true", help="no delta mode")
+    args = parser.parse_args()
+
+    try:
+        import paho.mqtt.client as mqtt  # noqa: PLC0415
+        import psutil  # noqa: PLC0415
+    except ImportError as e:
+        sys.exit(f"{e.name} is required (pip install paho-mqtt psutil)")
+
+    topic = f"host/{args.host_id}/monitor"
+    request_topic = topic + payload_codec.KEYFRAME_SUFFIX
+    snapshot_topic = topic + payload_codec.SNAPSHOT_SUFFIX
+    encoder = payload_codec.DeltaEncoder(args.keyframe_every)
+    sampler = HostSampler(psutil, args.name or args.host_id)
+
+    def on_connect(client, _userdata, _flags, _rc):
+        client.subscribe(request_topic)
+        encoder.request_keyframe()  # Receivers may have missed messages
+
+    def on_message(client, _userdata, msg):
+        if msg.payload:  # Our own clearing publish arrives empty
+            print(f"Keyframe requested: {msg.payload.decode()}")
+            encoder.request_keyframe()
+            client.publish(request_topic, b"", retain=True)
+
+    client = mqtt.Client()
+    if args.user:
+        client.username_pw_set(args.user, args.password)
+    client.on_connect = on_connect
+    client.on_message = on_message
+    client.connect(args.broker, args.port)
+    client.loop_start()
+    count = 0
+    try:
+        while True:
+            time.sleep(args.interval)
+            data = sampler.sample()
+            message = data if args.full else encoder.encode(data)
+            payload = json.dumps(message, separators=(",", ":"))
+            client.publish(topic, payload)
+            if "kf" in message or (args.full and count % args.keyframe_every == 0):
+                client.publish(snapshot_topic, payload, retain=True)
+            count += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.loop_stop()
+        client.disconnect()
+
+
+if __name__ == "__main__":
+    main()
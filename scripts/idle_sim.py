@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Idle Simulation
+
+Runs idle.IdleManager through a simulated day of a wall-mounted panel: a
+few touch sessions, host metrics arriving every 2 s, and the main loop's
+pass structure (touch first, then MQTT, then the idle sleep). The clock,
+machine.lightsleep(), the touch IRQ and the MQTT socket's poll() are
+simulated. Four setups run on the same day:
+
+  dim only        cfg.idle_off_s = 0, the behaviour before the idle manager
+  poll wait       backlight off, the loop waits in poll() on the socket
+  light sleep     backlight off, light sleep in slices, touch polled
+  + touch IRQ     as above with PENIRQ wired, a touch ends the sleep
+
+and checks that no tap is missed, that every wake from off stays within
+the bound stats() reports, and that the modelled current drops. The
+currents are the model's assumptions (idle.py), not measurements.
+"""
+
+import json
+import sys
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DAY_MS = 24 * 3600 * 1000
+# (hour, taps): taps 8 s apart, each held TAP_MS
+SESSIONS = ((7.0, 6), (7.5, 3), (12.25, 10), (17.5, 4), (18.0, 20), (22.0, 3))
+TAP_MS = 120
+TAP_GAP_MS = 8000
+MESSAGE_EVERY_MS = 2000
+MESSAGE_MS = 2  # Decoding and storing one message
+TOUCH_READ_MS = 1  # XPT2046 SoftSPI read
+PASS_MS = 3  # The rest of a loop pass while the panel is on
+IRQ_PIN = 13
+
+
+class _Clock:
+    now = 0
+
+
+class _Touch:
+    """Tap schedule; pressed() is what the XPT2046 reports."""
+
+    def __init__(self):
+        self.taps = []
+        for hour, count in SESSIONS:
+            start = int(hour * 3600 * 1000)
+            self.taps += [start + i * TAP_GAP_MS for i in range(count)]
+        self._next = 0
+
+    def pressed(self, now):
+        while self._next < len(self.taps) and self.taps[self._next] + TAP_MS <= now:
+            self._next += 1
+        if self._next < len(self.taps) and self.taps[self._next] <= now:
+            return self.taps[self._next]
+        return None
+
+    def next_press(self, now):
+        """Start of the press in progress or the next one, None at the end."""
+        self.pressed(now)
+        return self.taps[self._next] if self._next < len(self.taps) else None
+
+
+class _Socket:
+    """MQTT socket with a message every MESSAGE_EVERY_MS."""
+
+    def __init__(self):
+        self.next_message = 500
+
+    def readable(self, now):
+        return self.next_message <= now
+
+    def read(self):
+        self.next_message += MESSAGE_EVERY_MS
+
+
+class _Poller:
+    def __init__(self, env):
+        self.env = env
+
+    def register(self, _sock, _mask):
+        pass
+
+    def poll(self, timeout_ms):
+        sock = self.env.sock
+        arrival = max(sock.next_message, _Clock.now)
+        if arrival <= _Clock.now + timeout_ms:
+            _Clock.now = arrival
+            return [(sock, 1)]
+        _Clock.now += timeout_ms
+        return []
+
+
+class _Env:
+    """Hardware state shared by the stub modules."""
+
+    sock = None
+    touch = None
+    irq_pin = None
+
+
+def _lightsleep(ms):
+    end = _Clock.now + ms
+    if _Env.irq_pin is not None:
+        press = _Env.touch.next_press(_Clock.now)
+        if press is not None and press < end:
+            end = max(press, _Clock.now)
+    _Clock.now = end
+
+
+def _install_stubs():
+    time.ticks_ms = lambda: _Clock.now
+    time.ticks_add = lambda t, delta: t + delta
+    time.ticks_diff = lambda a, b: a - b
+
+    def sleep_ms(ms):
+        _Clock.now += ms
+
+    time.sleep_ms = sleep_ms
+
+    machine = types.ModuleType("machine")
+    machine.lightsleep = _lightsleep
+
+    class Pin:
+        IN = PULL_UP = 0
+
+        def __init__(self, pin, *_args):
+            self.pin = pin
+
+    machine.Pin = Pin
+    esp32 = types.ModuleType("esp32")
+    esp32.WAKEUP_ALL_LOW = 0
+
+    def wake_on_ext0(pin, level):
+        _Env.irq_pin = None if pin is None else pin.pin
+
+    esp32.wake_on_ext0 = wake_on_ext0
+    select = types.ModuleType("select")
+    select.POLLIN = 1
+    select.poll = lambda: _Poller(_Env)
+    sys.modules.update({"machine": machine, "esp32": esp32, "select": select})
+    sys.modules.setdefault("ujson", json)
+
+
+class _TaskHandler:
+    def __init__(self):
+        self.refresh_rate_ms = 5
+
+    def set_period(self, refresh_rate_ms):
+        self.refresh_rate_ms = refresh_rate_ms
+
+    @staticmethod
+    def animating():
+        return False
+
+
+class _Backlight:
+    def __init__(self):
+        self.level = 100
+        self.on_at = None
+
+    def __call__(self, level):
+        if level and not self.level:
+            self.on_at = _Clock.now
+        self.level = level
+
+
+def run(off_s, light_sleep, irq):
+    """Simulate the day; returns (stats, missed taps, worst wake latency)."""
+    import idle  # noqa: PLC0415
+    from config import cfg  # noqa: PLC0415
+
+    cfg.idle_off_s = off_s
+    cfg.idle_light_sleep = light_sleep
+    cfg.touch_irq_pin = IRQ_PIN if irq else -1
+    _Clock.now = 0
+    _Env.sock, _Env.touch, _Env.irq_pin = _Socket(), _Touch(), None
+    backlight = _Backlight()
+    manager = idle.IdleManager(backlight, _TaskHandler(), 100, 15)
+
+    last_touch = 0
+    handled = set()  # Taps the loop saw
+    worst = 0
+    was_pressed = False
+    while _Clock.now < DAY_MS:
+        # Display.check_touch()
+        _Clock.now += TOUCH_READ_MS
+        press = _Env.touch.pressed(_Clock.now)
+        if press is not None and not was_pressed:
+            handled.add(press)
+            last_touch = _Clock.now
+            was_off = manager.is_off
+            manager.touched(_Clock.now)
+            if was_off:
+                worst = max(worst, backlight.on_at - press)
+        was_pressed = press is not None
+        # Display.tick()
+        manager.update(_Clock.now, _Clock.now - last_touch)
+        # MQTT: one message per pass
+        if _Env.sock.readable(_Clock.now):
+            _Env.sock.read()
+            _Clock.now += MESSAGE_MS
+        if not manager.is_off:
+            _Clock.now += PASS_MS
+        manager.sleep(50, _Env.sock)
+    missed = len(_Env.touch.taps) - len(handled)
+    return manager.stats(), missed, worst
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+def main() -> None:
+    # Load the config (and its message) before the table
+    import idle  # noqa: F401, PLC0415
+
+    print("=" * 60)
+    print("Idle Simulation")
+    print("=" * 60)
+    taps = sum(count for _, count in SESSIONS)
+    print(
+        f"24 h, {len(SESSIONS)} touch sessions, {taps} taps of {TAP_MS} ms, "
+        f"a message every {MESSAGE_EVERY_MS // 1000} s"
+    )
+    print("               active   dim    off  asleep  wake max/bound     mA")
+    results = {}
+    for name, off_s, light_sleep, irq in (
+        ("dim only", 0, False, False),
+        ("poll wait", 600, False, False),
+        ("light sleep", 600, True, False),
+        ("+ touch IRQ", 600, True, True),
+    ):
+        stats, missed, worst = run(off_s, light_sleep, irq)
+        results[name] = stats
+        print(
+            f"  {name:11s} {stats['active_s'] // 60:6d}m {stats['dim_s'] // 60:4d}m "
+            f"{stats['off_s'] // 60:5d}m {stats['asleep_s'] // 60:6d}m "
+            f"{worst:7d}/{stats['wake_bound_ms']:<4d} ms {stats['current_ma']:7.1f}"
+        )
+        if missed:
+            _fail(f"{name}: {missed} taps missed")
+        if worst > stats["wake_bound_ms"]:
+            _fail(f"{name}: a wake took {worst} ms, over the bound")
+
+    before = results["dim only"]["current_ma"]
+    after = results["light sleep"]["current_ma"]
+    if abs(before - results["dim only"]["current_ma_before"]) > 1:
+        _fail("the dim-only run should match the model's before figure")
+    if not after < results["poll wait"]["current_ma"] < before:
+        _fail("light sleep should save more than the poll wait, both over dim only")
+    print(
+        f"✓ No tap missed, wakes within the bound, {before:.0f} mA -> {after:.0f} mA "
+        f"average ({1 - after / before:.0%} less)"
+    )
+
+
+if __name__ == "__main__":
+    _install_stubs()
+    main()
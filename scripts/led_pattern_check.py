@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+LED Pattern Check
+
+Runs status_led_rgb.StatusLedRGB on a virtual clock with Pin and NeoPixel
+stubbed out, and checks the frame timing of the pattern engine:
+
+- every colour change happens on the frame boundary, whatever the tick rate
+- a pattern with loops=N ends after N cycles and shows the base layer again
+- the alert overlay hides the base pattern, which continues underneath
+- a tick far behind resyncs instead of replaying every missed frame
+- breathe() with a period shorter than its steps still advances, and a
+  table without any duration is rejected instead of hanging tick()
+"""
+
+import sys
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class _Clock:
+    now = 0
+
+
+class _NeoPixel:
+    """Records (time, colour) for every write."""
+
+    def __init__(self, _pin, n):
+        self.pixels = [(0, 0, 0)] * n
+        self.writes = []
+
+    def __setitem__(self, index, color):
+        self.pixels[index] = color
+
+    def write(self):
+        self.writes.append((_Clock.now, self.pixels[0]))
+
+
+def _install_stubs():
+    time.ticks_ms = lambda: _Clock.now
+    time.ticks_add = lambda t, delta: t + delta
+    time.ticks_diff = lambda a, b: a - b
+    machine = types.ModuleType("machine")
+    machine.Pin = type("Pin", (), {"OUT": 1, "__init__": lambda *_args: None})
+    sys.modules["machine"] = machine
+    neopixel = types.ModuleType("neopixel")
+    neopixel.NeoPixel = _NeoPixel
+    sys.modules["neopixel"] = neopixel
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+def _new_led():
+    from status_led_rgb import StatusLedRGB  # noqa: PLC0415
+
+    _Clock.now = 0
+    led = StatusLedRGB()
+    led.np.writes.clear()
+    return led
+
+
+def _run(led, until, step):
+    while _Clock.now < until:
+        _Clock.now += step
+        led.tick(_Clock.now)
+
+
+def check_frame_timing():
+    import status_led_rgb as rgb  # noqa: PLC0415
+
+    boundaries = [0, 120, 240, 360, 1000, 1120, 1240, 1360, 2000]
+    for step in (1, 7, 50):
+        led = _new_led()
+        led.play(rgb.ERROR, rgb.PRIORITY_ALERT, now=0)
+        _run(led, 2000, step)
+        times = [t for t, _ in led.np.writes]
+        # A change shows on the first tick at or after its boundary
+        expected = [-(-b // step) * step for b in boundaries]
+        if times != expected:
+            _fail(f"{step} ms ticks: changes at {times}, expected {expected}")
+    print("  ✓ ERROR frames change on their boundaries at 1, 7 and 50 ms ticks")
+
+
+def check_loops_and_overlay():
+    import status_led_rgb as rgb  # noqa: PLC0415
+
+    led = _new_led()
+    led.set_state(0, 0, 40)
+    led.play(rgb.sequence(((1, 0, 0), (2, 0, 0)), 100), loops=3, now=0)
+    _run(led, 599, 1)
+    if not led.is_playing():
+        _fail("three loops of 200 ms ended early")
+    _run(led, 600, 1)
+    if led.is_playing() or led.np.writes[-1] != (600, (0, 0, 40)):
+        _fail(f"loops=3 did not end at 600 ms: {led.np.writes[-3:]}")
+
+    led = _new_led()
+    led.play(rgb.WIFI_CONNECTING, now=0)
+    led.play(((255, 0, 0, 1000),), rgb.PRIORITY_ALERT, now=0)
+    start = len(led.np.writes) - 1
+    _run(led, 950, 10)
+    if [c for _, c in led.np.writes[start:]] != [(255, 0, 0)]:
+        _fail("the overlay let the base pattern through")
+    led.stop(rgb.PRIORITY_ALERT)
+    # The base pattern kept its phase: 950 ms is in the second half of a cycle
+    if led.np.writes[-1] != (950, (0, 0, 0)):
+        _fail(f"base pattern after the overlay: {led.np.writes[-1]}")
+    print("  ✓ loops=3 ends at 600 ms; the base keeps its phase under the overlay")
+
+
+def check_resync():
+    import status_led_rgb as rgb  # noqa: PLC0415
+
+    led = _new_led()
+    led.play(rgb.WIFI_CONNECTING, now=0)
+    _Clock.now = 10000  # A blocking step of 10 s
+    led.tick(_Clock.now)
+    layer = led._layers[rgb.PRIORITY_STATUS]
+    if layer.deadline - _Clock.now > 100 or layer.deadline <= _Clock.now:
+        _fail(f"deadline {layer.deadline} after a 10 s gap")
+    writes = len(led.np.writes)
+    _run(led, 10400, 1)
+    if len(led.np.writes) - writes != 4:
+        _fail("the pattern did not resume at its normal rate after the gap")
+    print("  ✓ 10 s gap: one resync, then 100 ms frames again")
+
+
+def check_degenerate():
+    import status_led_rgb as rgb  # noqa: PLC0415
+
+    frames = rgb.breathe((0, 0, 255), period_ms=10, steps=16)
+    if min(frame[3] for frame in frames) < 1:
+        _fail("breathe() built frames of 0 ms")
+    led = _new_led()
+    led.play(frames, now=0)
+    _run(led, 100, 5)
+    for pattern in ((), ((255, 0, 0, 0), (0, 0, 0, 0))):
+        try:
+            led.play(pattern)
+        except ValueError:
+            continue
+        _fail(f"pattern {pattern} accepted")
+    print("  ✓ breathe(period_ms=10) advances; empty and 0 ms tables rejected")
+
+
+def main() -> None:
+    print("=" * 60)
+    print("LED Pattern Check")
+    print("=" * 60)
+    check_frame_timing()
+    check_loops_and_overlay()
+    check_resync()
+    check_degenerate()
+    print("✓ All checks passed")
+
+
+if __name__ == "__main__":
+    _install_stubs()
+    main()
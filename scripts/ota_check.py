@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+OTA Check
+
+Runs ota.py and boot.py end to end against python -m http.server standing
+in for the release host, with a temporary directory as the device filesystem:
+
+- the first update from the root layout fetches every file; the next one
+  fetches only the files whose hash changed and copies the rest
+- a corrupted, truncated or missing file aborts the update: the half-built
+  slot is removed and the running version stays active
+- a manifest with file names outside the slot or entries of the wrong
+  shape is rejected with OTAError
+- a crash before the pointer rename leaves the old version active
+- boot.py runs the new slot on trial, rolls back after _TRIAL_BOOTS boots
+  without confirm(), and keeps a confirmed version
+- a slot whose main.py fails to import is reset by the watchdog boot.py
+  arms on trial boots, and rolled back
+- RAM during an update does not grow with the file size
+"""
+
+import json
+import os
+import shutil
+import sys
+import socket
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import types
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BIG_FILE = 256 * 1024
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+class _Response:
+    """The parts of a urequests response ota.py uses."""
+
+    requests = []  # Paths asked for, recorded on the device side
+
+    def __init__(self, url):
+        _Response.requests.append(url.rsplit("/", 1)[1])
+        try:
+            self.raw = urllib.request.urlopen(url)  # noqa: S310
+            self.status_code = self.raw.status
+        except urllib.error.HTTPError as e:
+            self.raw = e
+            self.status_code = e.code
+
+    def close(self):
+        self.raw.close()
+
+
+def _install_urequests():
+    sys.modules["urequests"] = types.SimpleNamespace(get=_Response)
+
+
+class _Machine:
+    """machine stand-in recording the watchdog boot.py arms."""
+
+    wdt_ms = None
+
+    @staticmethod
+    def WDT(timeout):  # noqa: N802
+        _Machine.wdt_ms = timeout
+
+
+def _install_machine():
+    sys.modules["machine"] = _Machine
+
+
+class _PowerLost(OSError):
+    """Power failed during a rename."""
+
+
+class _Server:
+    """python -m http.server on the release directory, in its own process."""
+
+    def __init__(self, directory):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "http.server", str(port)]
+            + ["--bind", "127.0.0.1", "--directory", str(directory)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.url = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            except OSError:
+                time.sleep(0.05)
+            else:
+                return
+        _fail("the HTTP server did not start")
+
+    @staticmethod
+    def fetched():
+        """Files downloaded since the last call, without the manifest."""
+        files = sorted(p for p in _Response.requests if p != "manifest.json")
+        _Response.requests.clear()
+        return files
+
+    def close(self):
+        self.proc.terminate()
+        self.proc.wait()
+
+
+def _release(directory, version, files):
+    """Write a release: the files plus their manifest."""
+    from ota import make_manifest  # noqa: PLC0415
+
+    if directory.exists():
+        shutil.rmtree(directory)
+    directory.mkdir()
+    for name, content in files.items():
+        (directory / name).write_bytes(content)
+    manifest = make_manifest(str(directory), version)
+    (directory / "manifest.json").write_text(json.dumps(manifest))
+    return manifest
+
+
+def _app(version, big=b""):
+    files = {
+        f"module_{i}.mpy": f"module {i} of version {version}".encode()
+        for i in range(3)
+    }
+    files.update(
+        {
+            "main.py": b"APP = 'main'\n",
+            "theme.mpy": b"theme",
+            "weather_screen.mpy": bytes(range(256)) * 16,
+        }
+    )
+    if big:
+        files["fonts.mpy"] = big
+    return files
+
+
+def _boot(root):
+    import boot  # noqa: PLC0415
+
+    _Machine.wdt_ms = None
+    return boot.start(str(root) + "/")
+
+
+def _power_on(root):
+    """One boot as the firmware runs it: boot.py, then the slot's main.py."""
+    slot = _boot(root)
+    path = root / f"app_{slot}" / "main.py" if slot else root / "main.py"
+    try:
+        exec(compile(path.read_bytes(), str(path), "exec"), {"__name__": "__main__"})  # noqa: S102
+    except Exception:  # noqa: BLE001
+        # The firmware drops to the REPL; only an armed watchdog resets it
+        return slot, "reset" if _Machine.wdt_ms else "stuck in the REPL"
+    return slot, "ran"
+
+
+def check_delta(root, server, release):
+    from ota import OTA  # noqa: PLC0415
+
+    # Before the first update the app is installed in the root
+    for name, content in _app("1.0").items():
+        (root / name).write_bytes(content)
+    (root / "secrets.py").write_text("SSID = 'x'\n")
+    ota = OTA(str(root))
+
+    files = _app("1.1")
+    files["module_1.mpy"] = _app("1.0")["module_1.mpy"]
+    _release(release, "1.1", files)
+    report = ota.update(server.url)
+    fetched = server.fetched()
+    expected = ["module_0.mpy", "module_2.mpy"]
+    if fetched != expected or report["copied"] != len(files) - 2:
+        _fail(f"first update fetched {fetched}, expected {expected}")
+    if ota.state()["slot"] != "a" or not ota.state()["trial"]:
+        _fail(f"pointer after the first update: {ota.state()}")
+    for name, content in files.items():
+        if (root / "app_a" / name).read_bytes() != content:
+            _fail(f"app_a/{name} differs from the release")
+    print(f"  ✓ Root → slot a: {len(fetched)} of {len(files)} files fetched")
+
+    if _boot(root) != "a":
+        _fail("boot.py did not select the new slot")
+    ota.confirm()
+    files["theme.mpy"] = b"theme, darker"
+    files["extra.mpy"] = b"new module"
+    del files["module_2.mpy"]
+    _release(release, "1.2", files)
+    report = ota.update(server.url)
+    fetched = server.fetched()
+    if fetched != ["extra.mpy", "theme.mpy"]:
+        _fail(f"second update fetched {fetched}")
+    slot_files = sorted(os.listdir(root / "app_b"))
+    if slot_files != sorted([*files, "manifest.json"]):
+        _fail(f"app_b holds {slot_files}")
+    state = ota.state()
+    if (state["slot"], state["previous"], state["version"]) != ("b", "a", "1.2"):
+        _fail(f"pointer after the second update: {state}")
+    print(
+        f"  ✓ Slot a → b: {len(fetched)} changed files fetched, "
+        f"{report['copied']} copied, a removed file dropped"
+    )
+    _boot(root)
+    ota.confirm()
+
+
+def check_damaged_files(root, server, release):
+    from ota import OTA  # noqa: PLC0415
+
+    ota = OTA(str(root))
+    before = ota.state()
+    files = _app("1.3")
+    manifest = _release(release, "1.3", files)
+
+    # Damage files the update has to fetch, not copy
+    cases = {
+        "corrupted": lambda: (release / "theme.mpy").write_bytes(b"THEME"),
+        "truncated": lambda: (release / "module_0.mpy").write_bytes(b"mod"),
+        "missing": lambda: (release / "module_2.mpy").unlink(),
+    }
+    for case, damage in cases.items():
+        _release(release, "1.3", files)
+        damage()
+        (release / "manifest.json").write_text(json.dumps(manifest))
+        try:
+            ota.update(server.url)
+        except (OSError, ValueError) as e:
+            error = e
+        else:
+            _fail(f"{case} file accepted")
+        if ota.state() != before or (root / "app_a").exists():
+            _fail(f"{case} file: the running version was touched")
+        server.fetched()
+        print(f"  ✓ {case.capitalize()} file rejected ({error}), slot b still active")
+
+
+def check_bad_manifests(root, server, release):
+    from ota import OTA, OTAError  # noqa: PLC0415
+
+    ota = OTA(str(root))
+    before = ota.state()
+    manifest = _release(release, "1.3", _app("1.3"))
+    entry = manifest["files"]["main.py"]
+    bad = [{name: entry} for name in ("../boot.py", "secrets.py")]
+    # Missing or mistyped keys must not get past update() as KeyError/TypeError
+    bad += [{"main.py": {"sha256": entry["sha256"]}}, {"main.py": "x"}, []]
+    for files in bad:
+        (release / "manifest.json").write_text(json.dumps(dict(manifest, files=files)))
+        try:
+            ota.update(server.url)
+        except OTAError:
+            continue
+        _fail(f"manifest files {files} accepted")
+    if ota.state() != before:
+        _fail("a bad manifest touched the running version")
+    print("  ✓ Manifest entries outside the slot or of the wrong shape rejected")
+    server.fetched()
+
+
+def check_power_loss(root, server, release):
+    import ota as ota_module  # noqa: PLC0415
+
+    ota = ota_module.OTA(str(root))
+    before = ota.state()
+    _release(release, "1.3", _app("1.3"))
+    # Power loss between the slot and the pointer: the rename never happens
+    rename = os.rename
+
+    def crash(src, dst):
+        if dst.endswith("ota.json"):
+            raise _PowerLost
+        rename(src, dst)
+
+    ota_module.os.rename = crash
+    try:
+        ota.update(server.url)
+    except _PowerLost:
+        pass
+    finally:
+        ota_module.os.rename = rename
+    if ota.state() != before or _boot(root) != before["slot"]:
+        _fail("a crash before the pointer rename switched the version")
+    print("  ✓ Crash before the pointer rename: boot still runs slot b")
+    server.fetched()
+
+
+def check_rollback(root, server, release):
+    import boot  # noqa: PLC0415
+    from ota import OTA  # noqa: PLC0415
+
+    ota = OTA(str(root))
+    running = ota.state()
+    _release(release, "2.0", _app("2.0"))
+    ota.update(server.url)
+    slots = [_boot(root) for _ in range(boot._TRIAL_BOOTS + 1)]
+    expected = ["a"] * boot._TRIAL_BOOTS + [running["slot"]]
+    if slots != expected:
+        _fail(f"boots without confirm ran {slots}, expected {expected}")
+    state = ota.state()
+    if state.get("version") != running["version"] or state.get("trial"):
+        _fail(f"state after the rollback: {state}")
+    print(
+        f"  ✓ Unconfirmed version ran {boot._TRIAL_BOOTS} times, then slot "
+        f"{state['slot']} ({state['version']}) was restored"
+    )
+
+    ota.update(server.url)
+    server.fetched()
+    _boot(root)
+    ota.confirm()
+    slots = {_boot(root) for _ in range(5)}
+    if slots != {"a"}:
+        _fail(f"a confirmed version was rolled back: {slots}")
+    if ota.update(server.url)["fetched"]:
+        _fail("an unchanged release fetched files")
+    if _Machine.wdt_ms is not None:
+        _fail("a confirmed boot armed the watchdog")
+    print("  ✓ Confirmed version kept over 5 boots; same release fetches nothing")
+    _boot(root)
+    ota.confirm()
+
+
+def check_import_failure(root, server, release):
+    import boot  # noqa: PLC0415
+    from ota import OTA  # noqa: PLC0415
+
+    ota = OTA(str(root))
+    running = ota.state()["slot"]
+    files = _app("4.0")
+    files["main.py"] = b"import module_that_is_not_there\n"
+    _release(release, "4.0", files)
+    slot = ota.update(server.url)["slot"]
+    boots = [_power_on(root) for _ in range(boot._TRIAL_BOOTS + 1)]
+    expected = [(slot, "reset")] * boot._TRIAL_BOOTS + [(running, "ran")]
+    if boots != expected:
+        _fail(f"boots of a slot failing at import: {boots}, expected {expected}")
+    print(
+        f"  ✓ main.py failing at import: watchdog reset {boot._TRIAL_BOOTS} times, "
+        f"then slot {running} ran again"
+    )
+    server.fetched()
+
+
+def check_memory(root, server, release):
+    from ota import OTA  # noqa: PLC0415
+
+    ota = OTA(str(root))
+    peaks = []
+    for size in (BIG_FILE // 8, BIG_FILE):
+        _release(release, f"3.{size}", _app("3.0", os.urandom(size)))
+        tracemalloc.start()
+        report = ota.update(server.url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if "fonts.mpy" not in report["fetched"]:
+            _fail("the big file was not fetched")
+        peaks.append(peak)
+        _boot(root)
+        ota.confirm()
+    if peaks[1] > peaks[0] + 4096 or peaks[1] > BIG_FILE // 8:
+        _fail(f"peak RAM {peaks} grows with the file size")
+    print(
+        f"  ✓ Peak RAM {peaks[0] // 1024} KB for a {BIG_FILE // 8 // 1024} KB "
+        f"file, {peaks[1] // 1024} KB for {BIG_FILE // 1024} KB (CPython, HTTP "
+        "client included)"
+    )
+
+
+def main() -> None:
+    print("=" * 60)
+    print("OTA Check")
+    print("=" * 60)
+    _install_urequests()
+    _install_machine()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "flash"
+        release = Path(tmp) / "release"
+        root.mkdir()
+        server = _Server(release)
+        try:
+            check_delta(root, server, release)
+            check_damaged_files(root, server, release)
+            check_bad_manifests(root, server, release)
+            check_power_loss(root, server, release)
+            check_rollback(root, server, release)
+            check_import_failure(root, server, release)
+            check_memory(root, server, release)
+        finally:
+            server.close()
+    print("✓ All checks passed")
+
+
+if __name__ == "__main__":
+    main()
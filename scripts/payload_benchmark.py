@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Payload Benchmark
+
+Compares the JSON and binary (payload_codec) encodings of the host/monitor
+and vps/monitor payloads: bytes on the wire and decode time per message.
+Also measures the full DataManager ingest of a host message, with and
+without the disk and per-interface fields, and the throughput smoothing
+alone. Runs on the host with CPython; absolute numbers differ on the ESP32,
+but the ratios are what matter.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.modules.setdefault("ujson", json)  # data_manager imports ujson
+
+import payload_codec  # noqa: E402
+from data_manager import DataManager  # noqa: E402
+
+ITERATIONS = 20000
+
+HOST_SAMPLE = {
+    "cpu": [34.3, 38.3, 34, 38.1],
+    "cpu_temp": 91,
+    "ram": 34.6,
+    "ssd_temp": 30.85,
+    "net_down": 4.59375,
+    "net_up": 2.3671875,
+}
+
+HOST_IO_SAMPLE = dict(
+    HOST_SAMPLE,
+    disk_read=120.5,
+    disk_write=33.0,
+    net={"eth0": [4.5, 2.3], "wlan0": [0.1, 0.0]},
+)
+
+VPS_SAMPLE = {"cpu": 12.5, "ram": 45.3, "disk": 67.1, "uptime": 123456}
+
+
+def _time_per_call(func, *args) -> float:
+    """Return the mean duration of func(*args) in microseconds."""
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        func(*args)
+    return (time.perf_counter() - start) * 1_000_000 / ITERATIONS
+
+
+def _report(name: str, sample: dict, encode, decode) -> None:
+    json_bytes = json.dumps(sample).encode()
+    bin_bytes = encode(sample)
+    slot = {}
+
+    json_us = _time_per_call(json.loads, json_bytes)
+    bin_us = _time_per_call(decode, bin_bytes, slot)
+
+    print(f"{name}:")
+    print(f"  JSON   : {len(json_bytes):4d} bytes  {json_us:7.2f} us/decode")
+    print(f"  Binary : {len(bin_bytes):4d} bytes  {bin_us:7.2f} us/decode")
+    print(f"  Size ratio: {len(bin_bytes) / len(json_bytes):.2f}")
+
+
+def _report_ingest() -> None:
+    data_mgr = DataManager()
+    print("host/monitor ingest (JSON decode + DataManager):")
+    samples = (("Base fields", HOST_SAMPLE), ("+ disk, 2 ifaces", HOST_IO_SAMPLE))
+    for name, sample in samples:
+        payload = json.dumps(sample).encode()
+        us = _time_per_call(data_mgr.process_message, "host/bench/monitor", payload)
+        print(f"  {name:16s}: {len(payload):4d} bytes  {us:7.2f} us/message")
+    slot = data_mgr.data_store["host"]["bench"]
+    us = _time_per_call(DataManager._smooth_rates, slot)
+    print(f"  EWMA smoothing alone: {us:.2f} us/message")
+
+
+def main() -> None:
+    print("=" * 60)
+    print(f"Payload Benchmark ({ITERATIONS} iterations)")
+    print("=" * 60)
+    _report(
+        "host/monitor",
+        HOST_SAMPLE,
+        payload_codec.encode_host,
+        payload_codec.decode_host,
+    )
+    _report(
+        "vps/monitor",
+        VPS_SAMPLE,
+        payload_codec.encode_vps,
+        payload_codec.decode_vps,
+    )
+    _report_ingest()
+
+
+if __name__ == "__main__":
+    main()
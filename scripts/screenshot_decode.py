@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Screenshot Decoder
+
+Reassembles the chunks published on status/{client_id}/screenshot into a
+PNG. Chunks can be read from a file or straight from the broker:
+
+    mosquitto_sub -h broker -t 'status/<client_id>/screenshot' -C 16 -N > shot.bin
+    python scripts/screenshot_decode.py shot.bin -o shot.png
+
+    python scripts/screenshot_decode.py --broker broker --client-id <id>
+
+(16 chunks for a 320-row screen in 20-row bands.) The broker mode needs
+paho-mqtt and sends the {"screenshot": true} command itself. The PNG
+encoder is plain zlib, so nothing else has to be installed. --selftest
+round-trips a synthetic screen through the encoder without a device.
+"""
+
+import argparse
+import json
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import screenshot_codec as codec  # noqa: E402
+
+
+def split_chunks(data):
+    """Yield (header fields, payload) for concatenated chunks."""
+    offset = 0
+    while offset < len(data):
+        fields = codec.unpack_header(data, offset)
+        start = offset + codec.HEADER_SIZE
+        end = start + fields[-1]
+        if end > len(data):
+            raise codec.ChunkError("truncated", f"byte {offset}")
+        yield fields, data[start:end]
+        offset = end
+
+
+def assemble(chunks):
+    """Return (width, height, RGB565 frame) of the newest capture in chunks."""
+    captures = {}
+    for (fmt, capture_id, width, height, y, rows, _), payload in chunks:
+        pixels = width * rows
+        band = codec.decode_rle(payload, pixels) if fmt == codec.FORMAT_RLE else payload
+        if len(band) != pixels * 2:
+            raise codec.ChunkError("band", f"row {y}, {len(band)} bytes")
+        captures.setdefault(capture_id, (width, height, {}))[2][y] = bytes(band)
+
+    capture_id = max(captures)
+    width, height, bands = captures[capture_id]
+    frame = bytearray(width * height * 2)
+    covered = 0
+    for y, band in sorted(bands.items()):
+        frame[y * width * 2 : y * width * 2 + len(band)] = band
+        covered += len(band) // (width * 2)
+    if covered < height:
+        print(f"Warning: capture {capture_id} has {covered} of {height} rows")
+    return width, height, frame
+
+
+def to_png(width, height, frame, swap=False):
+    """Encode an RGB565 frame (little-endian, or big-endian with swap) as PNG."""
+    order = ">" if swap else "<"
+    pixels = struct.unpack(f"{order}{width * height}H", frame)
+    raw = bytearray()
+    for y in range(height):
+        raw.append(0)  # Filter type: none
+        for p in pixels[y * width : (y + 1) * width]:
+            r, g, b = (p >> 11) & 0x1F, (p >> 5) & 0x3F, p & 0x1F
+            raw += bytes((r << 3 | r >> 2, g << 2 | g >> 4, b << 3 | b >> 2))
+
+    def chunk(kind, body):
+        data = kind + body
+        return struct.pack(">I", len(body)) + data + struct.pack(">I", zlib.crc32(data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(bytes(raw), 9))
+        + chunk(b"IEND", b"")
+    )
+
+
+def from_broker(args):
+    try:
+        import paho.mqtt.client as mqtt  # noqa: PLC0415
+    except ImportError:
+        sys.exit("The broker mode needs paho-mqtt (pip install paho-mqtt)")
+
+    topic = f"status/{args.client_id}/screenshot"
+    received = []
+    done = {}
+
+    def on_message(_client, _userdata, msg):
+        for fields, payload in split_chunks(msg.payload):
+            received.append((fields, payload))
+            _, _, _, height, y, rows, _ = fields
+            done["last"] = y + rows >= height
+
+    client = mqtt.Client()
+    if args.user:
+        client.username_pw_set(args.user, args.password)
+    client.on_message = on_message
+    client.connect(args.broker, args.port)
+    client.subscribe(topic)
+    client.publish(f"display/{args.client_id}/set", json.dumps({"screenshot": True}))
+    client.loop_start()
+    try:
+        for _ in range(args.timeout * 10):
+            if done.get("last"):
+                break
+            time.sleep(0.1)
+    finally:
+        client.loop_stop()
+        client.disconnect()
+    if not received:
+        sys.exit(f"No chunks received on {topic}")
+    return received
+
+
+def selftest():
+    """Encode a synthetic 240x320 screen band by band and decode it again."""
+    width, height, band_rows = 240, 320, 20
+    frame = bytearray()
+    for y in range(height):
+        for x in range(width):
+            if y > 280:
+                p = 0x0841  # Nav bar
+            elif 20 < x < 220 and 40 < y < 120:
+                p = 0x18E7 if (x + y) % 7 else 0x07FF  # Card with some detail
+            else:
+                p = ((x * 31 // width) << 11) | ((y * 63 // height) << 5)
+            frame += struct.pack("<H", p)
+
+    stream = bytearray()
+    for y in range(0, height, band_rows):
+        band = frame[y * width * 2 : (y + band_rows) * width * 2]
+        out = bytearray(codec.HEADER_SIZE + codec.max_encoded_size(width * band_rows))
+        end = codec.encode_rle(band, width * band_rows, out, codec.HEADER_SIZE)
+        length = end - codec.HEADER_SIZE
+        codec.pack_header(out, codec.FORMAT_RLE, 1, width, height, y, band_rows, length)
+        stream += out[:end]
+
+    decoded = assemble(split_chunks(stream))
+    if decoded != (width, height, frame):
+        sys.exit("✗ Decoded frame differs from the encoded one")
+    print(f"✓ {len(frame)} B frame sent as {len(stream)} B of RLE chunks")
+    return decoded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("input", nargs="?", help="file with concatenated chunks")
+    parser.add_argument("-o", "--output", default="screenshot.png")
+    parser.add_argument("--swap", action="store_true", help="big-endian RGB565")
+    parser.add_argument("--broker", help="fetch a new capture from this broker")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    parser.add_argument("--client-id", help="device id (MQTT client id)")
+    parser.add_argument("--timeout", type=int, default=30, help="seconds")
+    parser.add_argument("--selftest", action="store_true")
+    args = parser.parse_args()
+
+    if args.selftest:
+        width, height, frame = selftest()
+    elif args.broker:
+        if not args.client_id:
+            parser.error("--broker needs --client-id")
+        width, height, frame = assemble(from_broker(args))
+    elif args.input:
+        data = Path(args.input).read_bytes()
+        width, height, frame = assemble(split_chunks(data))
+    else:
+        parser.error("give an input file, --broker or --selftest")
+
+    Path(args.output).write_bytes(to_png(width, height, frame, args.swap))
+    print(f"Wrote {args.output} ({width}x{height})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Sensor Quality Check
+
+Feeds a few hundred simulated sensors through DataManager on a simulated
+clock and checks sensor_quality.SensorQuality:
+
+- a sensor that stops reporting turns stale after three of its usual
+  intervals (at least cfg.sensor_stale_s), not before
+- out-of-range values are flagged and kept out of min/max, and
+  cfg.sensor_ranges overrides the default range by key
+- the scheduler renders a screen once when a row's staleness deadline
+  passes, with no new data and no renders in between
+- memory per sensor and the cost of record() and of a render-time pass
+"""
+
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.modules.setdefault("ujson", json)  # data_manager imports ujson
+
+SENSORS = 300
+STEP_MS = 500  # Scheduler tick
+
+
+class _Clock:
+    now = 0
+
+
+def _install_clock():
+    time.ticks_ms = lambda: _Clock.now
+    time.ticks_add = lambda t, delta: t + delta
+    time.ticks_diff = lambda a, b: a - b
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+def _sensor_message(i, value):
+    return f"Sensors/ds{i}", json.dumps({"id": f"DS18B20_{i}", "Temp": value})
+
+
+def _feed(data_mgr, periods, until, skip=()):
+    """Deliver every sensor's messages up to until, in time order."""
+    events = sorted(
+        (t, i) for i, period in enumerate(periods) for t in range(0, until, period)
+    )
+    for t, i in events:
+        if i in skip and t > 0:
+            continue
+        _Clock.now = t
+        data_mgr.process_message(*_sensor_message(i, 20 + i % 7))
+
+
+def check_staleness():
+    from data_manager import DataManager  # noqa: PLC0415
+    from sensor_quality import OK, STALE  # noqa: PLC0415
+
+    rng = random.Random(3)
+    periods = [rng.choice((10000, 30000, 60000, 120000)) for _ in range(SENSORS)]
+    data_mgr = DataManager()
+    dead = 7
+    periods[dead] = 120000  # Reports at 0, then dies
+    _feed(data_mgr, periods, 600000, skip={dead})
+
+    quality = data_mgr.quality
+    key = f"DS18B20_{dead}_C"
+    # One interval is known only after two messages: the floor applies
+    floor = quality.stale_at(key)
+    if floor != 300000:
+        _fail(f"first stale deadline {floor} ms, expected the 300 s floor")
+    states = [quality.state(f"DS18B20_{i}_C", 600000) for i in range(SENSORS)]
+    live = [s for i, s in enumerate(states) if i != dead]
+    if states[dead] != STALE or any(s != OK for s in live):
+        _fail(f"expected only sensor {dead} stale, got {states.count(STALE)} stale")
+
+    # A slow sensor is stale after three of its intervals, not the floor
+    slow = periods.index(120000)
+    slow_key = f"DS18B20_{slow}_C"
+    last = (600000 - 1) // 120000 * 120000
+    if quality.stale_at(slow_key) != last + 360000:
+        _fail(f"slow sensor deadline {quality.stale_at(slow_key)}")
+    if quality.state(slow_key, last + 359999) != OK:
+        _fail("the slow sensor turned stale early")
+    if quality.state(slow_key, last + 360000) != STALE:
+        _fail("the slow sensor did not turn stale")
+    info = quality.info(slow_key, last)
+    print(
+        f"  ✓ Dead sensor stale after the 300 s floor, a 2 min sensor after "
+        f"6 min ({info['per_min']} msg/min), {SENSORS - 1} others ok"
+    )
+
+
+def check_plausibility():
+    from config import cfg  # noqa: PLC0415
+    from data_manager import DataManager  # noqa: PLC0415
+    from sensor_quality import IMPLAUSIBLE, OK  # noqa: PLC0415
+
+    data_mgr = DataManager()
+    quality = data_mgr.quality
+    for t, humidity in enumerate((45, 47, 250, 46)):
+        _Clock.now = t * 1000
+        data_mgr.process_message(
+            "Sensors/DHT11", json.dumps({"temperature": 21, "humidity": humidity})
+        )
+        state = quality.state("DHT11_Percent", _Clock.now)
+        if state != (IMPLAUSIBLE if humidity == 250 else OK):
+            _fail(f"humidity {humidity}% in state {state}")
+    info = quality.info("DHT11_Percent", _Clock.now)
+    if (info["min"], info["max"], info["count"]) != (45, 47, 4):
+        _fail(f"min/max must skip implausible values: {info}")
+
+    cfg.sensor_ranges = {"DHT11_C": [0, 50]}  # The DHT11's own range
+    data_mgr.process_message(
+        "Sensors/DHT11", json.dumps({"temperature": 60, "humidity": 40})
+    )
+    if quality.state("DHT11_C", _Clock.now) != IMPLAUSIBLE:
+        _fail("cfg.sensor_ranges did not override the default range")
+    cfg.sensor_ranges = {}
+    print("  ✓ 250 % flagged and kept out of min/max, per-key range override")
+
+
+class _Screen:
+    """SensorScreen's render logic without LVGL."""
+
+    REFRESH_MS = 500
+    DATA_KEY = "sensors"
+
+    def __init__(self):
+        self.expires_at = None
+        self.renders = 0
+
+    def render(self, data_mgr):
+        from sensor_quality import STALE  # noqa: PLC0415
+
+        self.renders += 1
+        quality = data_mgr.quality
+        expires = None
+        for key in data_mgr.get_all_data()["sensors"]:
+            if quality.state(key, _Clock.now) != STALE:
+                stale_at = quality.stale_at(key)
+                if expires is None or stale_at < expires:
+                    expires = stale_at
+        self.expires_at = expires
+
+
+class _Display:
+    def __init__(self, screen):
+        self.screens = {"Temp": screen}
+        self.active_name = "Temp"
+
+
+def check_expiry():
+    from data_manager import DataManager  # noqa: PLC0415
+    from screen_scheduler import ScreenScheduler  # noqa: PLC0415
+
+    data_mgr = DataManager()
+    screen = _Screen()
+    scheduler = ScreenScheduler(_Display(screen), data_mgr)
+    for i in range(3):
+        _Clock.now = i * 1000
+        data_mgr.process_message(*_sensor_message(i, 21))
+    scheduler.tick(_Clock.now)
+
+    # No more data: the only renders left are the three staleness deadlines
+    before = screen.renders
+    while _Clock.now < 400000:
+        _Clock.now += STEP_MS
+        scheduler.tick(_Clock.now)
+    renders = screen.renders - before
+    if renders != 3:
+        _fail(f"{renders} renders without data, expected one per stale row")
+    if screen.expires_at is not None:
+        _fail("expires_at still set with every row stale")
+    ticks = 400000 // STEP_MS
+    print(f"  ✓ {renders} renders in {ticks} ticks without data, one per stale row")
+
+
+def check_cost():
+    from sensor_quality import SensorQuality  # noqa: PLC0415
+
+    keys = [f"DS18B20_{i}_C" for i in range(SENSORS)]
+    tracemalloc.start()
+    quality = SensorQuality()
+    for key in keys:
+        quality.record(key, 21.5, "°C", 0)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Without the index, whose key strings the data store holds anyway
+    per_sensor = (size - sys.getsizeof(quality._index)) / SENSORS
+
+    # The same metadata as one dict per sensor, for comparison
+    tracemalloc.start()
+    dicts = {
+        key: {"last": 0, "gap": 0, "lo": 21.5, "hi": 21.5, "count": 1, "bad": 0}
+        for key in keys
+    }
+    dict_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_dict = (dict_size - sys.getsizeof(dicts)) / SENSORS
+
+    start = time.perf_counter()
+    for t in range(1, 21):
+        for key in keys:
+            quality.record(key, 21.5, "°C", t * 10000)
+    record_us = (time.perf_counter() - start) * 1e6 / (20 * SENSORS)
+    start = time.perf_counter()
+    for key in keys:
+        quality.state(key, 300000)
+        quality.stale_at(key)
+    render_us = (time.perf_counter() - start) * 1e6
+    if per_sensor > 48:
+        _fail(f"{per_sensor:.1f} B per sensor")
+    print(
+        f"  ✓ {per_sensor:.0f} B per sensor including growth slack "
+        f"({per_dict:.0f} B as a dict per sensor)"
+    )
+    print(
+        f"  ✓ record() {record_us:.2f} us, render-time pass over {SENSORS} "
+        f"sensors {render_us:.0f} us (CPython)"
+    )
+
+
+def main() -> None:
+    print("=" * 60)
+    print("Sensor Quality Check")
+    print("=" * 60)
+    check_staleness()
+    check_plausibility()
+    check_expiry()
+    check_cost()
+    print("✓ All checks passed")
+
+
+if __name__ == "__main__":
+    _install_clock()
+    main()
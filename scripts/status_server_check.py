@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Status Server Check
+
+Runs status_server.StatusServer under CPython against a real DataManager fed
+with sample MQTT messages, polled from a thread the way the main loop polls
+it, and checks:
+
+- / and /<source> return valid JSON, /metrics valid Prometheus text,
+  unknown paths 404 and other methods 405
+- a request line that is not UTF-8 gets a 400 and a source that raises a
+  500, without poll() raising into the main loop
+- a response larger than one send chunk arrives complete
+- a client that never finishes its request neither blocks other clients
+  nor stays open past the client timeout
+- a single poll() call stays short, so serving never delays a frame
+"""
+
+import json
+import re
+import socket
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.modules.setdefault("ujson", json)  # data_manager imports ujson
+
+import status_server  # noqa: E402
+from data_manager import DataManager  # noqa: E402
+
+TIMEOUT_MS = 300  # Shortened client timeout for the stalled-client check
+MAX_POLL_MS = 20.0  # Generous: the client threads share the GIL
+
+MESSAGES = (
+    (
+        "host/desk/monitor",
+        b'{"name": "Manjaro", "cpu": [34.3, 38.3, 34, 38.1], "cpu_temp": 61,'
+        b' "ram": 34.6, "ssd_temp": 30.85, "net_down": 4.59375}',
+    ),
+    ("vps/monitor", b'{"cpu": 12.5, "ram": 45.3, "disk": 67.1, "uptime": 123456}'),
+    ("Sensors/DHT11", b'{"temperature": 21.5, "humidity": 48}'),
+)
+
+METRIC_LINE = re.compile(
+    r'^[a-zA-Z_][a-zA-Z0-9_]*(\{[a-z]+="[^"]*"(,[a-z]+="[^"]*")*\})? -?[0-9.e+-]+$'
+)
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _Poller(threading.Thread):
+    """Calls poll() in a loop like main.py and records the slowest call."""
+
+    def __init__(self, server):
+        super().__init__(daemon=True)
+        self.server = server
+        self.slowest_ms = 0.0
+        self.stop = False
+        self.error = None
+
+    def run(self):
+        while not self.stop:
+            start = time.perf_counter()
+            try:
+                self.server.poll()
+            except Exception as e:  # noqa: BLE001
+                self.error = e
+            elapsed = (time.perf_counter() - start) * 1000
+            self.slowest_ms = max(self.slowest_ms, elapsed)
+            time.sleep(0.001)
+
+
+def _broken_source():
+    raise KeyError("sensor")
+
+
+def _get(port, path, method="GET"):
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+def check_json(port, data_mgr, config):
+    status, headers, body = _get(port, "/")
+    doc = json.loads(body)
+    if status != 200 or headers["Content-Type"] != "application/json":
+        _fail(f"/ returned {status} {headers['Content-Type']}")
+    if set(doc) != {"data", "telemetry", "config"}:
+        _fail("/ does not contain every source")
+    if doc["data"] != data_mgr.get_all_data():
+        _fail("/ data differs from the data store")
+    if json.loads(_get(port, "/data")[2]) != data_mgr.get_all_data():
+        _fail("/data differs from the data store")
+    print("  ✓ / and /data return the data store as JSON")
+
+    status, _, body = _get(port, "/config")
+    if status != 200 or json.loads(body) != config:
+        _fail(f"/config: {status}, {len(body)} B")
+    print(f"  ✓ /config arrives complete ({len(body)} B, several send chunks)")
+
+    if _get(port, "/nope")[0] != 404 or _get(port, "/", "POST")[0] != 405:
+        _fail("unknown paths must 404 and non-GET requests 405")
+    print("  ✓ Unknown path 404, POST 405")
+
+
+def check_metrics(port):
+    status, headers, body = _get(port, "/metrics")
+    if status != 200 or not headers["Content-Type"].startswith("text/plain"):
+        _fail(f"/metrics returned {status} {headers['Content-Type']}")
+    lines = body.decode().splitlines()
+    bad = [line for line in lines if not METRIC_LINE.match(line)]
+    if bad:
+        _fail(f"malformed metric lines: {bad[:3]}")
+    expected = (
+        'dashboard_host_cpu_temp{host="desk"} 61',
+        'dashboard_host_cpu{host="desk",core="3"} 38.1',
+        'dashboard_vps_uptime{host="vps"} 123456',
+        'dashboard_sensor{sensor="DHT11_C"} 21.5',
+        'dashboard_telemetry_faults{name="mqtt"} 2',
+    )
+    missing = [line for line in expected if line not in lines]
+    if missing:
+        _fail(f"missing metrics: {missing}")
+    print(f"  ✓ /metrics: {len(lines)} well-formed lines with host/core labels")
+
+
+def check_bad_requests(port, poller):
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(b"GET /\xff\xfe HTTP/1.0\r\n\r\n")
+        reply = sock.recv(64)
+    if not reply.startswith(b"HTTP/1.0 400"):
+        _fail(f"a non-UTF-8 path got {reply[:20]!r}")
+    if _get(port, "/broken")[0] != 500 or _get(port, "/metrics")[0] != 500:
+        _fail("a raising source must answer 500")
+    if poller.error is not None or _get(port, "/telemetry")[0] != 200:
+        _fail(f"poll() raised {poller.error!r}")
+    print("  ✓ Non-UTF-8 path 400, raising source 500; poll() keeps serving")
+
+
+def check_stalled_client(server, port):
+    stalled = socket.create_connection(("127.0.0.1", port))
+    stalled.sendall(b"GET /data HTTP/1.1\r\nHost: x\r\n")  # Never finished
+    time.sleep(0.05)
+    if _get(port, "/telemetry")[0] != 200:
+        _fail("a stalled client blocked another request")
+    print("  ✓ A stalled client does not block others")
+
+    stalled.settimeout(TIMEOUT_MS / 1000 * 10)
+    start = time.perf_counter()
+    try:
+        closed = stalled.recv(1) == b""
+    except OSError:
+        closed = True
+    waited = (time.perf_counter() - start) * 1000
+    stalled.close()
+    if not closed or server._clients:
+        _fail("the stalled client was not dropped")
+    print(f"  ✓ Stalled client dropped after {waited:.0f} ms")
+
+
+def main() -> None:
+    print("=" * 60)
+    print("Status Server Check")
+    print("=" * 60)
+
+    data_mgr = DataManager()
+    for topic, payload in MESSAGES:
+        data_mgr.process_message(topic, payload)
+    config = {f"key_{i}": "x" * 40 for i in range(200)}
+    telemetry = {
+        "boots": 3,
+        "faults": {"mqtt": 2, "weather": 1},
+        "uptime_s": 3600,
+        "mqtt_connected": True,
+    }
+    status_server._CLIENT_TIMEOUT_MS = TIMEOUT_MS
+    port = _free_port()
+    server = status_server.StatusServer(
+        {
+            "data": data_mgr.get_all_data,
+            "telemetry": lambda: telemetry,
+            "config": lambda: config,
+        },
+        port,
+        "127.0.0.1",
+    )
+    server.start()  # Listen before the first request; poll() would do it lazily
+    poller = _Poller(server)
+    poller.start()
+    try:
+        check_json(port, data_mgr, config)
+        check_metrics(port)
+        server.sources["broken"] = _broken_source
+        check_bad_requests(port, poller)
+        del server.sources["broken"]
+        check_stalled_client(server, port)
+    finally:
+        poller.stop = True
+        poller.join()
+        server.close()
+
+    if server.requests < 7:
+        _fail(f"request counter at {server.requests}")
+    if poller.slowest_ms > MAX_POLL_MS:
+        _fail(f"slowest poll() took {poller.slowest_ms:.2f} ms")
+    print(f"  ✓ Slowest poll() {poller.slowest_ms:.2f} ms")
+    print("✓ All checks passed")
+
+
+if __name__ == "__main__":
+    main()
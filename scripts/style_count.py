@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Style Count
+
+Builds every screen and the navigation bars against a stub lvgl module that
+records each call, then reports per screen how many widgets are created,
+how many style properties are set as local styles (set_style_*) and how
+many shared styles are attached (add_style), with an estimate of the local
+style memory. With --baseline REV the same is done for an older commit
+(exported with git archive), e.g. the last one before theme.py:
+
+    python scripts/style_count.py --baseline c6c803e
+
+The byte estimate assumes LVGL v9 on a 32-bit target, where lvgl_micropython
+allocates from the GC heap in 16-byte blocks: a local style costs an
+lv_style_t (one block), its value/property array (5 bytes per property,
+rounded up to blocks) and an 8-byte entry in the object's style list; an
+attached shared style costs only the list entry. Construction time on the
+device is best measured directly with theme.measure(); the call counts here
+show where it goes.
+"""
+
+import argparse
+import importlib.abc
+import importlib.machinery
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from collections import Counter
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+_BLOCK = 16
+_STYLE_T = 16
+_LIST_ENTRY = 8
+_PROP_BYTES = 5
+_WIDGETS = {"obj", "label", "bar", "table", "image", "img"}
+
+# Hardware and firmware modules replaced by call recorders
+_STUBBED = {
+    "lvgl",
+    "machine",
+    "ntptime",
+    "urequests",
+    "network",
+    "esp32",
+    "lcd_bus",
+    "ili9341",
+    "display_driver_framework",
+    "fs_driver",
+    "neopixel",
+    "umqtt",
+    "umqtt.simple",
+}
+
+# Screen name -> (module, class, constructor args), as built in main.py
+_SCREENS = (
+    ("Weather", "weather_screen", "WeatherScreen", ("mqtt",)),
+    ("Temp", "sensors_screen", "SensorScreen", ("mqtt", "data_mgr")),
+    ("All", "overview_screen", "OverviewScreen", ()),
+    ("VPS", "vps_monitor_screen", "VPSMonitorScreen", ()),
+    ("Host", "host_monitor_screen", "HostMonitorScreen", ()),
+)
+
+
+class _Recorder:
+    """Counts calls and the local style properties per (object, selector)."""
+
+    def __init__(self):
+        self.calls = Counter()
+        # Keyed by the objects themselves, so their ids are never reused
+        self.local = {}  # (obj, selector) -> set of properties
+        self.shared = {}  # lv.style_t -> set of properties
+
+    def record(self, target, name, args):
+        self.calls[name] += 1
+        if repr(target) == "style_t()" and name.startswith("set_"):
+            self.shared.setdefault(target, set()).add(name)
+        elif name.startswith("set_style_") and target is not None:
+            selector = args[-1] if args else 0
+            key = (target, repr(selector))
+            self.local.setdefault(key, set()).add(name[10:])
+
+    @staticmethod
+    def _style_bytes(props):
+        return _STYLE_T + -(-len(props) * _PROP_BYTES // _BLOCK) * _BLOCK
+
+    def shared_row(self):
+        """The shared lv.style_t objects, allocated once at import."""
+        return {
+            "widgets": 0,
+            "set_style": 0,
+            "add_style": 0,
+            "local_styles": 0,
+            "bytes": sum(self._style_bytes(p) for p in self.shared.values()),
+        }
+
+    def snapshot(self):
+        local_bytes = sum(
+            self._style_bytes(props) + _LIST_ENTRY for props in self.local.values()
+        )
+        return {
+            "widgets": sum(self.calls[name] for name in _WIDGETS),
+            "set_style": sum(
+                n for name, n in self.calls.items() if name.startswith("set_style_")
+            ),
+            "add_style": self.calls["add_style"],
+            "local_styles": len(self.local),
+            "bytes": local_bytes + self.calls["add_style"] * _LIST_ENTRY,
+        }
+
+
+_recorder = _Recorder()
+
+
+class _Stub:
+    """Stands in for any lvgl/hardware object; every call is recorded."""
+
+    def __init__(self, name, owner=None):
+        self._name = name
+        self._owner = owner
+
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return _Stub(attr, self)
+
+    def __call__(self, *args, **_kwargs):
+        _recorder.record(self._owner, self._name, args)
+        return _Stub(self._name + "()")
+
+    def __repr__(self):
+        return self._name
+
+    def __bool__(self):
+        return True
+
+    def __int__(self):
+        return 0
+
+    __index__ = __int__
+
+    def __iter__(self):
+        return iter(())
+
+    def __lt__(self, _other):
+        return False
+
+    __gt__ = __le__ = __ge__ = __lt__
+
+    def __or__(self, _other):
+        return 0
+
+    __ror__ = __add__ = __radd__ = __sub__ = __mul__ = __floordiv__ = __or__
+
+
+class _StubModule(types.ModuleType):
+    def __getattr__(self, attr):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        return _Stub(attr, None)
+
+
+class _StubFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    def find_spec(self, fullname, _path, _target=None):
+        if fullname in _STUBBED:
+            return importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+        return None
+
+    def create_module(self, spec):
+        return _StubModule(spec.name)
+
+    def exec_module(self, module):
+        pass
+
+
+def _install_stubs():
+    """Make the MicroPython-only modules and functions importable."""
+    import gc  # noqa: PLC0415
+
+    sys.meta_path.insert(0, _StubFinder())
+    micropython = types.ModuleType("micropython")
+    micropython.const = lambda value: value
+    sys.modules["micropython"] = micropython
+    secrets = types.ModuleType("secrets")
+    for name in ("OPENWEATHERMAP_API_KEY", "OPENWEATHERMAP_CITY"):
+        setattr(secrets, name, "x")
+    secrets.OPENWEATHERMAP_COUNTRY = "de"
+    secrets.WIFI_CREDENTIALS = []
+    sys.modules["secrets"] = secrets
+
+    time.ticks_ms = lambda: int(time.monotonic() * 1000)
+    time.ticks_us = lambda: int(time.monotonic() * 1000000)
+    time.ticks_add = lambda t, delta: t + delta
+    time.ticks_diff = lambda a, b: a - b
+    time.sleep_ms = lambda _ms: None
+    time.sleep_us = lambda _us: None
+    gc.threshold = lambda *_args: None
+    gc.mem_free = lambda: 1 << 20
+    gc.mem_alloc = lambda: 0
+
+
+def _run_child(tree):
+    """Build all screens from tree and print the counts as JSON."""
+    _install_stubs()
+    sys.path.insert(0, tree)
+    import display  # noqa: PLC0415
+
+    disp = display.Display()
+    args = {"mqtt": _Stub("mqtt"), "data_mgr": _Stub("data_mgr")}
+    results = {}
+    for name, module_name, class_name, arg_names in _SCREENS:
+        try:
+            cls = getattr(__import__(module_name), class_name)
+        except (ImportError, AttributeError):
+            continue
+        before = _recorder.snapshot()
+        disp.add_screen(name, cls(*(args[a] for a in arg_names)))
+        after = _recorder.snapshot()
+        results[name] = {key: after[key] - before[key] for key in after}
+
+    before = _recorder.snapshot()
+    disp.finalize_setup()
+    disp.set_banner("Alert")
+    after = _recorder.snapshot()
+    results["Nav + banner"] = {key: after[key] - before[key] for key in after}
+    if _recorder.shared:
+        results["Shared styles"] = _recorder.shared_row()
+    print(json.dumps(results))
+
+
+def _measure(tree):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", str(tree)],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=tempfile.gettempdir(),
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _export(rev, target):
+    archive = subprocess.run(
+        ["git", "-C", str(PROJECT_DIR), "archive", rev],
+        check=True,
+        capture_output=True,
+    ).stdout
+    subprocess.run(["tar", "-x", "-C", str(target)], input=archive, check=True)
+
+
+_ROW = "  {:<14}{:>8}{:>11}{:>11}{:>7}{:>8}"
+_COLUMNS = ("widgets", "set_style", "add_style", "local_styles", "bytes")
+
+
+def _print_table(title, results):
+    print(f"\n{title}")
+    print(_ROW.format("Screen", "widgets", "set_style", "add_style", "local", "~bytes"))
+    total = Counter()
+    for name, row in results.items():
+        total.update(row)
+        print(_ROW.format(name, *(row[key] for key in _COLUMNS)))
+    print(_ROW.format("Total", *(total[key] for key in _COLUMNS)))
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--baseline", help="git revision to compare against")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _run_child(args.child)
+        return
+
+    print("=" * 60)
+    print("Style Count")
+    print("=" * 60)
+    current = _print_table("Working tree", _measure(PROJECT_DIR))
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            _export(args.baseline, tmp)
+            base = _print_table(args.baseline, _measure(tmp))
+        saved = base["bytes"] - current["bytes"]
+        calls = base["set_style"] + base["add_style"]
+        calls -= current["set_style"] + current["add_style"]
+        print(f"\nSaved: {saved} B of style data, {calls} style calls at startup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Supervisor Simulation
+
+Runs supervisor.Supervisor in a 50 ms main loop on a simulated clock and
+injects faults per subsystem, with machine.RTC and machine.reset()
+simulated:
+
+- a failing weather fetch is retried with doubling backoff and restarted
+  on its own; the other subsystems keep running on every pass
+- a screen that fails on every call stays below the storm limit and never
+  resets the device
+- exactly storm_limit restarts in storm_window_ms do not reset the device,
+  one more does
+- boots, resets and faults survive the reset in RTC memory
+"""
+
+import sys
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+LOOP_MS = 50
+# name -> (base_backoff_ms, max_backoff_ms), as registered in main.py
+SUBSYSTEMS = {
+    "touch": (1000, 60000),
+    "display": (1000, 60000),
+    "mqtt": (1000, 60000),
+    "weather": (30000, 600000),
+    "screen:Host": (1000, 60000),
+}
+
+
+class _Clock:
+    now = 0
+
+
+class _Reset(Exception):
+    """machine.reset() was called."""
+
+
+class _RTC:
+    memory_bytes = b""  # Survives _Reset, like RTC slow memory
+
+    def memory(self, data=None):
+        if data is None:
+            return _RTC.memory_bytes
+        _RTC.memory_bytes = data.encode() if isinstance(data, str) else data
+        return None
+
+
+class _Fault(OSError):
+    """An injected subsystem fault."""
+
+
+def _reset():
+    raise _Reset
+
+
+def _install_stubs():
+    time.ticks_ms = lambda: _Clock.now
+    time.ticks_add = lambda t, delta: t + delta
+    time.ticks_diff = lambda a, b: a - b
+
+    def sleep_ms(ms):
+        _Clock.now += ms
+
+    time.sleep_ms = sleep_ms
+    machine = types.ModuleType("machine")
+    machine.RTC = _RTC
+    machine.reset = _reset
+    sys.modules["machine"] = machine
+
+    import supervisor  # noqa: PLC0415
+
+    # Keep the report readable: the supervisor logs every fault
+    supervisor.print = lambda *_args, **_kwargs: None
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+class _Component:
+    """A subsystem that raises while failing(now) is true."""
+
+    def __init__(self, failing=lambda _now: False):
+        self.failing = failing
+        self.calls = []
+        self.restarts = 0
+
+    def step(self):
+        self.calls.append(_Clock.now)
+        if self.failing(_Clock.now):
+            raise _Fault
+
+    def restart(self):
+        self.restarts += 1
+
+
+def _boot(**failing):
+    from supervisor import Supervisor  # noqa: PLC0415
+
+    sup = Supervisor()
+    components = {}
+    for name, (base, cap) in SUBSYSTEMS.items():
+        component = _Component(failing.get(name, lambda _now: False))
+        sup.register(name, component.restart, base, cap)
+        components[name] = component
+    return sup, components
+
+
+def _loop(sup, components, until):
+    """Main loop passes until until; returns the time of a reset, if any."""
+    while _Clock.now < until:
+        for name, component in components.items():
+            try:
+                sup.run(name, component.step)
+            except _Reset:
+                return _Clock.now
+        _Clock.now += LOOP_MS
+    return None
+
+
+def check_isolation():
+    _Clock.now = 0
+    _RTC.memory_bytes = b""
+    sup, components = _boot(weather=lambda now: now < 300000)
+    if _loop(sup, components, 600000) is not None:
+        _fail("a failing weather fetch reset the device")
+    weather = components["weather"]
+    failed = [t for t in weather.calls if t < 300000]
+    gaps = [b - a for a, b in zip(failed, failed[1:])]
+    expected = [30000 << i for i in range(len(gaps))]
+    # Each retry waits for the backoff, rounded up to the next loop pass
+    if any(not e <= g < e + LOOP_MS for g, e in zip(gaps, expected)):
+        _fail(f"weather retry gaps {gaps}, expected {expected}")
+    if weather.restarts != len(failed):
+        _fail(f"{weather.restarts} weather restarts for {len(failed)} faults")
+    passes = 600000 // LOOP_MS
+    for name, component in components.items():
+        if name != "weather" and (component.restarts or len(component.calls) != passes):
+            _fail(f"{name} was disturbed by the weather faults")
+    if sup.stats()["failing"]:
+        _fail(f"still failing after recovery: {sup.stats()['failing']}")
+    print(
+        f"  ✓ Weather failing for 5 min: {len(failed)} attempts, gaps "
+        f"{', '.join(str(g // 1000) for g in gaps)} s, recovered; the other "
+        f"{len(components) - 1} subsystems ran all {passes} passes"
+    )
+
+
+def check_persistent_fault():
+    _Clock.now = 0
+    _RTC.memory_bytes = b""
+    sup, components = _boot(**{"screen:Host": lambda _now: True})
+    if _loop(sup, components, 600000) is not None:
+        _fail("one persistently failing screen reset the device")
+    screen = components["screen:Host"]
+    gaps = [b - a for a, b in zip(screen.calls, screen.calls[1:])]
+    if not 60000 <= gaps[-1] < 60000 + LOOP_MS or max(gaps) >= 60000 + LOOP_MS:
+        _fail(f"screen:Host retry gaps {gaps}, expected a 60 s cap")
+    print(
+        f"  ✓ screen:Host failing on every call: {screen.restarts} restarts in "
+        f"10 min, backoff capped at 60 s, no reset"
+    )
+
+
+def check_storm():
+    from supervisor import _STORM_LIMIT, Supervisor  # noqa: PLC0415
+
+    limit = _STORM_LIMIT
+    for faults, resets in ((limit, False), (limit + 1, True)):
+        _Clock.now = 0
+        _RTC.memory_bytes = b""
+        # Faults spread over one storm window, each in its own subsystem
+        names = [f"net:{i}" for i in range(faults)]
+        sup = Supervisor()
+        reset_at = None
+        for i, name in enumerate(names):
+            _Clock.now = i * 5000
+            sup.register(name)
+            try:
+                sup.report(name, _Fault())
+            except _Reset:
+                reset_at = _Clock.now
+        if (reset_at is not None) != resets:
+            _fail(f"{faults} restarts in {sup.storm_window_ms} ms: reset={reset_at}")
+
+    # The counters survive the reset in RTC memory
+    after = Supervisor()
+    stats = after.stats()
+    faults = sum(stats["faults"].values())
+    if stats["boots"] != 2 or stats["resets"] != 1 or faults != limit + 1:
+        _fail(f"RTC counters after the reset: {stats}")
+    print(
+        f"  ✓ {limit} restarts in {after.storm_window_ms // 1000} s: no reset; "
+        f"{limit + 1}: reset at {reset_at // 1000} s"
+    )
+    print(
+        f"  ✓ After the reset: boots {stats['boots']}, resets {stats['resets']}, "
+        f"{faults} faults kept in RTC memory"
+    )
+
+
+def main() -> None:
+    print("=" * 60)
+    print("Supervisor Simulation")
+    print("=" * 60)
+    check_isolation()
+    check_persistent_fault()
+    check_storm()
+    print("✓ All checks passed")
+
+
+if __name__ == "__main__":
+    _install_stubs()
+    main()
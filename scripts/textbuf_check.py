@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Text Buffer Check
+
+Verifies that textbuf.LabelText formats integers and fixed-point floats
+like str.format(), and that label updates allocate nothing in steady state:
+repeated updates with unchanged values must neither create a str nor touch
+the label, and no update may retain memory.
+
+Allocations are traced with tracemalloc under CPython. CPython boxes ints
+above 256, MicroPython only above 2**30, so a transient of one or two
+CPython ints per fixed() call is a host artifact; the check allows that and
+nothing else.
+"""
+
+import itertools
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from textbuf import LabelText  # noqa: E402
+
+ITERATIONS = 10000
+INT_BYTES = 32  # Size of a small boxed CPython int
+SAMPLE = (61.0, 30.85, 34.6, 4.59375)  # cpu_temp, ssd_temp, ram, net_down
+
+
+class _Label:
+    """Stands in for lv.label; counts the texts it is given."""
+
+    def __init__(self):
+        self.text = None
+        self.updates = 0
+
+    def set_text_static(self, text):
+        self.text = text
+        self.updates += 1
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+def _is_tie(value, decimals):
+    """True if value sits on a rounding tie, where format() rounds to even."""
+    scaled = abs(value) * 10**decimals
+    return abs(scaled - int(scaled) - 0.5) < 1e-6
+
+
+def check_format():
+    rng = random.Random(42)
+    text = LabelText(_Label(), 48)
+    for _ in range(20000):
+        n = rng.randint(-99999, 99999)
+        width = rng.randint(0, 6)
+        text.begin().num(n).add(b" ").num(abs(n), width, 0x30).commit()
+        expected = f"{n} {abs(n):0{width}d}"
+        if text.label.text != expected:
+            _fail(f"num({n}) gave {text.label.text!r}, expected {expected!r}")
+
+        value = rng.uniform(-500, 5000)
+        decimals = rng.randint(0, 3)
+        if _is_tie(value, decimals) or round(value, decimals) == 0:
+            continue
+        text.begin().fixed(value, decimals).commit()
+        expected = f"{value:.{decimals}f}"
+        if text.label.text != expected:
+            _fail(f"fixed({value}, {decimals}) gave {text.label.text!r}")
+    print("  ✓ num() and fixed() match str.format()")
+
+
+def _update(temp, ram, net, sample):
+    """The host screen's label updates (see HostMonitorScreen)."""
+    cpu_temp, ssd_temp, ram_perc, net_down = sample
+    text = temp.begin().add(b"CPU: ").num(int(cpu_temp))
+    text.add(b"\xc2\xb0C  |  SSD: ").fixed(ssd_temp, 1).add(b"\xc2\xb0C").commit()
+    ram.begin().add(b"RAM: ").fixed(ram_perc / 100 * 32, 1).add(b"GB / ")
+    ram.fixed(32, 0).add(b"GB").commit()
+    net.begin().add(b"Net \xef\x80\x99 ").fixed(net_down, 1).add(b" KB/s").commit()
+
+
+def _update_format(labels, sample):
+    """The same updates with str.format(), as before textbuf."""
+    cpu_temp, ssd_temp, ram_perc, net_down = sample
+    labels[0].set_text_static(
+        "CPU: {}\xb0C  |  SSD: {:.1f}\xb0C".format(int(cpu_temp), ssd_temp)
+    )
+    labels[1].set_text_static(
+        "RAM: {:.1f}GB / {:.0f}GB".format(ram_perc / 100 * 32, 32)
+    )
+    labels[2].set_text_static("Net \uf019 {:.1f} KB/s".format(net_down))
+
+
+def _traced(func, *args):
+    """Return (retained, peak) bytes of calling func ITERATIONS times."""
+    func(*args)  # Warm up
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    for _ in itertools.repeat(None, ITERATIONS):
+        func(*args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current - start, peak - start
+
+
+def check_allocations():
+    labels = [_Label(), _Label(), _Label()]
+    texts = [LabelText(label) for label in labels]
+    _update(*texts, SAMPLE)
+    plain = [_Label(), _Label(), _Label()]
+    _update_format(plain, SAMPLE)
+    if [label.text for label in labels] != [label.text for label in plain]:
+        _fail(f"texts differ from str.format(): {[label.text for label in labels]}")
+
+    updates = [label.updates for label in labels]
+    _, call_peak = _traced(lambda *_args: None, *texts, SAMPLE)
+    retained, peak = _traced(_update, *texts, SAMPLE)
+    peak -= call_peak  # The interpreter's own cost of a call
+    if [label.updates for label in labels] != updates:
+        _fail("unchanged values updated a label")
+    if retained or peak > 2 * INT_BYTES:
+        _fail(f"steady state allocated: retained {retained} B, peak {peak} B")
+    print(f"  ✓ Unchanged values: no label update, peak {peak} B (boxed ints only)")
+
+    _, format_peak = _traced(_update_format, plain, SAMPLE)
+    format_peak -= call_peak
+    print(f"    str.format() path: peak {format_peak} B, 3 strs per update")
+
+    changed = (62.0, 30.85, 34.6, 4.59375)  # Only the CPU temperature moves
+    _update(*texts, changed)
+    if [label.updates for label in labels] != [updates[0] + 1, *updates[1:]]:
+        _fail("a changed value must update exactly its own label")
+    print("  ✓ A changed value creates one str for its label only")
+
+
+def main() -> None:
+    print("=" * 60)
+    print("Text Buffer Check")
+    print("=" * 60)
+    check_format()
+    check_allocations()
+    print("✓ All checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Touch Affine Check
+
+Verifies the calibration math in touch_affine.py against synthetic raw
+samples: a simulated panel (swapped axes, mirrored, slightly rotated) is
+"tapped" at the three calibration targets with ADC noise, the transform is
+solved and converted to fixed point, and the mapping error is measured over
+random screen points. Also checks that the legacy min/max calibration is
+reproduced and that intermediates stay within MicroPython small ints.
+"""
+
+import math
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import touch_affine  # noqa: E402
+
+WIDTH = 240
+HEIGHT = 320
+SAMPLES = 2000
+NOISE = 3  # +/- raw ADC counts per tap
+MAX_ERROR_PX = 3
+SMALL_INT = 1 << 30
+
+# Legacy calibration values from the original display.py
+X_MIN, X_MAX, Y_MIN, Y_MAX = 288, 1866, 246, 1794
+
+
+def panel_raw(sx, sy, angle_deg=1.5):
+    """Simulated panel: screen point -> raw (x, y), as on the ILI9341 board."""
+    angle = math.radians(angle_deg)
+    rx = sx * math.cos(angle) - sy * math.sin(angle)
+    ry = sx * math.sin(angle) + sy * math.cos(angle)
+    raw_x = X_MIN + ry * (X_MAX - X_MIN) / HEIGHT
+    raw_y = Y_MAX - rx * (Y_MAX - Y_MIN) / WIDTH
+    return raw_x, raw_y
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+def check_calibration(rng):
+    taps = []
+    for sx, sy in touch_affine.TARGETS:
+        raw_x, raw_y = panel_raw(sx, sy)
+        taps.append(
+            (
+                int(raw_x + rng.uniform(-NOISE, NOISE)),
+                int(raw_y + rng.uniform(-NOISE, NOISE)),
+            )
+        )
+    fixed = touch_affine.to_fixed(touch_affine.solve(taps, touch_affine.TARGETS))
+
+    worst = total = 0.0
+    for _ in range(SAMPLES):
+        sx, sy = rng.uniform(0, WIDTH - 1), rng.uniform(0, HEIGHT - 1)
+        raw_x, raw_y = panel_raw(sx, sy)
+        px, py = touch_affine.apply(fixed, int(raw_x), int(raw_y))
+        err = math.hypot(px - sx, py - sy)
+        worst = max(worst, err)
+        total += err
+    print(f"  3-point fit: mean {total / SAMPLES:.2f} px, max {worst:.2f} px")
+    if worst > MAX_ERROR_PX:
+        _fail(f"mapping error {worst:.2f} px exceeds {MAX_ERROR_PX} px")
+
+    largest = max(
+        abs(a * rx + b * ry + c)
+        for a, b, c in (fixed[:3], fixed[3:])
+        for rx in (0, 4095)
+        for ry in (0, 4095)
+    )
+    if largest >= SMALL_INT:
+        _fail(f"fixed-point intermediate {largest} leaves the small-int range")
+    print(f"  Largest intermediate: {largest} (< 2**30)")
+
+
+def check_legacy():
+    fixed = touch_affine.to_fixed(touch_affine.from_minmax(X_MIN, X_MAX, Y_MIN, Y_MAX))
+    mismatches = 0
+    for raw_x in range(X_MIN + 1, X_MAX, 7):
+        for raw_y in range(Y_MIN + 1, Y_MAX, 7):
+            legacy = (
+                (Y_MAX - raw_y) * WIDTH // (Y_MAX - Y_MIN),
+                (raw_x - X_MIN) * HEIGHT // (X_MAX - X_MIN),
+            )
+            px, py = touch_affine.apply(fixed, raw_x, raw_y)
+            if abs(px - legacy[0]) > 1 or abs(py - legacy[1]) > 1:
+                mismatches += 1
+    if mismatches:
+        _fail(f"legacy min/max mapping differs by > 1 px at {mismatches} points")
+    print("  Legacy min/max mapping reproduced within 1 px")
+
+
+def check_collinear():
+    try:
+        touch_affine.solve(((100, 100), (200, 200), (300, 300)), touch_affine.TARGETS)
+    except ValueError:
+        print("  Collinear taps rejected")
+    else:
+        _fail("collinear taps were accepted")
+
+
+def main() -> None:
+    print("=" * 60)
+    print("Touch Affine Check")
+    print("=" * 60)
+    rng = random.Random(42)
+    for _ in range(5):
+        check_calibration(rng)
+    check_legacy()
+    check_collinear()
+    print("✓ All checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Wi-Fi Simulation
+
+Drives wifi.WifiManager.poll() from a 50 ms main loop against a simulated
+network.WLAN and access points, on a simulated clock, and reports the time
+to connect in four cases:
+
+  first boot          no cache: one scan, the strongest known SSID wins
+  cached BSSID hit    the AP from /wifi_cache.json is there; no scan
+  cache miss          the cached AP was replaced: the fast timeout runs
+                      out, then one scan ranks the known SSIDs by RSSI
+  link drop           a connected link drops; poll() notices it and
+                      reconnects through the cache
+
+The radio timings below are assumptions; the comparison between the cases
+is the point, not the absolute times.
+"""
+
+import binascii
+import json
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+LOOP_MS = 50
+SCAN_MS = 2200  # Blocking scan of all channels
+ASSOC_MS = 350  # Authentication, association, DHCP
+FIND_MS = 1800  # connect() without a BSSID looks for the SSID first
+CREDENTIALS = [
+    {"ssid": "attic", "password": "secret2"},
+    {"ssid": "home", "password": "secret1"},
+]
+HOME = ("home", b"\x10\x00\x00\x00\x00\x01", 6, -48)
+HOME_NEW = ("home", b"\x10\x00\x00\x00\x00\x02", 11, -52)
+ATTIC = ("attic", b"\x10\x00\x00\x00\x00\x03", 1, -71)
+NEIGHBOUR = ("neighbour", b"\x10\x00\x00\x00\x00\x04", 6, -40)
+
+
+class _Clock:
+    now = 0
+
+
+class _Air:
+    """The access points in range, as (ssid, bssid, channel, rssi)."""
+
+    aps = []
+
+
+class _WLAN:
+    """network.WLAN stand-in: associates after a delay if the AP exists."""
+
+    def __init__(self, _interface):
+        self.connected_at = None
+        self.ap = None
+        self.scans = 0
+
+    def active(self, _on):
+        pass
+
+    def scan(self):
+        self.scans += 1
+        _Clock.now += SCAN_MS
+        return [(s.encode(), b, c, r, 3, False) for s, b, c, r in _Air.aps]
+
+    def disconnect(self):
+        self.connected_at = None
+        self.ap = None
+
+    def connect(self, ssid, _password, bssid=None):
+        matches = [ap for ap in _Air.aps if ap[0] == ssid]
+        if bssid is not None:
+            matches = [ap for ap in matches if ap[1] == bssid]
+        if not matches:
+            return  # Keeps trying in the background, never associates
+        self.ap = max(matches, key=lambda ap: ap[3])
+        delay = ASSOC_MS if bssid is not None else FIND_MS + ASSOC_MS
+        self.connected_at = _Clock.now + delay
+
+    def drop(self):
+        self.connected_at = None
+
+    def isconnected(self):
+        return (
+            self.connected_at is not None
+            and self.ap in _Air.aps
+            and _Clock.now >= self.connected_at
+        )
+
+    def config(self, _name):
+        return b"\x24\x0a\xc4\x00\x00\x01"
+
+    def ifconfig(self):
+        return ("192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1")
+
+
+def _install_stubs(cache_path):
+    time.ticks_ms = lambda: _Clock.now
+    time.ticks_add = lambda t, delta: t + delta
+    time.ticks_diff = lambda a, b: a - b
+
+    def sleep_ms(ms):
+        _Clock.now += ms
+
+    time.sleep_ms = sleep_ms
+    network = types.ModuleType("network")
+    network.STA_IF = 0
+    network.WLAN = _WLAN
+    sys.modules["network"] = network
+    secrets = types.ModuleType("secrets")
+    secrets.WIFI_CREDENTIALS = CREDENTIALS
+    sys.modules["secrets"] = secrets
+    sys.modules["ubinascii"] = binascii
+
+    import wifi  # noqa: PLC0415
+
+    wifi._CACHE_PATH = cache_path
+    # Keep the report readable: the manager prints every step
+    wifi.print = lambda *_args, **_kwargs: None
+
+
+def _fail(message):
+    print(f"✗ {message}")
+    sys.exit(1)
+
+
+def _loop_until_connected(manager, limit_ms=60000):
+    start = _Clock.now
+    while not manager.is_connected:
+        manager.poll()
+        _Clock.now += LOOP_MS
+        if _Clock.now - start > limit_ms:
+            _fail("not connected within a minute")
+
+
+def _boot(aps):
+    import wifi  # noqa: PLC0415
+
+    _Air.aps = list(aps)
+    _Clock.now = 0
+    manager = wifi.WifiManager()
+    manager.start()
+    _loop_until_connected(manager)
+    return manager
+
+
+def _clear_cache(path):
+    Path(path).unlink(missing_ok=True)
+
+
+def _report(name, manager, expect_ssid, expect_scans):
+    ssid, _, bssid, _ = manager._current
+    scans = manager.wlan.scans
+    print(
+        f"  {name:18s} {manager.connect_ms:6d} ms   {ssid:6s} "
+        f"{binascii.hexlify(bssid or b'-').decode():12s} {scans} scan(s)"
+    )
+    if ssid != expect_ssid or scans != expect_scans:
+        _fail(f"{name}: {ssid} after {scans} scans")
+
+
+def main() -> None:
+    print("=" * 60)
+    print("Wi-Fi Simulation")
+    print("=" * 60)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = str(Path(tmp) / "wifi_cache.json")
+        _install_stubs(cache_path)
+        print("  case              connect     SSID   BSSID        scans")
+
+        _clear_cache(cache_path)
+        first = _boot((HOME, ATTIC, NEIGHBOUR))
+        _report("first boot", first, "home", 1)
+
+        cached = _boot((HOME, ATTIC, NEIGHBOUR))
+        _report("cached BSSID hit", cached, "home", 0)
+
+        # The router was replaced: the cached BSSID is gone, attic is weaker
+        miss = _boot((HOME_NEW, ATTIC, NEIGHBOUR))
+        _report("cache miss", miss, "home", 1)
+        if json.loads(Path(cache_path).read_text())["bssid"] != HOME_NEW[1].hex():
+            _fail("the cache still holds the old BSSID")
+
+        import wifi  # noqa: PLC0415
+
+        manager = _boot((HOME_NEW, ATTIC))
+        for _ in range(40):  # Settle into the monitoring cadence
+            manager.poll()
+            _Clock.now += LOOP_MS
+        dropped = _Clock.now
+        manager.wlan.drop()
+        while manager.is_connected:
+            manager.poll()
+            _Clock.now += LOOP_MS
+        noticed = _Clock.now - dropped
+        _loop_until_connected(manager)
+        back = _Clock.now - dropped
+        print(
+            f"  {'link drop':18s} {back:6d} ms   noticed after {noticed} ms, "
+            f"reconnect {manager.connect_ms} ms"
+        )
+        if manager.reconnects != 1 or noticed > wifi._MONITOR_INTERVAL_MS + LOOP_MS:
+            _fail(f"link drop: {manager.reconnects} reconnects, noticed {noticed}")
+
+    if not cached.connect_ms < first.connect_ms < miss.connect_ms:
+        _fail("expected cached < first boot < cache miss")
+    print(
+        f"✓ Cached BSSID {first.connect_ms / cached.connect_ms:.0f}x faster than a "
+        f"first boot; a stale cache costs the {wifi._FAST_TIMEOUT_MS} ms fast "
+        "timeout and one scan"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Per-sensor data quality: staleness, message rate, min/max and plausibility.
+
+Every sensor value DataManager stores is recorded here as well. A sensor
+gets a slot, an index into a few flat arrays, on its first message, so the
+metadata of hundreds of sensors costs a few bytes each and no objects:
+
+    last    ticks_ms of the last update
+    gap     EWMA of the interval between updates (ms), its usual period
+    lo/hi   min and max of the plausible values since boot
+    count   updates since boot
+    bad     1 if the last value was outside the plausibility range
+
+Nothing is scanned per tick. Staleness is computed when asked, at render
+time: a sensor is stale once it has been silent for _STALE_GAPS of its
+usual intervals, and at least cfg.sensor_stale_s. Plausibility ranges come
+from cfg.sensor_ranges, by storage key or unit, then from _RANGES by unit.
+
+No MicroPython-only imports, so the scripts can run it under CPython.
+"""
+
+from array import array
+
+from config import cfg
+
+try:
+    from time import ticks_add, ticks_diff, ticks_ms
+except ImportError:
+    import time
+
+    def ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def ticks_add(t, delta):
+        return t + delta
+
+    def ticks_diff(a, b):
+        return a - b
+
+
+OK = 0
+STALE = 1
+IMPLAUSIBLE = 2
+
+# Upper bound on tracked sensors, keeps memory bounded
+MAX_SENSORS = 512
+_INITIAL_SLOTS = 16
+# Stale after this many usual intervals without an update
+_STALE_GAPS = 3
+_GAP_ALPHA = 0.25
+# Default plausibility ranges by unit, as stored by DataManager
+_RANGES = {"°C": (-55, 125), "%": (0, 100)}
+
+
+class TooManySensorsError(ValueError):
+    """A new sensor key beyond MAX_SENSORS."""
+
+    def __init__(self, key):
+        super().__init__(f"too many sensors, ignoring {key}")
+
+
+class SensorQuality:
+    """Flat-array metadata slots, one per sensor storage key."""
+
+    def __init__(self):
+        self._index = {}  # storage key -> slot
+        self._last = array("i")
+        self._gap = array("i")
+        self._lo = array("f")
+        self._hi = array("f")
+        self._count = array("i")
+        self._bad = array("b")
+        self._grow(_INITIAL_SLOTS)
+
+    def _grow(self, slots):
+        for arr in (self._last, self._gap, self._count):
+            arr.extend(array("i", bytes(4 * slots)))
+        for arr in (self._lo, self._hi):
+            arr.extend(array("f", bytes(4 * slots)))
+        self._bad.extend(array("b", bytes(slots)))
+
+    def __len__(self):
+        return len(self._index)
+
+    def keys(self):
+        return self._index.keys()
+
+    def _slot(self, key):
+        slot = self._index.get(key)
+        if slot is None:
+            slot = len(self._index)
+            if slot >= MAX_SENSORS:
+                raise TooManySensorsError(key)
+            if slot >= len(self._last):
+                self._grow(min(len(self._last), MAX_SENSORS - slot))
+            self._index[key] = slot
+        return slot
+
+    @staticmethod
+    def _range(key, unit):
+        ranges = cfg.sensor_ranges
+        return ranges.get(key) or ranges.get(unit) or _RANGES.get(unit)
+
+    def record(self, key, value, unit, now=None):
+        """Note an update of key; returns False if value is implausible."""
+        if now is None:
+            now = ticks_ms()
+        slot = self._slot(key)
+        count = self._count[slot]
+        if count:
+            interval = ticks_diff(now, self._last[slot])
+            gap = self._gap[slot]
+            # The first interval seeds the EWMA
+            self._gap[slot] = (
+                interval if count == 1 else int(gap + _GAP_ALPHA * (interval - gap))
+            )
+        self._last[slot] = now
+        self._count[slot] = count + 1
+
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = None
+        limits = self._range(key, unit)
+        plausible = number is not None and (
+            limits is None or limits[0] <= number <= limits[1]
+        )
+        self._bad[slot] = not plausible
+        if plausible:
+            first = count == 0 or self._lo[slot] > self._hi[slot]
+            if first or number < self._lo[slot]:
+                self._lo[slot] = number
+            if first or number > self._hi[slot]:
+                self._hi[slot] = number
+        elif count == 0:
+            # No plausible value yet: an empty range, lo above hi
+            self._lo[slot], self._hi[slot] = 1.0, 0.0
+        return plausible
+
+    def _timeout(self, slot):
+        floor = cfg.sensor_stale_s * 1000
+        gap = self._gap[slot] if self._count[slot] > 1 else 0
+        return max(floor, _STALE_GAPS * gap)
+
+    def stale_at(self, key):
+        """ticks_ms at which key turns stale without another update."""
+        slot = self._index[key]
+        return ticks_add(self._last[slot], self._timeout(slot))
+
+    def state(self, key, now=None):
+        """OK, STALE or IMPLAUSIBLE; staleness wins, the value is old."""
+        slot = self._index.get(key)
+        if slot is None:
+            return OK
+        if now is None:
+            now = ticks_ms()
+        if ticks_diff(now, self._last[slot]) >= self._timeout(slot):
+            return STALE
+        return IMPLAUSIBLE if self._bad[slot] else OK
+
+    def info(self, key, now=None):
+        """Everything known about key, for diagnostics."""
+        slot = self._index[key]
+        if now is None:
+            now = ticks_ms()
+        gap = self._gap[slot] if self._count[slot] > 1 else 0
+        known = self._lo[slot] <= self._hi[slot]
+        return {
+            "state": ("ok", "stale", "implausible")[self.state(key, now)],
+            "age_s": ticks_diff(now, self._last[slot]) // 1000,
+            "per_min": round(60000 / gap, 2) if gap else None,
+            "min": self._lo[slot] if known else None,
+            "max": self._hi[slot] if known else None,
+            "count": self._count[slot],
+        }
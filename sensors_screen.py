@@ -3,28 +3,49 @@ Display sensor data (DHT11, DS18B20) in an LVGL table.
 
 Reads sensor values from DataManager and populates a scrollable table.
 Reserves 40px at the bottom for the navigation bar.
+
+Each render asks DataManager.quality for the state of every row: stale
+values are greyed out, implausible ones shown in the hot colour. Cells are
+only written when their text or state changed. The render also sets
+expires_at, the moment the next row turns stale, so the scheduler renders
+again then even if no sensor reports.
 """
 
+import time
+
 # noinspection PyUnresolvedReferences
 import lvgl as lv
 
+import sensor_quality
+import theme
+
 _NAV_HEIGHT = 40
 _CONTENT_HEIGHT = 320 - _NAV_HEIGHT
+# Cell control bits marking a row's value cell for the draw hook
+_CTRL = {
+    sensor_quality.STALE: lv.table.CELL_CTRL.CUSTOM_1,
+    sensor_quality.IMPLAUSIBLE: lv.table.CELL_CTRL.CUSTOM_2,
+}
+_COLOR = {sensor_quality.STALE: "muted", sensor_quality.IMPLAUSIBLE: "hot"}
 
 
 class SensorScreen:
     """Displays sensor data in a table using data from DataManager."""
 
+    REFRESH_MS = 500
+    DATA_KEY = "sensors"
+
     def __init__(self, mqtt, data_mgr):
         self.mqtt = mqtt
         self.data_mgr = data_mgr
+        self.expires_at = None  # ticks_ms when the next row turns stale
         self.screen = lv.obj()
-        self.screen.set_style_bg_color(lv.color_hex(0x121212), 0)
+        self.screen.add_style(theme.SCREEN, 0)
         self.screen.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
 
         title = lv.label(self.screen)
-        title.set_text("SENSORS")
-        title.set_style_text_color(lv.color_hex(0x00D9FF), 0)
+        title.set_text_static("SENSORS")
+        title.add_style(theme.TITLE, 0)
         title.align(lv.ALIGN.TOP_MID, 0, 8)
 
         self.table = lv.table(self.screen)
@@ -37,26 +58,74 @@ class SensorScreen:
         self.table.set_cell_value(0, 0, "Sensor")
         self.table.set_cell_value(0, 1, "Value")
 
-        self.table.set_style_bg_color(lv.color_hex(0x1E1E1E), 0)
-        self.table.set_style_text_color(lv.color_hex(0xFFFFFF), 0)
+        self.table.add_style(theme.CARD, 0)
+        self.table.add_flag(lv.obj.FLAG.SEND_DRAW_TASK_EVENTS)
+        self.table.add_event_cb(self._draw_cell, lv.EVENT.DRAW_TASK_ADDED, None)
 
         self.row_map = {}
         self.next_row = 1
+        self._shown = [None]  # per row: [value, state] last written
+
+    def render(self, _data_mgr):
+        self.update_ui()
 
     def update_ui(self):
-        """Iterate over stored sensor data and update the table."""
-        all_data = self.data_mgr.get_all_data()
-        sensors = all_data.get("sensors", {})
+        """Update changed values and quality states of the table rows."""
+        sensors = self.data_mgr.get_all_data().get("sensors", {})
+        quality = self.data_mgr.quality
+        now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        expires = None
+        restyled = False
 
         for storage_key, info in sensors.items():
-            if storage_key not in self.row_map:
+            row = self.row_map.get(storage_key)
+            if row is None:
                 row = self.next_row
                 self.row_map[storage_key] = row
                 self.table.set_cell_value(row, 0, info["label"])
+                self._shown.append([None, sensor_quality.OK])
                 self.next_row += 1
 
-            target_row = self.row_map[storage_key]
-            self.table.set_cell_value(target_row, 1, info["value"])
+            shown = self._shown[row]
+            value = info["value"]
+            if value != shown[0]:
+                self.table.set_cell_value(row, 1, value)
+                shown[0] = value
+
+            state = quality.state(storage_key, now)
+            if state != shown[1]:
+                self._set_state(row, shown[1], state)
+                shown[1] = state
+                restyled = True
+            if state != sensor_quality.STALE:
+                stale_at = quality.stale_at(storage_key)
+                if expires is None or time.ticks_diff(stale_at, expires) < 0:  # ty:ignore[unresolved-attribute]
+                    expires = stale_at
+
+        self.expires_at = expires
+        if restyled:
+            self.table.invalidate()
+
+    def _set_state(self, row, old, new):
+        for col in (0, 1):
+            if old in _CTRL:
+                self.table.clear_cell_ctrl(row, col, _CTRL[old])
+            if new in _CTRL:
+                self.table.set_cell_ctrl(row, col, _CTRL[new])
+
+    def _draw_cell(self, e):
+        """Recolour the text of stale and implausible rows as it is drawn."""
+        task = e.get_draw_task()
+        base = lv.draw_dsc_base_t.__cast__(task.get_draw_dsc())
+        if base.part != lv.PART.ITEMS or base.id1 == 0:
+            return
+        label = task.get_label_dsc()
+        if label is None:
+            return
+        for state, ctrl in _CTRL.items():
+            if self.table.has_cell_ctrl(base.id1, base.id2, ctrl):
+                label.color = theme.color(_COLOR[state])
+                return
 
     def get_screen(self):
         return self.screen
@@ -1,5 +1,10 @@
 """
 RGB NeoPixel status LED with visual indicators for Wi-Fi and MQTT states.
+
+Patterns are tables of (r, g, b, duration_ms) frames advanced by tick(), which
+is called from the main loop, so the LED never sleeps or blocks the caller.
+Two priority layers exist: status patterns run on the base layer and alerts
+play on the overlay, hiding the base pattern until they are stopped.
 """
 
 import time
@@ -7,6 +12,76 @@ import time
 from machine import Pin
 from neopixel import NeoPixel
 
+PRIORITY_STATUS = 0
+PRIORITY_ALERT = 1
+
+_OFF = (0, 0, 0)
+
+# Pattern tables: (r, g, b, duration_ms) frames
+WIFI_CONNECTING = ((0, 255, 0, 100), (0, 0, 0, 100))
+MQTT_CONNECTING = ((0, 255, 255, 100), (0, 0, 0, 100))
+ERROR = (
+    (255, 0, 0, 120),
+    (0, 0, 0, 120),
+    (255, 0, 0, 120),
+    (0, 0, 0, 640),
+)
+
+
+class PatternError(ValueError):
+    """A pattern table that is empty or has no duration."""
+
+    def __init__(self, pattern):
+        super().__init__(f"LED pattern needs a positive total duration: {pattern}")
+
+
+def breathe(color, period_ms=2000, steps=16):
+    """Build a triangle-wave fade table for color (up and back down)."""
+    r, g, b = color
+    frame_ms = max(1, period_ms // (2 * steps))
+    levels = list(range(steps)) + list(range(steps, 0, -1))
+    return tuple(
+        (r * i // steps, g * i // steps, b * i // steps, frame_ms) for i in levels
+    )
+
+
+def sequence(colors, duration_ms=300):
+    """Build a multi-colour table holding each colour for duration_ms."""
+    return tuple((c[0], c[1], c[2], duration_ms) for c in colors)
+
+
+class _Layer:
+    """Playback state of one pattern on one priority layer."""
+
+    def __init__(self, pattern, loops, now):
+        self.pattern = pattern
+        self.loops = loops  # 0 = repeat forever
+        self.index = 0
+        self.deadline = time.ticks_add(now, pattern[0][3])  # ty:ignore[unresolved-attribute]
+
+    def advance(self, now):
+        """Step through all frames that are due. Returns False when finished."""
+        pattern = self.pattern
+        while time.ticks_diff(now, self.deadline) >= 0:  # ty:ignore[unresolved-attribute]
+            self.index += 1
+            if self.index >= len(pattern):
+                if self.loops == 1:
+                    return False
+                if self.loops > 1:
+                    self.loops -= 1
+                self.index = 0
+            frame_ms = pattern[self.index][3]
+            self.deadline = time.ticks_add(self.deadline, frame_ms)  # ty:ignore[unresolved-attribute]
+            if time.ticks_diff(now, self.deadline) > 1000:  # ty:ignore[unresolved-attribute]
+                # Fell far behind (e.g. a blocking boot step): resync instead
+                # of replaying every missed frame.
+                self.deadline = time.ticks_add(now, frame_ms)  # ty:ignore[unresolved-attribute]
+        return True
+
+    def color(self):
+        frame = self.pattern[self.index]
+        return frame[0], frame[1], frame[2]
+
 
 class StatusLedRGB:
     """RGB NeoPixel status LED indicator."""
@@ -14,24 +89,75 @@ class StatusLedRGB:
     def __init__(self, pin_number=48, num_pixels=1):
         self.pin = Pin(pin_number, Pin.OUT)
         self.np = NeoPixel(self.pin, num_pixels)
+        self._layers = [None, None]
+        self._base_color = _OFF
+        self._shown = None
         self.off()
 
+    def _write(self, color):
+        if color != self._shown:
+            self.np[0] = color
+            self.np.write()
+            self._shown = color
+
     def set_state(self, r, g, b):
-        self.np[0] = (r, g, b)
-        self.np.write()
+        """Show a steady colour on the base layer, ending its pattern."""
+        self._layers[PRIORITY_STATUS] = None
+        self._base_color = (r, g, b)
+        self._refresh()
 
     def off(self):
         self.set_state(0, 0, 0)
 
+    def play(self, pattern, priority=PRIORITY_STATUS, loops=0, now=None):
+        """
+        Start a pattern table on a layer. loops=0 repeats until stopped.
+        A table without any duration would never let tick() return.
+        """
+        if not pattern or sum(frame[3] for frame in pattern) <= 0:
+            raise PatternError(pattern)
+        if now is None:
+            now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        self._layers[priority] = _Layer(pattern, loops, now)
+        self._refresh()
+
+    def stop(self, priority=PRIORITY_STATUS):
+        self._layers[priority] = None
+        self._refresh()
+
+    def is_playing(self, priority=PRIORITY_STATUS):
+        return self._layers[priority] is not None
+
+    def tick(self, now=None):
+        """Advance all layers to now (ms ticks) and update the pixel."""
+        if now is None:
+            now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        for priority, layer in enumerate(self._layers):
+            if layer is not None and not layer.advance(now):
+                self._layers[priority] = None
+        self._refresh()
+
+    def _refresh(self):
+        for priority in (PRIORITY_ALERT, PRIORITY_STATUS):
+            layer = self._layers[priority]
+            if layer is not None:
+                self._write(layer.color())
+                return
+        self._write(self._base_color)
+
     def blink(self, color=(0, 255, 0), duration=0.5, num_blinks=3):
-        for _ in range(num_blinks):
-            self.set_state(*color)
-            time.sleep(duration)
-            self.off()
-            time.sleep(duration)
+        ms = int(duration * 1000)
+        frames = ((color[0], color[1], color[2], ms), _OFF + (ms,))
+        self.play(frames, loops=num_blinks)
 
     def wifi_connecting(self):
-        self.blink(color=(0, 255, 0), duration=0.1, num_blinks=3)
+        self.play(WIFI_CONNECTING)
 
     def mqtt_connecting(self):
-        self.blink(color=(0, 255, 255), duration=0.1, num_blinks=3)
+        self.play(MQTT_CONNECTING)
+
+    def error(self):
+        self.play(ERROR, priority=PRIORITY_ALERT)
+
+    def clear_error(self):
+        self.stop(PRIORITY_ALERT)
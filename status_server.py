@@ -0,0 +1,275 @@
+"""
+Minimal HTTP status and metrics endpoint.
+
+Serves live device state as JSON and as Prometheus text:
+
+    GET /             every source below in one JSON object
+    GET /<source>     one source, e.g. /data, /sensors, /heap, /config
+    GET /metrics      Prometheus text exposition of the numeric values
+
+The server is polled from the main loop instead of running its own task:
+poll() does a bounded amount of work per call (accept one client, one recv
+per client, at most _SEND_CHUNK bytes per client), all on non-blocking
+sockets. A response is formatted once, completely, when the request line
+is in; after that poll() only slices the finished buffer, so a slow or
+stalled client never delays a frame.
+
+No MicroPython-only imports, so scripts/status_server_check.py can test it
+under CPython.
+"""
+
+import errno
+import json
+import socket
+
+try:
+    from time import ticks_diff, ticks_ms
+except ImportError:
+    import time
+
+    def ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+
+_MAX_CLIENTS = 2
+_MAX_REQUEST = 1024
+_SEND_CHUNK = 1460  # One TCP segment
+_CLIENT_TIMEOUT_MS = 5000
+_METRIC_PREFIX = "dashboard"
+_HOST_SECTIONS = ("host", "vps")
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+class _Client:
+    def __init__(self, sock, now):
+        self.sock = sock
+        self.started = now
+        self.request = b""
+        self.response = None  # memoryview over the formatted response
+        self.sent = 0
+
+
+class StatusServer:
+    """Non-blocking HTTP server for JSON status and Prometheus metrics."""
+
+    def __init__(self, sources, port=80, host="0.0.0.0"):
+        # name -> callable returning a JSON-serialisable dict
+        self.sources = sources
+        self.port = port
+        self.host = host
+        self.requests = 0
+        self._listener = None
+        self._clients = []
+
+    def start(self):
+        """Open the listening socket; poll() also does this lazily."""
+        addr = socket.getaddrinfo(self.host, self.port)[0][-1]
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(addr)
+        sock.listen(_MAX_CLIENTS)
+        sock.setblocking(False)
+        self._listener = sock
+        print(f"HTTP status server on port {self.port}")
+
+    @property
+    def address(self):
+        return self._listener.getsockname() if self._listener else None
+
+    def set_port(self, port):
+        """Move to another port (0 disables); reopened on the next poll()."""
+        self.close()
+        self.port = port
+
+    def close(self):
+        for client in self._clients:
+            client.sock.close()
+        self._clients = []
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+    # --- Polling ---
+
+    def poll(self):
+        """Advance all connections by one non-blocking step."""
+        if not self.port:
+            return
+        if self._listener is None:
+            self.start()
+        now = ticks_ms()
+        if len(self._clients) < _MAX_CLIENTS:
+            self._accept(now)
+        for client in self._clients:
+            try:
+                done = self._step(client)
+            except OSError as e:
+                done = e.args[0] != errno.EAGAIN
+            if done or ticks_diff(now, client.started) > _CLIENT_TIMEOUT_MS:
+                client.sock.close()
+                client.started = None
+        self._reap()
+
+    def _accept(self, now):
+        """Take at most one pending connection."""
+        try:
+            sock, _ = self._listener.accept()
+        except OSError as e:
+            if e.args[0] != errno.EAGAIN:
+                raise
+        else:
+            sock.setblocking(False)
+            self._clients.append(_Client(sock, now))
+
+    def _reap(self):
+        """Drop the clients poll() closed."""
+        if any(client.started is None for client in self._clients):
+            self._clients = [c for c in self._clients if c.started is not None]
+
+    def _step(self, client):
+        """Read or write a little; returns True when the client is finished."""
+        if client.response is None:
+            data = client.sock.recv(_MAX_REQUEST)
+            if not data:
+                return True
+            client.request += data
+            if b"\r\n\r\n" not in client.request:
+                return len(client.request) >= _MAX_REQUEST
+            try:
+                response = self._respond(client.request)
+            except Exception as e:  # noqa: BLE001
+                # A failing source answers this client, not the main loop
+                print(f"HTTP status: source failed: {e}")
+                response = _response(500, "text/plain", b"Source failed\n")
+            client.response = memoryview(response)
+            self.requests += 1
+        end = min(client.sent + _SEND_CHUNK, len(client.response))
+        client.sent += client.sock.send(client.response[client.sent : end])
+        return client.sent >= len(client.response)
+
+    # --- Responses ---
+
+    def _respond(self, request):
+        line = request.split(b"\r\n", 1)[0].split()
+        if len(line) < 2 or line[0] != b"GET":
+            return _response(405, "text/plain", b"GET only\n")
+        try:
+            path = line[1].split(b"?", 1)[0].decode().strip("/")
+        except UnicodeError:
+            return _response(400, "text/plain", b"Bad request line\n")
+        if path == "metrics":
+            body = self.metrics().encode()
+            return _response(200, "text/plain; version=0.0.4", body)
+        if not path or path == "status":
+            doc = {name: source() for name, source in self.sources.items()}
+        elif path in self.sources:
+            doc = self.sources[path]()
+        else:
+            return _response(404, "text/plain", b"Unknown path\n")
+        return _response(200, "application/json", json.dumps(doc).encode())
+
+    def metrics(self):
+        """Prometheus text exposition of every numeric value in the sources."""
+        lines = []
+        for name, source in self.sources.items():
+            doc = source()
+            if name == "data":
+                _data_metrics(doc, lines)
+            elif name == "sensors":
+                _sensor_metrics(doc, lines)
+            else:
+                _flat_metrics(f"{_METRIC_PREFIX}_{name}", doc, lines)
+        lines.append("")
+        return "\n".join(lines)
+
+
+def _response(status, content_type, body):
+    head = (
+        f"HTTP/1.0 {status} {_REASONS[status]}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+def _number(value):
+    """value as an int/float, or None for anything not numeric."""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _flat_metrics(prefix, doc, lines):
+    """name value lines; one level of nested dicts becomes a name label."""
+    for key, value in doc.items():
+        if isinstance(value, dict):
+            for sub, sub_value in value.items():
+                number = _number(sub_value)
+                if number is not None:
+                    lines.append(f'{prefix}_{key}{{name="{_label(sub)}"}} {number}')
+            continue
+        number = _number(value)
+        if number is not None:
+            lines.append(f"{prefix}_{key} {number}")
+
+
+def _data_metrics(store, lines):
+    """Per-host gauges with host labels; per-core lists get a core label."""
+    for section in _HOST_SECTIONS:
+        for host_id, slot in store.get(section, {}).items():
+            host = _label(host_id)
+            for field, value in slot.items():
+                name = f"{_METRIC_PREFIX}_{section}_{field.lower()}"
+                if isinstance(value, (list, tuple)):
+                    for core, item in enumerate(value):
+                        number = _number(item)
+                        if number is not None:
+                            lines.append(
+                                f'{name}{{host="{host}",core="{core}"}} {number}'
+                            )
+                    continue
+                number = _number(value)
+                if number is not None:
+                    lines.append(f'{name}{{host="{host}"}} {number}')
+    for key, info in store.get("sensors", {}).items():
+        # Values are display strings like "21.5 °C"
+        number = _number(str(info.get("value", "")).split(" ", 1)[0])
+        if number is not None:
+            lines.append(f'{_METRIC_PREFIX}_sensor{{sensor="{_label(key)}"}} {number}')
+
+
+def _sensor_metrics(quality, lines):
+    """Sensor quality gauges from SensorQuality.info() per storage key."""
+    for key, info in quality.items():
+        sensor = _label(key)
+        for field in ("age_s", "per_min", "min", "max", "count"):
+            number = _number(info.get(field))
+            if number is not None:
+                lines.append(
+                    f'{_METRIC_PREFIX}_sensor_{field}{{sensor="{sensor}"}} {number}'
+                )
+        for state in ("stale", "implausible"):
+            flag = int(info.get("state") == state)
+            lines.append(f'{_METRIC_PREFIX}_sensor_{state}{{sensor="{sensor}"}} {flag}')
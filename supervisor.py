@@ -0,0 +1,148 @@
+"""
+Fault supervisor for the main loop.
+
+Each subsystem (display touch, MQTT, weather fetcher, screens) is called
+through Supervisor.run(). A failure restarts only that subsystem and pauses
+it with exponential backoff; the device is reset only when restarts pile up
+faster than storm_limit per storm_window_ms. Fault counters survive soft
+resets in RTC memory.
+"""
+
+import json
+import time
+
+import machine
+
+_BASE_BACKOFF_MS = 1000
+_MAX_BACKOFF_MS = 60000
+_STORM_LIMIT = 8
+_STORM_WINDOW_MS = 60000
+
+
+class _Subsystem:
+    """Fault state of one supervised component."""
+
+    def __init__(self, restart, base_backoff_ms, max_backoff_ms):
+        self.restart = restart
+        self.base_backoff_ms = base_backoff_ms
+        self.max_backoff_ms = max_backoff_ms
+        self.failures = 0  # Consecutive, reset on success
+        self.resume_at = None
+
+    def backoff_ms(self):
+        backoff = self.base_backoff_ms << min(self.failures - 1, 16)
+        return min(self.max_backoff_ms, backoff)
+
+
+class Supervisor:
+    """Classifies loop errors per subsystem and restarts only what failed."""
+
+    def __init__(self, storm_limit=_STORM_LIMIT, storm_window_ms=_STORM_WINDOW_MS):
+        self.storm_limit = storm_limit
+        self.storm_window_ms = storm_window_ms
+        self._subsystems = {}
+        self._restarts = []  # ticks_ms of recent restarts, for storm detection
+        self._rtc = machine.RTC()
+        self.counters = self._load_counters()
+        self.counters["boots"] = self.counters.get("boots", 0) + 1
+        self._save_counters()
+        print(f"Supervisor counters: {self.counters}")
+
+    # --- RTC memory persistence ---
+
+    def _load_counters(self):
+        try:
+            raw = self._rtc.memory()
+            counters = json.loads(raw) if raw else {}
+        except (ValueError, OSError):
+            counters = {}
+        counters.setdefault("faults", {})
+        return counters
+
+    def _save_counters(self):
+        try:
+            self._rtc.memory(json.dumps(self.counters))
+        except (ValueError, OSError) as e:
+            print(f"Supervisor: RTC memory write failed: {e}")
+
+    # --- Supervision ---
+
+    def register(
+        self,
+        name,
+        restart=None,
+        base_backoff_ms=_BASE_BACKOFF_MS,
+        max_backoff_ms=_MAX_BACKOFF_MS,
+    ):
+        """Register a subsystem with an optional restart callable."""
+        self._subsystems[name] = _Subsystem(restart, base_backoff_ms, max_backoff_ms)
+
+    def is_paused(self, name):
+        sub = self._subsystems[name]
+        if sub.resume_at is None:
+            return False
+        if time.ticks_diff(time.ticks_ms(), sub.resume_at) >= 0:  # ty:ignore[unresolved-attribute]
+            sub.resume_at = None
+            return False
+        return True
+
+    def run(self, name, func, *args):
+        """Call func(*args) on behalf of name. Returns None if paused or failed."""
+        if self.is_paused(name):
+            return None
+        try:
+            result = func(*args)
+        except Exception as e:  # noqa: BLE001
+            self.report(name, e)
+            return None
+        self._subsystems[name].failures = 0
+        return result
+
+    def report(self, name, error):
+        """Record a fault, restart the subsystem and back it off."""
+        sub = self._subsystems.get(name)
+        if sub is None:
+            self.register(name)
+            sub = self._subsystems[name]
+        sub.failures += 1
+        backoff = sub.backoff_ms()
+        now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        sub.resume_at = time.ticks_add(now, backoff)  # ty:ignore[unresolved-attribute]
+        print(f"Supervisor: {name} failed ({error}), paused {backoff} ms")
+
+        faults = self.counters["faults"]
+        faults[name] = faults.get(name, 0) + 1
+        self._save_counters()
+
+        if sub.restart is not None:
+            try:
+                sub.restart()
+            except Exception as e:  # noqa: BLE001
+                print(f"Supervisor: restart of {name} failed: {e}")
+
+        self._check_storm(now)
+
+    def _check_storm(self, now):
+        window = self.storm_window_ms
+        diff = time.ticks_diff  # ty:ignore[unresolved-attribute]
+        recent = [t for t in self._restarts if diff(now, t) < window]
+        recent.append(now)
+        self._restarts = recent
+        if len(recent) > self.storm_limit:
+            print("Supervisor: restart storm detected, resetting device")
+            self.counters["resets"] = self.counters.get("resets", 0) + 1
+            self._save_counters()
+            time.sleep_ms(2000)  # ty:ignore[unresolved-attribute]
+            machine.reset()
+
+    def stats(self):
+        """Counters plus the current consecutive failures per subsystem."""
+        failing = {
+            name: sub.failures for name, sub in self._subsystems.items() if sub.failures
+        }
+        return {
+            "boots": self.counters.get("boots", 0),
+            "resets": self.counters.get("resets", 0),
+            "faults": self.counters["faults"],
+            "failing": failing,
+        }
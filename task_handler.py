@@ -12,6 +12,9 @@ class TaskHandler:
     def __init__(self, refresh_rate_ms=5):
         self.refresh_rate_ms = refresh_rate_ms
         self.timer = Timer(0)
+        self._start()
+
+    def _start(self):
         self.timer.init(
             mode=Timer.PERIODIC,
             period=self.refresh_rate_ms,
@@ -25,5 +28,16 @@ class TaskHandler:
         except (OSError, AttributeError):
             pass
 
+    def set_period(self, refresh_rate_ms):
+        """Change the tick period, e.g. slower while the panel is idle."""
+        if refresh_rate_ms != self.refresh_rate_ms:
+            self.refresh_rate_ms = refresh_rate_ms
+            self._start()
+
+    @staticmethod
+    def animating():
+        """True while an LVGL animation (e.g. a screen transition) runs."""
+        return lv.anim_count_running() > 0
+
     def deinit(self):
         self.timer.deinit()
@@ -0,0 +1,114 @@
+"""
+Preallocated text for labels that are updated at the message rate.
+
+A LabelText owns one bytearray per label. Numbers are written into it as
+digits (fixed-point for floats, so no float-to-str conversion) and
+constant parts are copied from bytes literals; nothing is allocated while
+building the text. commit() only creates a str and hands it to LVGL when
+the bytes differ from what the label already shows, and uses
+set_text_static() so LVGL keeps a pointer to that str instead of copying
+it into its own heap. The str is referenced here until it is replaced.
+
+    self.ram_text.begin().add(b"RAM: ").fixed(used, 1).add(b"GB").commit()
+
+Pass only ints and floats to num()/fixed(); on the ESP32 port a float
+argument to fixed() costs one boxed float temporary, an int none.
+
+No MicroPython-only imports, so scripts/textbuf_check.py can test it
+under CPython.
+"""
+
+_POW10 = (1, 10, 100, 1000, 10000)
+_MINUS = 0x2D
+_POINT = 0x2E
+_ZERO = 0x30
+
+
+class LabelText:
+    """Reusable text buffer bound to one label."""
+
+    def __init__(self, label, size=32):
+        self.label = label
+        self._buf = bytearray(size)
+        self._mv = memoryview(self._buf)
+        self._pos = 0
+        self._shown_len = -1  # Nothing committed yet
+        self._dirty = False
+        self._text = None  # Keeps the str LVGL points to alive
+
+    def begin(self):
+        """Start writing the text from the beginning."""
+        self._pos = 0
+        return self
+
+    def _put(self, pos, byte):
+        if pos < len(self._buf) and self._buf[pos] != byte:
+            self._buf[pos] = byte
+            self._dirty = True
+
+    def add(self, data):
+        """Append a bytes literal."""
+        pos = self._pos
+        for byte in data:
+            self._put(pos, byte)
+            pos += 1
+        self._pos = pos
+        return self
+
+    def num(self, value, width=0, fill=0x20):
+        """Append an integer, padded to width with the fill byte."""
+        value = int(value)
+        if value < 0:
+            self._put(self._pos, _MINUS)
+            self._pos += 1
+            value = -value
+            width -= 1
+        digits = 1
+        limit = 10
+        while value >= limit:
+            digits += 1
+            limit *= 10
+        while width > digits:
+            self._put(self._pos, fill)
+            self._pos += 1
+            width -= 1
+        end = self._pos + digits
+        pos = end
+        while pos > self._pos:
+            pos -= 1
+            self._put(pos, _ZERO + value % 10)
+            value //= 10
+        self._pos = end
+        return self
+
+    def fixed(self, value, decimals=1):
+        """Append value rounded to decimals places (at most 4)."""
+        scale = _POW10[decimals]
+        scaled = int(value * scale + (0.5 if value >= 0 else -0.5))
+        if scaled < 0:
+            self._put(self._pos, _MINUS)
+            self._pos += 1
+            scaled = -scaled
+        self.num(scaled // scale)
+        if decimals:
+            self._put(self._pos, _POINT)
+            self._pos += 1
+            self.num(scaled % scale, decimals, _ZERO)
+        return self
+
+    def commit(self):
+        """Show the text if it changed; returns True if the label was updated."""
+        length = min(self._pos, len(self._buf))
+        if length == self._shown_len and not self._dirty:
+            return False
+        self._shown_len = length
+        self._dirty = False
+        self._text = str(self._mv[:length], "utf-8")
+        self.label.set_text_static(self._text)
+        return True
+
+    def set(self, text):
+        """Show a str that was built elsewhere, bypassing the buffer."""
+        self._shown_len = -1
+        self._text = text
+        self.label.set_text_static(text)
@@ -0,0 +1,215 @@
+"""
+Shared LVGL styles and day/night palettes.
+
+Every style is an lv.style_t built once at import and attached to widgets
+with add_style(), instead of per-widget set_style_* calls that give each
+object its own local style data. Switching the theme rewrites the colours
+of these few shared styles and asks LVGL to refresh the objects using
+them; no widget is touched individually.
+
+The mode comes from the "theme" config key: "night", "day" or "auto"
+(day between _DAY_START and _NIGHT_START local time, fed by update()).
+"""
+
+import gc
+import time
+
+# noinspection PyUnresolvedReferences
+import lvgl as lv
+
+from config import cfg
+
+if not lv.is_initialized():
+    lv.init()
+
+_DAY_START = 7
+_NIGHT_START = 20
+
+PALETTES = {
+    "night": {
+        "bg": 0x0A0E27,
+        "card": 0x1A1F3A,
+        "primary": 0x00D9FF,
+        "accent": 0xFFB800,
+        "violet": 0x7B2FFF,
+        "text": 0xFFFFFF,
+        "text_secondary": 0xA0A0C0,
+        "muted": 0xAAAAAA,
+        "on_primary": 0x000000,
+        "good": 0x2ECC71,
+        "warm": 0xFFB800,
+        "hot": 0xFF4500,
+    },
+    "day": {
+        "bg": 0xE8ECF4,
+        "card": 0xFFFFFF,
+        "primary": 0x0077B6,
+        "accent": 0xC77C00,
+        "violet": 0x6A1FD0,
+        "text": 0x101426,
+        "text_secondary": 0x4A4E69,
+        "muted": 0x6C7080,
+        "on_primary": 0xFFFFFF,
+        "good": 0x1E9E57,
+        "warm": 0xC77C00,
+        "hot": 0xD93A00,
+    },
+}
+
+_bindings = []  # (style, is_text_color, palette key), applied by set_mode()
+
+
+def _style(bg=None, text=None):
+    style = lv.style_t()
+    style.init()
+    if bg is not None:
+        style.set_bg_opa(lv.OPA.COVER)
+        _bindings.append((style, False, bg))
+    if text is not None:
+        _bindings.append((style, True, text))
+    return style
+
+
+# Containers (text_color is inherited, so labels on a screen need no style)
+SCREEN = _style(bg="bg", text="text")
+CARD = _style(bg="card")
+CARD.set_radius(10)
+CARD.set_border_width(0)
+FLAT = _style()
+FLAT.set_radius(0)
+FLAT.set_border_width(0)
+FLAT.set_pad_all(2)
+
+# Text
+TITLE = _style(text="primary")
+SECONDARY = _style(text="text_secondary")
+MUTED = _style(text="muted")
+ACCENT = _style(text="accent")
+VIOLET = _style(text="violet")
+TEXT_WARM = _style(text="warm")
+TEXT_HOT = _style(text="hot")
+SMALL = _style()
+SMALL.set_text_font(lv.font_montserrat_12)
+CENTER = _style()
+CENTER.set_text_align(lv.TEXT_ALIGN.CENTER)
+
+# Bars: BAR on MAIN, one of the indicator styles on INDICATOR
+BAR = _style(bg="card")
+BAR_CPU = _style(bg="primary")
+BAR_RAM = _style(bg="accent")
+TEMP_GOOD = _style(bg="good")
+TEMP_WARM = _style(bg="warm")
+TEMP_HOT = _style(bg="hot")
+
+# Charts: CHART on MAIN, CHART_SERIES on ITEMS and INDICATOR (lines, no dots).
+# Series colours are not styles; take them from color().
+CHART = _style(bg="card")
+CHART.set_radius(4)
+CHART.set_border_width(0)
+CHART.set_pad_all(2)
+CHART_SERIES = _style()
+CHART_SERIES.set_line_width(2)
+CHART_SERIES.set_width(0)
+CHART_SERIES.set_height(0)
+
+# Navigation bar and overlays
+NAV = _style(bg="bg")
+NAV_BTN = _style(bg="card", text="muted")
+NAV_BTN.set_radius(6)
+NAV_BTN.set_border_width(0)
+NAV_BTN_ACTIVE = _style(bg="primary", text="on_primary")
+ALERT = _style(bg="hot")
+ALERT.set_text_color(lv.color_hex(0xFFFFFF))
+
+mode = None
+_hour = None
+
+
+def add(obj, *styles, selector=0):
+    """Attach shared styles to obj."""
+    for style in styles:
+        obj.add_style(style, selector)
+
+
+def swap(obj, old, new, selector=0):
+    """Replace style old by new on obj (either may be None); returns new."""
+    if old is not new:
+        if old is not None:
+            obj.remove_style(old, selector)
+        if new is not None:
+            obj.add_style(new, selector)
+    return new
+
+
+def color(key):
+    """Palette colour key of the current mode, for APIs that take no style."""
+    return lv.color_hex(PALETTES[mode or "night"][key])
+
+
+def set_mode(name):
+    """Recolour the shared styles with a palette and refresh all objects."""
+    global mode
+    palette = PALETTES[name]
+    for style, is_text, key in _bindings:
+        color = lv.color_hex(palette[key])
+        if is_text:
+            style.set_text_color(color)
+        else:
+            style.set_bg_color(color)
+    mode = name
+    lv.obj.report_style_change(None)
+    print(f"Theme: {name}")
+
+
+def update(hour=None):
+    """Apply cfg.theme; 'auto' follows the local hour of the last call."""
+    global _hour
+    if hour is not None:
+        _hour = hour
+    name = cfg.theme
+    if name == "auto":
+        is_day = _hour is not None and _DAY_START <= _hour < _NIGHT_START
+        name = "day" if is_day else "night"
+    if name != mode and name in PALETTES:
+        set_mode(name)
+
+
+def _apply_config(changed):
+    if "theme" in changed:
+        update()
+
+
+cfg.on_change(_apply_config)
+
+
+def lvgl_mem():
+    """LVGL heap monitor plus the GC heap, which LVGL allocates from here."""
+    mon = lv.mem_monitor_t()
+    lv.mem_monitor(mon)
+    return {
+        "lv_total": mon.total_size,
+        "lv_free": mon.free_size,
+        "lv_max_used": mon.max_used,
+        "lv_frag_pct": mon.frag_pct,
+        "gc_alloc": gc.mem_alloc(),
+    }
+
+
+def measure(factory):
+    """
+    Build a widget tree with factory() and print the construction time and
+    memory growth. Run from the REPL, e.g. theme.measure(HostMonitorScreen).
+    """
+    gc.collect()
+    before = lvgl_mem()
+    t0 = time.ticks_us()  # ty:ignore[unresolved-attribute]
+    obj = factory()
+    elapsed = time.ticks_diff(time.ticks_us(), t0)  # ty:ignore[unresolved-attribute]
+    gc.collect()
+    after = lvgl_mem()
+    grown = {key: after[key] - before[key] for key in ("lv_max_used", "gc_alloc")}
+    print(f"Built in {elapsed} us, memory growth {grown}")
+    return obj
+
+
+update()
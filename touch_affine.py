@@ -0,0 +1,100 @@
+"""
+Three-point affine touch calibration with a fixed-point runtime mapping.
+
+The raw XPT2046 readings map to screen pixels through
+
+    x = a * raw_x + b * raw_y + c
+    y = d * raw_x + e * raw_y + f
+
+which covers axis swap, mirroring, scale, offset and a slightly rotated
+panel. The six coefficients are solved from three touched targets and
+stored as integers scaled by 2**SHIFT, so a conversion is four multiplies
+and two shifts. All intermediate values stay within MicroPython's small-int
+range for 12-bit raw input.
+
+No hardware imports, so scripts/touch_affine_check.py can test this module
+under CPython.
+"""
+
+SHIFT = 16
+_HALF = 1 << (SHIFT - 1)
+
+# Screen points used by the calibration screen: spread out, not collinear
+TARGETS = ((24, 32), (216, 160), (120, 288))
+
+# Smallest usable |determinant| of the raw points (rejects collinear taps)
+_MIN_DET = 10000
+
+
+class CalibrationError(ValueError):
+    """The raw calibration points are too close together or collinear."""
+
+    def __init__(self, det):
+        super().__init__(f"calibration points too close or collinear ({det})")
+
+
+def solve(raw, screen):
+    """
+    Return (a, b, c, d, e, f) mapping the three raw (x, y) points onto the
+    three screen points. Raises CalibrationError (a ValueError) if the raw
+    points are collinear.
+    """
+    (x0, y0), (x1, y1), (x2, y2) = raw
+    det = x0 * (y1 - y2) + x1 * (y2 - y0) + x2 * (y0 - y1)
+    if abs(det) < _MIN_DET:
+        raise CalibrationError(det)
+
+    def row(s0, s1, s2):
+        return (
+            (s0 * (y1 - y2) + s1 * (y2 - y0) + s2 * (y0 - y1)) / det,
+            (x0 * (s1 - s2) + x1 * (s2 - s0) + x2 * (s0 - s1)) / det,
+            (
+                x0 * (y1 * s2 - y2 * s1)
+                + x1 * (y2 * s0 - y0 * s2)
+                + x2 * (y0 * s1 - y1 * s0)
+            )
+            / det,
+        )
+
+    (sx0, sy0), (sx1, sy1), (sx2, sy2) = screen
+    return row(sx0, sx1, sx2) + row(sy0, sy1, sy2)
+
+
+def from_minmax(x_min, x_max, y_min, y_max, width=240, height=320):
+    """
+    Coefficients equivalent to the legacy min/max calibration, where the
+    panel's raw Y axis runs right to left along screen X and raw X runs
+    along screen Y.
+    """
+    sx = width / (y_max - y_min)
+    sy = height / (x_max - x_min)
+    return (0.0, -sx, y_max * sx, sy, 0.0, -x_min * sy)
+
+
+def to_fixed(coeffs):
+    """Scale coefficients to integers; offsets include rounding."""
+    one = 1 << SHIFT
+    a, b, c, d, e, f = coeffs
+    return (
+        round(a * one),
+        round(b * one),
+        round(c * one) + _HALF,
+        round(d * one),
+        round(e * one),
+        round(f * one) + _HALF,
+    )
+
+
+def apply(fixed, raw_x, raw_y):
+    """Map a raw reading to screen pixels with fixed-point coefficients."""
+    a, b, c, d, e, f = fixed
+    return (a * raw_x + b * raw_y + c) >> SHIFT, (d * raw_x + e * raw_y + f) >> SHIFT
+
+
+def is_valid(values):
+    """True if values look like stored fixed-point coefficients."""
+    return (
+        isinstance(values, (list, tuple))
+        and len(values) == 6
+        and all(isinstance(v, int) for v in values)
+    )
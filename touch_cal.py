@@ -1,14 +1,19 @@
 """
 Touch calibration utility for the XPT2046 resistive touch controller.
 
-Tap the four screen corners and record the raw X/Y values.
-Use the output to update calibration constants in display.py.
+Tap the four screen corners and record the raw X/Y values. Prints the
+min/max values and an affine calibration to publish on config/{id}/set.
+The dashboard has an on-screen calibration as well (hold a touch for 5 s,
+or send {"calibrate": true} to display/{id}/set), which is more accurate.
 """
 
+import json
 import time
 
 import machine
 
+import touch_affine
+
 t_sck = machine.Pin(12, machine.Pin.OUT)
 t_mosi = machine.Pin(11, machine.Pin.OUT)
 t_miso = machine.Pin(10, machine.Pin.IN)
@@ -81,9 +86,24 @@ x_max = max(tr_x, br_x)
 y_min = min(tl_y, tr_y)
 y_max = max(bl_y, br_y)
 
-print("\nCalibration values for display.py:")
-print(f"  X_MIN={x_min}, X_MAX={x_max}")
-print(f"  Y_MIN={y_min}, Y_MAX={y_max}")
-print("\nMapping formula:")
-print(f"  x = (raw_x - {x_min}) * 240 // ({x_max} - {x_min})")
-print(f"  y = (raw_y - {y_min}) * 320 // ({y_max} - {y_min})")
+print("\nMin/max calibration (config keys):")
+print(
+    json.dumps(
+        {
+            "touch_x_min": x_min,
+            "touch_x_max": x_max,
+            "touch_y_min": y_min,
+            "touch_y_max": y_max,
+        }
+    )
+)
+
+try:
+    coeffs = touch_affine.solve(
+        ((tl_x, tl_y), (tr_x, tr_y), (bl_x, bl_y)), ((0, 0), (239, 0), (0, 319))
+    )
+except ValueError as e:
+    print(f"\nNo affine calibration: {e}")
+else:
+    print("\nAffine calibration (publish to config/{client_id}/set):")
+    print(json.dumps({"touch_affine": list(touch_affine.to_fixed(coeffs))}))
@@ -0,0 +1,113 @@
+"""
+Time zone offsets from a precomputed transition table.
+
+The RTC is kept in UTC. Each Timezone builds a table of UTC transition
+instants once (time.mktime is only used there) and caches the interval that
+contains the current time, so a lookup is normally two integer comparisons.
+"""
+
+import time
+
+# Rule: (month, week, weekday, hour, utc)
+#   week:    1..4 = n-th weekday of the month, -1 = last one
+#   weekday: 0 = Monday .. 6 = Sunday
+#   utc:     True if hour is UTC, False if it is local wall-clock time
+# Zone: (standard offset, DST offset, DST start rule, DST end rule)
+ZONES = {
+    "UTC": (0, 0, None, None),
+    "CET": (3600, 7200, (3, -1, 6, 1, True), (10, -1, 6, 1, True)),
+    "WET": (0, 3600, (3, -1, 6, 1, True), (10, -1, 6, 1, True)),
+    "EET": (7200, 10800, (3, -1, 6, 1, True), (10, -1, 6, 1, True)),
+    "US_EASTERN": (-18000, -14400, (3, 2, 6, 2, False), (11, 1, 6, 2, False)),
+    "US_CENTRAL": (-21600, -18000, (3, 2, 6, 2, False), (11, 1, 6, 2, False)),
+    "US_PACIFIC": (-28800, -25200, (3, 2, 6, 2, False), (11, 1, 6, 2, False)),
+}
+
+_TABLE_YEARS = 5
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _days_in_month(year, month):
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+
+def _transition_utc(year, rule, offset_before):
+    """Return the UTC instant (device epoch seconds) of a rule in year."""
+    month, week, weekday, hour, utc = rule
+    first = time.mktime((year, month, 1, 0, 0, 0, 0, 0, 0))
+    first_wd = time.localtime(first)[6]
+    if week > 0:
+        day = 1 + (weekday - first_wd) % 7 + 7 * (week - 1)
+    else:
+        last = _days_in_month(year, month)
+        last_wd = (first_wd + last - 1) % 7
+        day = last - (last_wd - weekday) % 7
+    instant = first + (day - 1) * 86400 + hour * 3600
+    return instant if utc else instant - offset_before
+
+
+class UnknownZoneError(ValueError):
+    """A zone name that is not in ZONES."""
+
+    def __init__(self, name):
+        super().__init__(f"Unknown time zone: {name}")
+
+
+class Timezone:
+    """Local time for one zone from ZONES."""
+
+    def __init__(self, name="CET"):
+        if name not in ZONES:
+            raise UnknownZoneError(name)
+        self.name = name
+        self.std, self.dst, self._start_rule, self._end_rule = ZONES[name]
+        self._table = []
+        self._valid_from = 0
+        self._valid_until = -1
+        self._offset = self.std
+
+    def _build(self, year):
+        """Precompute sorted (utc_instant, new_offset) pairs around year."""
+        table = []
+        for y in range(year - 1, year + _TABLE_YEARS):
+            table.append((_transition_utc(y, self._start_rule, self.std), self.dst))
+            table.append((_transition_utc(y, self._end_rule, self.dst), self.std))
+        table.sort()
+        self._table = table
+
+    def _lookup(self, utc):
+        """Find and cache the interval between two transitions containing utc."""
+        if self._start_rule is None:
+            self._valid_from, self._valid_until = utc, utc + 86400
+            return
+        table = self._table
+        if not table or utc < table[0][0] or utc >= table[-1][0]:
+            self._build(time.gmtime(utc)[0])
+            table = self._table
+        start = table[0][0]
+        offset = self.std
+        for instant, new_offset in table:
+            if instant > utc:
+                break
+            start, offset = instant, new_offset
+        self._valid_from, self._valid_until = start, instant
+        self._offset = offset
+
+    def offset(self, utc=None):
+        """Return the UTC offset in seconds at utc (default: now)."""
+        if utc is None:
+            utc = time.time()
+        if not (self._valid_from <= utc < self._valid_until):
+            self._lookup(utc)
+        return self._offset
+
+    def is_dst(self, utc=None):
+        return self._start_rule is not None and self.offset(utc) == self.dst
+
+    def localtime(self, utc=None):
+        """time.localtime()-style tuple in this zone."""
+        if utc is None:
+            utc = time.time()
+        return time.gmtime(utc + self.offset(utc))
@@ -3,76 +3,130 @@ Display VPS metrics on an LVGL screen.
 
 Shows CPU, RAM, disk usage, and system uptime from a remote VPS.
 Reserves 40px at the bottom for the navigation bar.
+
+Like the host screen, one widget tree is shared by all discovered VPS
+entries; tapping the title switches to the next one.
 """
 
 # noinspection PyUnresolvedReferences
 import lvgl as lv
 
+import theme
+from textbuf import LabelText
+
 _NAV_HEIGHT = 40
 _CONTENT_HEIGHT = 320 - _NAV_HEIGHT
+_TITLE_TOUCH_HEIGHT = 40
 
 
 class VPSMonitorScreen:
     """VPS Monitor screen displaying CPU, RAM, and disk usage."""
 
+    REFRESH_MS = 5000
+    DATA_KEY = "vps"  # Replaced by ("vps", host_id) once a VPS is selected
+
     def __init__(self):
         self.screen = lv.obj()
-        self.screen.set_style_bg_color(lv.color_hex(0x0A0E27), 0)
+        self.screen.add_style(theme.SCREEN, 0)
         self.screen.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
 
-        label = lv.label(self.screen)
-        label.set_text("VPS STATUS")
-        label.set_style_text_color(lv.color_hex(0x00D9FF), 0)
-        label.align(lv.ALIGN.TOP_MID, 0, 8)
+        self.host_id = None
+        self._hosts = []  # Sorted VPS ids as of the last render
+        self._title = None  # (name, index, count) shown in the title
+
+        self.title_label = lv.label(self.screen)
+        self.title_label.set_text_static("VPS STATUS")
+        self.title_label.add_style(theme.TITLE, 0)
+        self.title_label.align(lv.ALIGN.TOP_MID, 0, 8)
 
         self.cpu_bar = self._create_metric("CPU Usage", 45)
         self.ram_bar = self._create_metric("RAM Usage", 105)
         self.disk_bar = self._create_metric("Disk Usage", 165)
 
         uptime_title = lv.label(self.screen)
-        uptime_title.set_text("System Uptime:")
-        uptime_title.set_style_text_color(lv.color_hex(0xA0A0C0), 0)
+        uptime_title.set_text_static("System Uptime:")
+        uptime_title.add_style(theme.SECONDARY, 0)
         uptime_title.align(lv.ALIGN.TOP_LEFT, 15, 225)
 
         self.uptime_label = lv.label(self.screen)
         self.uptime_label.set_text("Awaiting data...")
-        self.uptime_label.set_style_text_color(lv.color_hex(0xFFFFFF), 0)
         self.uptime_label.align(lv.ALIGN.TOP_LEFT, 15, 248)
         self.uptime_label.set_width(210)
+        self.uptime_text = LabelText(self.uptime_label, 24)
 
-    @staticmethod
-    def _format_uptime(seconds):
+    def _show_uptime(self, seconds):
         try:
             total_seconds = int(seconds)
         except (ValueError, TypeError):
-            return str(seconds)
-        else:
-            days = total_seconds // 86400
-            hours = (total_seconds % 86400) // 3600
-            minutes = (total_seconds % 3600) // 60
-            if days > 0:
-                return f"{days:d}d {hours:d}h {minutes:d}m"
-            return f"{hours:d}h {minutes:d}m"
+            self.uptime_text.set(str(seconds))
+            return
+        days = total_seconds // 86400
+        hours = (total_seconds % 86400) // 3600
+        minutes = (total_seconds % 3600) // 60
+        text = self.uptime_text.begin()
+        if days > 0:
+            text.num(days).add(b"d ")
+        text.num(hours).add(b"h ").num(minutes).add(b"m").commit()
 
     def _create_metric(self, name: str, y_pos: int) -> lv.obj:
         lbl = lv.label(self.screen)
-        lbl.set_text(name)
-        lbl.set_style_text_color(lv.color_hex(0xAAAAAA), 0)
+        lbl.set_text_static(name)
+        lbl.add_style(theme.MUTED, 0)
         lbl.align(lv.ALIGN.TOP_LEFT, 15, y_pos)
 
         bar = lv.bar(self.screen)
         bar.set_size(210, 15)
         bar.align(lv.ALIGN.TOP_LEFT, 15, y_pos + 22)
-        bar.set_style_bg_color(lv.color_hex(0x1A1F3A), 0)
+        bar.add_style(theme.BAR, lv.PART.MAIN)
+        bar.add_style(theme.BAR_CPU, lv.PART.INDICATOR)
         bar.set_range(0, 100)
         return bar
 
+    def select(self, host_id):
+        """Show host_id in the shared widget tree from the next render on."""
+        self.host_id = host_id
+        self.DATA_KEY = ("vps", host_id)
+
+    def on_touch(self, _x, y):
+        """Tapping the title cycles through the discovered VPS entries."""
+        if y < _TITLE_TOUCH_HEIGHT and len(self._hosts) > 1:
+            idx = self._hosts.index(self.host_id)
+            self.select(self._hosts[(idx + 1) % len(self._hosts)])
+
+    def render(self, data_mgr):
+        hosts = data_mgr.data_store.get("vps", {})
+        if not hosts:
+            return
+        if len(hosts) != len(self._hosts) or any(h not in hosts for h in self._hosts):
+            self._hosts = sorted(hosts)
+        if self.host_id not in hosts:
+            self.select(self._hosts[0])
+        v_data = hosts[self.host_id]
+
+        name = v_data.get("NAME", self.host_id)
+        idx = self._hosts.index(self.host_id) + 1
+        count = len(self._hosts)
+        shown = self._title
+        if shown is None or shown[0] != name or shown[1] != idx or shown[2] != count:
+            # Rebuilt only when it changes, not on every sample
+            self._title = (name, idx, count)
+            title = str(name).upper()
+            self.title_label.set_text(f"{title}  {idx}/{count}" if count > 1 else title)
+
+        if v_data:
+            self.update_values(
+                v_data.get("CPU", 0),
+                v_data.get("RAM", 0),
+                v_data.get("DISK", 0),
+                v_data.get("UPTIME", 0),
+            )
+
     def update_values(self, cpu, ram, disk, uptime_raw="--"):
         try:
             self.cpu_bar.set_value(int(cpu), 0)
             self.ram_bar.set_value(int(ram), 0)
             self.disk_bar.set_value(int(disk), 0)
-            self.uptime_label.set_text(self._format_uptime(uptime_raw))
+            self._show_uptime(uptime_raw)
         except (ValueError, TypeError, OSError) as e:
             print("Error updating VPS values:", e)
 
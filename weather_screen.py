@@ -1,9 +1,13 @@
 # weather_screen.py
 """
 OpenWeatherMap weather display with PNG icon rendering.
+
+Tapping the screen toggles between current conditions and a forecast view
+(next 24 h in 3-hour steps, 5 days). Both responses are stream-parsed with
+json_stream; the forecast is cached on flash (see forecast.py).
 """
 
-import gc
+import os
 import time
 from secrets import OPENWEATHERMAP_API_KEY, OPENWEATHERMAP_CITY, OPENWEATHERMAP_COUNTRY
 
@@ -11,24 +15,68 @@ from secrets import OPENWEATHERMAP_API_KEY, OPENWEATHERMAP_CITY, OPENWEATHERMAP_
 import lvgl as lv
 import urequests
 
-COLOR_BG = 0x0A0E27
-COLOR_CARD_BG = 0x1A1F3A
-COLOR_PRIMARY = 0x00D9FF
-COLOR_TEXT_SECONDARY = 0xA0A0C0
-COLOR_ACCENT = 0xFFB800
+import forecast
+import ntp
+import theme
+from config import cfg
+from json_stream import SelectiveParser
+from memory import mem
+from textbuf import LabelText
+
+# Uncompressed 48x48 RGBA PNGs from scripts/OpenWeatherMap_Icon_Downloader.py
+_ICON_BUF_SIZE = 16 * 1024
+_HTTP_BUF_SIZE = 512
+
+_API = (
+    "https://api.openweathermap.org/data/2.5/{}"
+    "?q={},{}&appid={}&units=metric&lang=de"
+)
+_CURRENT_PATHS = (
+    ("main", "temp"),
+    ("main", "humidity"),
+    ("main", "pressure"),
+    ("wind", "speed"),
+    ("weather", 0, "description"),
+    ("weather", 0, "icon"),
+)
+_WEEKDAYS = ("Mo", "Di", "Mi", "Do", "Fr", "Sa", "So")
+
+
+class HTTPError(OSError):
+    """A non-200 response from OpenWeatherMap."""
+
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
 
 
 class WeatherScreen:
     """LVGL screen showing current weather, time, and date."""
 
+    # Polls the clock well above 1 Hz: update_time() only writes the labels
+    # when the second changed, so each second is shown within 100 ms of its
+    # start. A 1000 ms period drifts against the second boundaries as loop
+    # passes run late, and skips seconds. Weather labels are set directly
+    # when a fetch completes.
+    REFRESH_MS = 100
+    DATA_KEY = None
+
     def __init__(self, mqtt):
         self.mqtt = mqtt
         self.screen = lv.obj()
-        self.screen.set_style_bg_color(lv.color_hex(COLOR_BG), 0)
+        self.screen.add_style(theme.SCREEN, 0)
         self.screen.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
         self.current_icon = ""
         self._icon_data = None
+        self._shown_second = None
+        self._shown_day = None
+        self._current_parser = SelectiveParser(
+            _CURRENT_PATHS, mem.buffer("http", _HTTP_BUF_SIZE)
+        )
+        self.forecast = forecast.load_cache()
+        self._forecast_dirty = self.forecast is not None
+        self._show_forecast = False
         self._setup_ui()
+        self._setup_forecast_ui()
         self.update_weather()
         self.update_time()
 
@@ -37,12 +85,14 @@ class WeatherScreen:
         self.header = self._create_card(5, 5, 230, 55)
 
         self.date_label = lv.label(self.header)
-        self.date_label.set_style_text_color(lv.color_hex(COLOR_TEXT_SECONDARY), 0)
+        self.date_label.add_style(theme.SECONDARY, 0)
         self.date_label.align(lv.ALIGN.CENTER, 0, -12)
+        self.date_text = LabelText(self.date_label, 10)
 
         self.time_label = lv.label(self.header)
-        self.time_label.set_style_text_color(lv.color_hex(COLOR_PRIMARY), 0)
+        self.time_label.add_style(theme.TITLE, 0)
         self.time_label.align(lv.ALIGN.CENTER, 0, 12)
+        self.time_text = LabelText(self.time_label, 8)
 
         # Status Card: Icon + Description
         self.status_card = self._create_card(5, 65, 230, 70)
@@ -57,14 +107,35 @@ class WeatherScreen:
         self.weather_icon.align(lv.ALIGN.RIGHT_MID, -10, 0)
 
         self.desc_label = lv.label(self.status_card)
-        self.desc_label.set_style_text_color(lv.color_hex(0xFFFFFF), 0)
         self.desc_label.align(lv.ALIGN.LEFT_MID, 10, 0)
         self.desc_label.set_width(155)
 
-        self.temp_val = self._create_tile(5, 140, "Temperature", COLOR_ACCENT)
-        self.hum_val = self._create_tile(125, 140, "Humidity", COLOR_PRIMARY)
-        self.wind_val = self._create_tile(5, 215, "Wind", COLOR_ACCENT)
-        self.pres_val = self._create_tile(125, 215, "Pressure", 0x7B2FFF)
+        self.temp_val = self._create_tile(5, 140, "Temperature", theme.ACCENT)
+        self.hum_val = self._create_tile(125, 140, "Humidity", theme.TITLE)
+        self.wind_val = self._create_tile(5, 215, "Wind", theme.ACCENT)
+        self.pres_val = self._create_tile(125, 215, "Pressure", theme.VIOLET)
+
+    def _setup_forecast_ui(self):
+        # Covers the status card and tiles while the forecast is shown
+        self.forecast_panel = self._create_card(5, 65, 230, 215)
+        self.forecast_panel.set_style_pad_all(4, 0)
+        self.forecast_panel.add_flag(lv.obj.FLAG.HIDDEN)
+
+        self.hourly_labels = []
+        for i in range(forecast.HOURLY_COUNT):
+            lbl = lv.label(self.forecast_panel)
+            lbl.set_width(27)
+            lbl.set_pos(i * 27, 0)
+            theme.add(lbl, theme.SMALL, theme.CENTER, theme.SECONDARY)
+            lbl.set_text("--")
+            self.hourly_labels.append(lbl)
+
+        self.daily_labels = []
+        for i in range(forecast.DAILY_COUNT):
+            lbl = lv.label(self.forecast_panel)
+            lbl.set_pos(4, 60 + i * 28)
+            lbl.set_text("" if i else "Lade Vorhersage...")
+            self.daily_labels.append(lbl)
 
     @staticmethod
     def _replace_umlauts(text):
@@ -80,23 +151,20 @@ class WeatherScreen:
         card = lv.obj(self.screen)
         card.set_size(w, h)
         card.set_pos(x, y)
-        card.set_style_bg_color(lv.color_hex(COLOR_CARD_BG), 0)
-        card.set_style_radius(10, 0)
-        card.set_style_border_width(0, 0)
+        card.add_style(theme.CARD, 0)
         card.set_scrollbar_mode(lv.SCROLLBAR_MODE.OFF)
         return card
 
     # Define the return type explicitly to stop Pyright from guessing 'int'
-    def _create_tile(self, x: int, y: int, title: str, color: int) -> lv.o:  # noqa: F821
+    def _create_tile(self, x: int, y: int, title: str, style) -> lv.o:  # noqa: F821
         card = self._create_card(x, y, 110, 70)
         t_lbl = lv.label(card)
         t_lbl.set_text(self._replace_umlauts(title))
-        t_lbl.set_style_text_color(lv.color_hex(color), 0)
+        t_lbl.add_style(style, 0)
         t_lbl.align(lv.ALIGN.TOP_MID, 0, 5)
 
         v_lbl = lv.label(card)
         v_lbl.set_text("--")
-        v_lbl.set_style_text_color(lv.color_hex(0xFFFFFF), 0)
         v_lbl.align(lv.ALIGN.TOP_MID, 0, 32)
         return v_lbl
 
@@ -104,46 +172,136 @@ class WeatherScreen:
         if icon_code == self.current_icon:
             return
         path = "/icons_png/{}.png".format(icon_code)
+        try:
+            size = os.stat(path)[6]
+        except OSError as e:
+            print("Icon Load Error:", e)
+            return
+        if size > _ICON_BUF_SIZE:
+            # Checked before the read: the shown icon lives in the same buffer
+            print("Icon Load Error: {} is {} bytes".format(path, size))
+            return
+        # Reuse one long-lived buffer instead of a fresh bytes per icon
+        buf = mem.buffer("icon", _ICON_BUF_SIZE)
         try:
             with open(path, "rb") as f:
-                self._icon_data = f.read()
-            # LVGL v9 image descriptor structure
-            img_dsc = lv.image_dsc_t(
-                {"data_size": len(self._icon_data), "data": self._icon_data}
-            )
-            self.weather_icon.set_src(img_dsc)
-            self.current_icon = icon_code
-            print("Icon OK:", icon_code)
-        except Exception as e:  # noqa: BLE001
+                read = f.readinto(buf)
+        except OSError as e:
             print("Icon Load Error:", e)
+            read = None
+        if read != size:
+            # The buffer no longer holds the old icon; don't let LVGL draw it
+            self.weather_icon.set_src(None)
+            self.current_icon = ""
+            print("Icon Load Error: read {} of {} bytes".format(read, size))
+            return
+        self._icon_data = buf
+        # LVGL v9 image descriptor structure
+        img_dsc = lv.image_dsc_t({"data_size": size, "data": self._icon_data})
+        self.weather_icon.set_src(img_dsc)
+        self.current_icon = icon_code
+        print("Icon OK:", icon_code)
+
+    def render(self, _data_mgr):
+        self.update_time()
+        if self._show_forecast and self._forecast_dirty:
+            self._render_forecast()
+
+    def on_touch(self, _x, _y):
+        """Tapping the screen toggles between current weather and forecast."""
+        self._show_forecast = not self._show_forecast
+        if self._show_forecast:
+            self.forecast_panel.remove_flag(lv.obj.FLAG.HIDDEN)
+            if self._forecast_dirty:
+                self._render_forecast()
+        else:
+            self.forecast_panel.add_flag(lv.obj.FLAG.HIDDEN)
+
+    def _render_forecast(self):
+        self._forecast_dirty = False
+        for lbl, (hour, temp, pop, _cond) in zip(
+            self.hourly_labels, self.forecast["hourly"]
+        ):
+            lbl.set_text("{}h\n{:.0f}\xb0\n{}%".format(hour, temp, pop))
+        daily = self.forecast["daily"]
+        for i, lbl in enumerate(self.daily_labels):
+            if i < len(daily):
+                weekday, t_min, t_max, pop, cond = daily[i]
+                lbl.set_text(
+                    "{}  {:.0f}\xb0 / {:.0f}\xb0  {}  {}%".format(
+                        _WEEKDAYS[weekday], t_min, t_max, cond, pop
+                    )
+                )
+            else:
+                lbl.set_text("")
 
     def update_time(self):
-        t = time.localtime()
-        self.date_label.set_text("{:02d}.{:02d}.{:04d}".format(t[2], t[1], t[0]))
-        self.time_label.set_text("{:02d}:{:02d}:{:02d}".format(t[3], t[4], t[5]))
+        """Refresh the clock labels, but only when the displayed value changes."""
+        now = time.time()
+        if now == self._shown_second:
+            return
+        self._shown_second = now
+        t = ntp.localtime(now)
+        if t[2] != self._shown_day:
+            self._shown_day = t[2]
+            date = self.date_text.begin().num(t[2], 2, 0x30).add(b".")
+            date.num(t[1], 2, 0x30).add(b".").num(t[0], 4, 0x30).commit()
+        clock = self.time_text.begin().num(t[3], 2, 0x30).add(b":")
+        clock.num(t[4], 2, 0x30).add(b":").num(t[5], 2, 0x30).commit()
 
-    def update_weather(self):
-        url = (
-            "https://api.openweathermap.org/data/2.5/weather"
-            "?q={},{}&appid={}&units=metric&lang=de".format(
-                OPENWEATHERMAP_CITY, OPENWEATHERMAP_COUNTRY, OPENWEATHERMAP_API_KEY
-            )
+    @staticmethod
+    def _get(endpoint, parse):
+        """GET an OWM endpoint and hand the response stream to parse()."""
+        url = _API.format(
+            endpoint,
+            OPENWEATHERMAP_CITY,
+            OPENWEATHERMAP_COUNTRY,
+            OPENWEATHERMAP_API_KEY,
         )
+        res = urequests.get(url)
         try:
-            res = urequests.get(url)
-            data = res.json()
+            if res.status_code != 200:
+                raise HTTPError(res.status_code)
+            return parse(res.raw)
+        finally:
             res.close()
-            self.temp_val.set_text("{:.1f} C".format(data["main"]["temp"]))
-            self.hum_val.set_text("{} %".format(data["main"]["humidity"]))
-            self.wind_val.set_text("{:.1f} km/h".format(data["wind"]["speed"] * 3.6))
-            self.pres_val.set_text("{} hPa".format(data["main"]["pressure"]))
-            self.desc_label.set_text(
-                self._replace_umlauts(data["weather"][0]["description"])
-            )
-            self._load_icon(data["weather"][0]["icon"])
+
+    def update_weather(self):
+        data = {}
+
+        def on_value(path, value):
+            data[path[-1]] = value
+
+        try:
+            self._get("weather", lambda raw: self._current_parser.parse(raw, on_value))
+            self.temp_val.set_text("{:.1f} C".format(data["temp"]))
+            self.hum_val.set_text("{} %".format(data["humidity"]))
+            self.wind_val.set_text("{:.1f} km/h".format(data["speed"] * 3.6))
+            self.pres_val.set_text("{} hPa".format(data["pressure"]))
+            self.desc_label.set_text(self._replace_umlauts(data["description"]))
+            self._load_icon(data["icon"])
         except (OSError, KeyError, ValueError) as e:
             print("Weather Update Failed:", e)
-        gc.collect()
+        mem.maybe_collect()
+
+    def update_forecast(self):
+        """Fetch the forecast unless the cached one is younger than the TTL."""
+        now = time.time()
+        if forecast.is_fresh(self.forecast, now, cfg.forecast_ttl_s):
+            return
+        buf = mem.buffer("http", _HTTP_BUF_SIZE)
+        try:
+            data = self._get(
+                "forecast", lambda raw: forecast.parse(raw, buf, ntp.localtime)
+            )
+            data["fetched"] = now
+            forecast.save_cache(data)
+            self.forecast = data
+            self._forecast_dirty = True
+            print("Forecast updated")
+        except (OSError, KeyError, ValueError, IndexError) as e:
+            print("Forecast Update Failed:", e)
+        mem.maybe_collect()
 
     def get_screen(self):
         return self.screen
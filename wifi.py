@@ -1,8 +1,12 @@
-# wifi.py
 """
-Wi-Fi connection handler with automatic LED status indication.
+Wi-Fi connection manager with automatic LED status indication.
+
+Caches the last good SSID/BSSID/channel on flash for fast association, ranks
+known networks by RSSI from a single scan, and monitors the link from the
+main loop so a dropped connection is restored without a reset.
 """
 
+import json
 import time
 from secrets import WIFI_CREDENTIALS
 
@@ -38,45 +42,236 @@ except ImportError:
             def off(self):
                 pass
 
+            def play(self, pattern, priority=0, loops=0):
+                pass
+
+            def stop(self, priority=0):
+                pass
+
+            def error(self):
+                pass
+
+            def clear_error(self):
+                pass
+
+            def tick(self, now=None):
+                pass
+
 
         led = DummyLed()
         print("No status LED file found. Proceeding without LED.")
 
+_CACHE_PATH = "/wifi_cache.json"
 
-def connect(wdt=None):
-    """Connects to the best available Wi-Fi network from secrets.py."""
-    wlan = network.WLAN(network.STA_IF)
-    wlan.active(True)
-    mac = ubinascii.hexlify(wlan.config("mac"), ":").decode()
+_FAST_TIMEOUT_MS = 4000  # Cached BSSID, should associate quickly
+_CONNECT_TIMEOUT_MS = 10000
+_MONITOR_INTERVAL_MS = 2000
+_RETRY_BACKOFF_MS = 5000
+
+_STATE_IDLE = 0
+_STATE_CONNECTING = 1
+_STATE_CONNECTED = 2
+
+
+class WifiManager:
+    """Non-blocking Wi-Fi state machine driven by poll()."""
+
+    def __init__(self, credentials=None):
+        if credentials is None:
+            credentials = WIFI_CREDENTIALS
+        self.credentials = credentials
+        self.wlan = network.WLAN(network.STA_IF)
+        self.wlan.active(True)
+
+        self.connect_ms = None  # Time-to-connect of the last association
+        self.reconnects = 0
+
+        self._cache = self._load_cache()
+        self._candidates = []
+        self._current = None
+        self._scanned = False
+        self._state = _STATE_IDLE
+        self._started = 0
+        self._deadline = 0
+        self._next_check = 0
+
+    @property
+    def is_connected(self):
+        return self._state == _STATE_CONNECTED
+
+    # --- Cache ---
 
-    for creds in WIFI_CREDENTIALS:
-        wlan.disconnect()
-        time.sleep(1)
-        ssid = creds.get("ssid")
-        password = creds.get("password")
+    @staticmethod
+    def _load_cache():
+        try:
+            with open(_CACHE_PATH) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
 
+    def _save_cache(self, candidate):
+        ssid, _, bssid, channel = candidate
+        cache = {
+            "ssid": ssid,
+            "bssid": ubinascii.hexlify(bssid).decode() if bssid else None,
+            "channel": channel,
+        }
+        if cache == self._cache:
+            return
+        try:
+            with open(_CACHE_PATH, "w") as f:
+                json.dump(cache, f)
+            self._cache = cache
+        except OSError as e:
+            print(f"WiFi cache write failed: {e}")
+
+    def _password_for(self, ssid):
+        for creds in self.credentials:
+            if creds.get("ssid") == ssid:
+                return creds.get("password")
+        return None
+
+    # --- Candidate selection ---
+
+    def _cached_candidate(self):
+        if not self._cache:
+            return None
+        ssid = self._cache.get("ssid")
+        password = self._password_for(ssid)
+        if password is None:
+            return None
+        bssid = self._cache.get("bssid")
+        bssid = ubinascii.unhexlify(bssid) if bssid else None
+        return ssid, password, bssid, self._cache.get("channel")
+
+    def _scan_candidates(self):
+        """Scan once and return known networks, strongest signal first."""
+        self._scanned = True
+        try:
+            results = self.wlan.scan()
+        except OSError as e:
+            print(f"WiFi scan failed: {e}")
+            results = []
+
+        best = {}
+        for ssid_raw, bssid, channel, rssi, _, _ in results:
+            ssid = ssid_raw.decode("utf-8", "ignore")
+            password = self._password_for(ssid)
+            if password is None:
+                continue
+            if ssid not in best or rssi > best[ssid][0]:
+                best[ssid] = (rssi, (ssid, password, bssid, channel))
+
+        ranked = sorted(best.values(), key=lambda entry: entry[0], reverse=True)
+        candidates = [entry[1] for entry in ranked]
+        if not candidates:
+            # Hidden SSIDs do not show up in scans; fall back to config order
+            candidates = [
+                (c.get("ssid"), c.get("password"), None, None)
+                for c in self.credentials
+            ]
+        return candidates
+
+    # --- State machine ---
+
+    def start(self):
+        """Begin (re)connecting, trying the cached network first."""
+        self._started = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        self._candidates = []
+        self._scanned = False
+        cached = self._cached_candidate()
+        if cached:
+            self._candidates.append(cached)
+        else:
+            self._candidates.extend(self._scan_candidates())
+        self._next_candidate()
+
+    def _next_candidate(self):
+        now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        if not self._candidates:
+            print("WiFi connection failed for all credentials.")
+            self._state = _STATE_IDLE
+            self._deadline = time.ticks_add(now, _RETRY_BACKOFF_MS)  # ty:ignore[unresolved-attribute]
+            return
+
+        candidate = self._candidates.pop(0)
+        ssid, password, bssid, _ = candidate
+        self._current = candidate
         print(f"Connecting to SSID: {ssid}...")
-        wlan.connect(ssid, password)
+        led.wifi_connecting()
+        try:
+            self.wlan.disconnect()
+            if bssid:
+                self.wlan.connect(ssid, password, bssid=bssid)
+            else:
+                self.wlan.connect(ssid, password)
+        except OSError as e:
+            print(f"WiFi connect error: {e}")
 
-        # Wait max 10 seconds for connection
-        max_wait = 10
-        while max_wait > 0:
-            led.wifi_connecting()
+        timeout = _FAST_TIMEOUT_MS if bssid else _CONNECT_TIMEOUT_MS
+        self._deadline = time.ticks_add(now, timeout)  # ty:ignore[unresolved-attribute]
+        self._state = _STATE_CONNECTING
+
+    def _on_connected(self, now):
+        self._state = _STATE_CONNECTED
+        self.connect_ms = time.ticks_diff(now, self._started)  # ty:ignore[unresolved-attribute]
+        self._next_check = time.ticks_add(now, _MONITOR_INTERVAL_MS)  # ty:ignore[unresolved-attribute]
+        self._save_cache(self._current)
+
+        mac = ubinascii.hexlify(self.wlan.config("mac"), ":").decode()
+        print("-" * 30)
+        print("WiFi connected successfully!")
+        print(f"SSID: {self._current[0]}")
+        print(f"IP:   {self.wlan.ifconfig()[0]}")
+        print(f"MAC:  {mac.upper()}")
+        print(f"Time: {self.connect_ms} ms")
+        print("-" * 30)
+        led.set_state(0, 0, 0)  # Turn LED off
+
+    def poll(self):
+        """Advance the state machine. Cheap enough to call every loop pass."""
+        now = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+
+        if self._state == _STATE_CONNECTING:
+            if self.wlan.isconnected():
+                self._on_connected(now)
+            elif time.ticks_diff(now, self._deadline) >= 0:  # ty:ignore[unresolved-attribute]
+                if not self._candidates and not self._scanned:
+                    # Cached BSSID failed: scan once and rank by RSSI
+                    self._candidates.extend(self._scan_candidates())
+                self._next_candidate()
+
+        elif self._state == _STATE_CONNECTED:
+            if time.ticks_diff(now, self._next_check) < 0:  # ty:ignore[unresolved-attribute]
+                return
+            self._next_check = time.ticks_add(now, _MONITOR_INTERVAL_MS)  # ty:ignore[unresolved-attribute]
+            if not self.wlan.isconnected():
+                print("WiFi link lost, reconnecting...")
+                self.reconnects += 1
+                self.start()
+
+        elif time.ticks_diff(now, self._deadline) >= 0:  # ty:ignore[unresolved-attribute]
+            self.start()
+
+    def connect(self, wdt=None, timeout_ms=30000):
+        """Block until connected or timeout_ms elapsed. Used during boot."""
+        self.start()
+        begin = time.ticks_ms()  # ty:ignore[unresolved-attribute]
+        while not self.is_connected:
             if wdt:
                 wdt.feed()
-            if wlan.isconnected():
-                break
-            max_wait -= 1
-            time.sleep(1)
-
-        if wlan.isconnected():
-            print("-" * 30)
-            print("WiFi connected successfully!")
-            print(f"IP:   {wlan.ifconfig()[0]}")
-            print(f"MAC:  {mac.upper()}")
-            print("-" * 30)
-            led.set_state(0, 0, 0)  # Turn LED off
-            return True
-
-    print("WiFi connection failed for all credentials.")
-    return False
+            if time.ticks_diff(time.ticks_ms(), begin) > timeout_ms:  # ty:ignore[unresolved-attribute]
+                return False
+            self.poll()
+            led.tick()
+            time.sleep_ms(100)  # ty:ignore[unresolved-attribute]
+        return True
+
+
+def connect(wdt=None):
+    """
+    Connects to the best available Wi-Fi network from secrets.py. Returns
+    True once connected, False after the timeout, as before WifiManager.
+    Use a WifiManager directly to keep monitoring the link.
+    """
+    return WifiManager().connect(wdt)